@@ -0,0 +1,97 @@
+"""Time and memory of DiscoveryState upsert/save/load at increasing resource counts.
+
+    python benchmarks/state_bench.py                      # 10k, 100k, 1M on the json backend
+    python benchmarks/state_bench.py --sizes 10000 --backend sqlite
+
+Writing and loading each size run in separate interpreters, so the RSS column is only the loaded state.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def write_phase(root: str, size: int, backend: str) -> dict:
+    from api_discovery.state import evidence, open_state_store
+
+    store = open_state_store(root, "servicenow", backend=backend)
+    state = store.load()
+    ev = evidence(("metadata:sys_db_object", "metadata:sys_dictionary"), 0.7)
+    t0 = time.perf_counter()
+    for i in range(size):
+        store.upsert_resource(state, f"u_table_{i}", "table", evidence=ev, meta={"label": f"Table {i}", "super_class": "", "field_count": 12})
+        if i % 10 == 0:
+            store.add_unknown(state, f"u_unknown_{i}")
+    upsert = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    store.save(state)
+    return {"upsert_s": round(upsert, 3), "save_s": round(time.perf_counter() - t0, 3)}
+
+
+def load_phase(root: str, size: int, backend: str) -> dict:
+    # Separate interpreter: RSS here is what a fresh process pays to hold the loaded state
+    from api_discovery.state import open_state_store
+
+    store = open_state_store(root, "servicenow", backend=backend)
+    base_rss = _rss_mb()
+    t0 = time.perf_counter()
+    state = store.load()
+    load = time.perf_counter() - t0
+    assert len(state.known) == size
+    return {"load_s": round(load, 3), "rss_mb": round(_rss_mb() - base_rss, 1)}
+
+
+def _child(phase: str, root: str, size: int, backend: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--phase", phase, "--root", root, "--sizes", str(size), "--backend", backend],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--phase", choices=["write", "load"], help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        phase = write_phase if args.phase == "write" else load_phase
+        print(json.dumps(phase(args.root, args.sizes[0], args.backend)))
+        return
+
+    print(f"{'size':>9} {'backend':>7} {'upsert s':>9} {'save s':>8} {'load s':>8} {'RSS MB':>8} {'disk MB':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="state-bench-") as root:
+            r = {**_child("write", root, size, args.backend), **_child("load", root, size, args.backend)}
+            disk = sum(p.stat().st_size for p in Path(root).rglob("*") if p.is_file()) / (1024 * 1024)
+        print(f"{size:>9} {args.backend:>7} {r['upsert_s']:>9} {r['save_s']:>8} {r['load_s']:>8} {r['rss_mb']:>8} {disk:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .config import ServiceNowSettings
+
+INSTALL_HINT = "Run 'api-discovery browser install' (add --with-deps on a fresh machine)."
+
+
+class BrowserUnavailableError(RuntimeError):
+    # Playwright or its Chromium build is missing; callers report it instead of a traceback
+    pass
+
+
+def playwright_version() -> Optional[str]:
+    try:
+        return metadata.version("playwright")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def marker_path() -> Path:
+    # Browsers live in the per-user Playwright cache, so the marker is per user too
+    root = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return root / "api-discovery" / "browser.json"
+
+
+def _read_marker() -> Dict[str, str]:
+    try:
+        return json.loads(marker_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def provisioned_chromium(version: Optional[str] = None) -> Optional[str]:
+    # Cheap check for the hot path: one small file read and one stat, no subprocess
+    version = version or playwright_version()
+    data = _read_marker()
+    path = data.get("chromium")
+    if not version or data.get("playwright") != version or not path or not Path(path).exists():
+        return None
+    return path
+
+
+def record_chromium(executable_path: str, version: Optional[str] = None) -> Path:
+    out = marker_path()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"playwright": version or playwright_version() or "", "chromium": executable_path}))
+    tmp.replace(out)
+    return out
+
+
+def ensure_chromium(playwright) -> str:
+    # ``playwright`` is a started (async or sync) Playwright instance. The marker is trusted
+    # first; otherwise the executable Playwright expects is checked once and recorded.
+    path = provisioned_chromium()
+    if path:
+        return path
+    expected = playwright.chromium.executable_path
+    if expected and Path(expected).exists():
+        record_chromium(expected)
+        return expected
+    raise BrowserUnavailableError(f"Chromium for Playwright {playwright_version() or '?'} is not installed. {INSTALL_HINT}")
+
+
+def detect_chromium() -> Optional[str]:
+    try:
+        from playwright.sync_api import sync_playwright
+    except Exception:  # noqa: BLE001
+        return None
+    with sync_playwright() as p:
+        path = p.chromium.executable_path
+    return path if path and Path(path).exists() else None
+
+
+def install_chromium(*, with_deps: bool = False) -> Optional[str]:
+    cmd = [sys.executable, "-m", "playwright", "install", "chromium"]
+    if with_deps:
+        cmd.append("--with-deps")
+    subprocess.run(cmd, check=True)
+    path = detect_chromium()
+    if path:
+        record_chromium(path)
+    return path
+
+
+# Nothing the explorer's selects, XHR payloads or export link depend on
+LEAN_BLOCKED_TYPES = frozenset({"image", "font", "stylesheet", "media", "texttrack", "manifest", "eventsource"})
+LEAN_BLOCKED_URLS = ("google-analytics", "googletagmanager", "doubleclick", "newrelic", "nr-data.net", "appdynamics", "/analytics")
+LEAN_LAUNCH_ARGS = [
+    "--disable-extensions",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+]
+
+
+@dataclass
+class PageProfile:
+    lean: bool = True
+    allow: Tuple[str, ...] = ()
+    blocked_types: FrozenSet[str] = LEAN_BLOCKED_TYPES
+    blocked_urls: Tuple[str, ...] = LEAN_BLOCKED_URLS
+    blocked: int = field(default=0, compare=False)
+    allowed: int = field(default=0, compare=False)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if not self.lean or resource_type in self.allow or any(a in url for a in self.allow):
+            return False
+        return resource_type in self.blocked_types or any(hint in url for hint in self.blocked_urls)
+
+    def launch_args(self) -> List[str]:
+        return list(LEAN_LAUNCH_ARGS) if self.lean else []
+
+    def context_options(self) -> Dict[str, object]:
+        if not self.lean:
+            return {}
+        # Service workers would bypass context.route; a small viewport keeps layout/paint cheap
+        return {"service_workers": "block", "viewport": {"width": 1024, "height": 768}, "reduced_motion": "reduce"}
+
+    async def apply(self, context) -> None:
+        if self.lean:
+            await context.route("**/*", self._route)
+
+    async def _route(self, route) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked += 1
+            await route.abort()
+        else:
+            self.allowed += 1
+            await route.continue_()
+
+
+def page_profile_from_settings(settings: ServiceNowSettings) -> PageProfile:
+    allow = tuple(a.strip() for a in (settings.browser_allow_resources or "").split(",") if a.strip())
+    return PageProfile(lean=settings.browser_lean, allow=allow)
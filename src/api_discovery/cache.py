@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .config import CommonSettings
+
+# Only the REST catalog metadata (sys_ws_*) is served from cache by default; every other path uses default_ttl,
+# which is 0 (revalidate-only) unless HTTP_CACHE_TTL_SECONDS or explicit ttls opt it in
+DEFAULT_TTLS: Dict[str, float] = {
+    "/api/now/table/sys_ws_*": 6 * 3600,
+}
+
+# Stored content is already decoded, so transport framing headers must not be replayed
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: List[Tuple[str, str]]
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(self.status, headers=self.headers, content=self.content, request=request)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str,
+        *,
+        default_ttl: float = 0.0,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(method: str, url: str, identity: str) -> str:
+        # url already carries the encoded query string, so params are part of the key
+        return hashlib.sha256(f"{method.upper()}\n{url}\n{identity}".encode()).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        path = urlsplit(url).path
+        for pattern, ttl in self.ttls.items():
+            if fnmatch.fnmatchcase(path, pattern):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, content, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        cached = CachedResponse(row[0], [tuple(h) for h in json.loads(row[1])], row[2], row[3], row[4], row[5])
+        if cached.fresh:
+            self.hits += 1
+        return cached
+
+    def store(self, key: str, response: httpx.Response) -> None:
+        url = str(response.request.url)
+        ttl = self.ttl_for(url)
+        has_validators = "etag" in response.headers or "last-modified" in response.headers
+        if ttl <= 0 and not has_validators:
+            return
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROP_HEADERS]
+        content = response.content
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, content, etag, last_modified, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    response.status_code,
+                    json.dumps(headers),
+                    content,
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    now + ttl,
+                    now,
+                    len(content),
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str, url: str) -> None:
+        # A 304 proves the stored body is still current; start a new TTL window
+        now = time.time()
+        with self._lock:
+            self.revalidated += 1
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?", (now + self.ttl_for(url), now, key)
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def response_cache_from_settings(settings: CommonSettings, path: str) -> ResponseCache:
+    return ResponseCache(path, default_ttl=settings.http_cache_ttl_seconds, max_bytes=settings.http_cache_max_bytes)
@@ -1,28 +1,75 @@
 from __future__ import annotations
 
-from pathlib import Path
 import os
-from typing import Optional
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
 
 import typer
 from rich import print  # noqa: A001
 
+from .browser import (
+    BrowserUnavailableError,
+    detect_chromium,
+    install_chromium,
+    marker_path,
+    page_profile_from_settings,
+    playwright_version,
+    provisioned_chromium,
+    record_chromium,
+)
+from .cache import ResponseCache, response_cache_from_settings
 from .config import RunConfig, ServiceNowSettings
-from .discovery.servicenow import discover_servicenow, list_namespaces, list_api_namespaces, list_api_versions
-from .discovery.sn_browser import discover_catalog_via_browser, export_openapi_via_browser
-from .synthesis.openapi import synthesize_servicenow_spec
-from .validation.static import validate_openapi_spec
+from .discovery.catalog import (
+    CatalogIndex,
+    load_or_build_catalog_index,
+    load_or_build_catalog_index_async,
+)
+from .discovery.servicenow import (
+    discover_servicenow,
+    discover_servicenow_once,
+    list_api_namespaces,
+    list_api_namespaces_async,
+    list_api_versions,
+    list_api_versions_async,
+    list_namespaces,
+    list_namespaces_async,
+)
+from .discovery.sn_browser import (
+    CATALOG_MODES,
+    BrowserPool,
+    BrowserSession,
+    CatalogTree,
+    browser_session_from_settings,
+    export_openapi_via_browser,
+    load_or_discover_catalog,
+)
+from .discovery.sn_export import SpecExporter, fetch_export_direct
+from .http import AuthConfig, HTTPClient
+from .state import SqliteStateStore, StateStore, migrate_json_state, open_state_store
+from .synthesis.openapi import (
+    build_servicenow_spec,
+    synthesize_servicenow_spec,
+    synthesize_table_api_version,
+)
+from .synthesis.scripted_rest import (
+    OperationParameters,
+    synthesize_catalog_specs,
+    synthesize_scripted_rest_spec,
+)
 from .validation.runtime import probe_servicenow_tables
-from .state import StateStore
-
+from .validation.static import validate_openapi_spec
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 sn_app = typer.Typer(help="ServiceNow helpers")
 sf_app = typer.Typer(help="Salesforce helpers (stubs)")
 pega_app = typer.Typer(help="Pega helpers (stubs)")
+browser_app = typer.Typer(help="Headless browser provisioning")
 app.add_typer(sn_app, name="sn")
 app.add_typer(sf_app, name="sf")
 app.add_typer(pega_app, name="pega")
+app.add_typer(browser_app, name="browser")
 
 
 @app.command()
@@ -38,6 +85,8 @@ def discover(
     specs_dir: Optional[str] = typer.Option(None, help="Absolute specs directory"),
     resume: bool = typer.Option(False, help="Resume using cached dictionaries if present"),
     force: bool = typer.Option(False, help="Force re-fetch, ignoring caches"),
+    incremental: bool = typer.Option(False, help="Only refetch tables changed since the last run (sys_updated_on watermarks)"),
+    concurrency: Optional[int] = typer.Option(None, help="Max concurrent HTTP requests (default: MAX_CONCURRENCY, 4; 1 = sequential)"),
 ):
     default_root = Path(__file__).resolve().parents[2]
     run = RunConfig(
@@ -46,7 +95,7 @@ def discover(
     )
     print(f"Using state_dir: {run.state_dir}")
     if platform.lower() == "servicenow":
-        sn_kwargs: dict[str, object] = {}
+        sn_kwargs: dict[str, Any] = {}
         sn_kwargs["base_url"] = base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
         if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
             sn_kwargs["username"] = username or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME")
@@ -58,12 +107,13 @@ def discover(
             sn_kwargs["allowlist"] = allowlist
         if denylist is not None:
             sn_kwargs["denylist"] = denylist
+        if concurrency is not None:
+            sn_kwargs["max_concurrency"] = concurrency
         settings = ServiceNowSettings(**sn_kwargs)
-        from .state import StateStore
-        store = StateStore(run.state_dir, "servicenow")
+        store = open_state_store(run.state_dir, "servicenow", backend=run.state_backend)
         if resume and not force and not store.list_cached_tables():
             print(f"[yellow]No cached dictionaries found in {store.cache_dir}. Fetching fresh.[/yellow]")
-        tables, dictionaries = discover_servicenow(settings, run, resume=resume, force=force)
+        tables, _ = discover_servicenow(settings, run, resume=resume, force=force, incremental=incremental)
         print(f"Discovered {len(tables)} tables")
         typer.echo("Done")
     else:
@@ -96,11 +146,13 @@ def discover_and_synthesize(
     out: str = typer.Option("openapi_specs/servicenow_generated.json"),
     resume: bool = typer.Option(False, help="Resume using cached dictionaries if present"),
     force: bool = typer.Option(False, help="Force re-fetch, ignoring caches"),
+    incremental: bool = typer.Option(False, help="Only refetch tables changed since the last run (sys_updated_on watermarks)"),
     namespace: Optional[str] = typer.Option(None, help="Docs namespace"),
     api_name: Optional[str] = typer.Option(None, help="API name"),
     api_version: Optional[str] = typer.Option(None, help="API version"),
     state_dir: Optional[str] = typer.Option(None, help="Absolute state directory"),
     specs_dir: Optional[str] = typer.Option(None, help="Absolute specs directory"),
+    concurrency: Optional[int] = typer.Option(None, help="Max concurrent HTTP requests (default: MAX_CONCURRENCY, 4; 1 = sequential)"),
 ):
     default_root = Path(__file__).resolve().parents[2]
     run = RunConfig(
@@ -109,7 +161,7 @@ def discover_and_synthesize(
     )
     print(f"Using state_dir: {run.state_dir}")
     if platform.lower() == "servicenow":
-        sn_kwargs: dict[str, object] = {}
+        sn_kwargs: dict[str, Any] = {}
         sn_kwargs["base_url"] = base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
         if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
             sn_kwargs["username"] = username or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME")
@@ -121,12 +173,13 @@ def discover_and_synthesize(
             sn_kwargs["allowlist"] = allowlist
         if denylist is not None:
             sn_kwargs["denylist"] = denylist
+        if concurrency is not None:
+            sn_kwargs["max_concurrency"] = concurrency
         settings = ServiceNowSettings(**sn_kwargs)
-        from .state import StateStore
-        store = StateStore(run.state_dir, "servicenow", namespace=namespace, api_name=api_name, api_version=api_version)
+        store = open_state_store(run.state_dir, "servicenow", backend=run.state_backend, namespace=namespace, api_name=api_name, api_version=api_version)
         if resume and not force and not store.list_cached_tables():
             print(f"[yellow]No cached dictionaries found in {store.cache_dir}. Fetching fresh.[/yellow]")
-        _, dictionaries = discover_servicenow(settings, run, resume=resume, force=force)
+        _, dictionaries = discover_servicenow(settings, run, resume=resume, force=force, incremental=incremental)
         out_path = synthesize_servicenow_spec(
             base_url=settings.base_url,
             dictionaries=dictionaries,
@@ -135,7 +188,7 @@ def discover_and_synthesize(
             api_name=api_name,
             api_version=api_version,
         )
-        ok, msg = validate_openapi_spec(out_path)
+        ok, _ = validate_openapi_spec(out_path)
         if not ok:
             raise typer.Exit(code=2)
         print(f"Spec written: {out_path}")
@@ -143,10 +196,122 @@ def discover_and_synthesize(
         raise typer.BadParameter("Only 'servicenow' is implemented in P0")
 
 
+def _run_config(state_dir: Optional[str]) -> RunConfig:
+    return RunConfig(state_dir=state_dir) if state_dir else RunConfig()
+
+
+def _http_cache(settings: ServiceNowSettings, enabled: bool, state_dir: str) -> Optional[ResponseCache]:
+    if not enabled:
+        return None
+    return response_cache_from_settings(settings, str(Path(state_dir) / "servicenow" / "http_cache.sqlite"))
+
+
+def _auth_config(settings: ServiceNowSettings) -> AuthConfig:
+    if settings.username and settings.password:
+        return AuthConfig(username=settings.username, password=settings.password)
+    return AuthConfig(bearer_token=settings.oauth_token) if settings.oauth_token else AuthConfig()
+
+
+def _browser_session(settings: ServiceNowSettings, state_dir: str) -> BrowserSession:
+    return browser_session_from_settings(settings, state_dir)
+
+
+def _catalog_mode(value: str) -> str:
+    if value not in CATALOG_MODES:
+        raise typer.BadParameter(f"Expected one of {', '.join(CATALOG_MODES)}, got {value!r}")
+    return value
+
+
+def _headless_catalog_path(state_dir: str) -> Path:
+    # Lives next to the _catalog.json written by crawl-catalog
+    return Path(state_dir) / "servicenow" / "_headless_catalog.json"
+
+
+def _headless_catalog(
+    settings: ServiceNowSettings, state_dir: str, *, refresh: bool = False, mode: str = "auto", debug_dir: Optional[str] = None
+) -> CatalogTree:
+    import asyncio
+
+    with _browser_required():
+        return asyncio.run(
+            load_or_discover_catalog(
+                _headless_catalog_path(state_dir),
+                base_url=settings.base_url,
+                refresh=refresh,
+                mode=mode,
+                username=settings.username,
+                password=settings.password,
+                oauth_token=settings.oauth_token,
+                debug_dir=debug_dir,
+                profile=page_profile_from_settings(settings),
+                session=_browser_session(settings, state_dir),
+            )
+        )
+
+
+@contextmanager
+def _browser_required() -> Iterator[None]:
+    try:
+        yield
+    except BrowserUnavailableError as exc:
+        print(f"[red]{exc}[/red] Pass --no-headless to skip the browser.")
+        raise typer.Exit(code=1) from exc
+
+
+def _catalog_index_path(state_dir: str) -> Path:
+    return Path(state_dir) / "servicenow" / "_catalog_index.json"
+
+
+def _catalog_index(client: HTTPClient, state_dir: str, *, refresh: bool = False, include_operations: bool = False) -> Optional[CatalogIndex]:
+    try:
+        return load_or_build_catalog_index(client, _catalog_index_path(state_dir), refresh=refresh, include_operations=include_operations)
+    except Exception:  # noqa: BLE001
+        # Listers fall back to building their own index / explorer HTML
+        return None
+
+
+def _scripted_rest_metadata(
+    settings: ServiceNowSettings, cache: Optional[ResponseCache], state_dir: str, *, refresh: bool = False
+) -> Optional[tuple[CatalogIndex, OperationParameters]]:
+    # A handful of bulk pulls (definitions, versions, operations, parameter maps) cover every Scripted REST API
+    try:
+        with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings), cache=cache) as client:
+            index = load_or_build_catalog_index(client, _catalog_index_path(state_dir), refresh=refresh, include_operations=True)
+            return index, OperationParameters.fetch(client)
+    except Exception as exc:  # noqa: BLE001
+        print(f"[yellow]Scripted REST metadata unavailable: {exc}[/yellow]")
+        return None
+
+
 def main() -> None:  # pragma: no cover
     app()
 
 
+@browser_app.command("install")
+def browser_install(with_deps: bool = typer.Option(False, help="Also install OS packages Chromium needs (may require root)")) -> None:
+    if playwright_version() is None:
+        raise typer.BadParameter("Playwright is not installed; install the 'headless' extra first.")
+    try:
+        path = install_chromium(with_deps=with_deps)
+    except subprocess.CalledProcessError as exc:
+        hint = " Installing OS packages with --with-deps usually needs root." if with_deps else ""
+        print(f"[red]Chromium install failed ('{' '.join(map(str, exc.cmd))}' exited with {exc.returncode}).[/red]{hint}")
+        raise typer.Exit(code=1) from exc
+    if not path:
+        print("[red]Chromium install finished but no executable was found.[/red]")
+        raise typer.Exit(code=1)
+    print(f"Chromium ready: {path} (marker: {marker_path()})")
+
+
+@browser_app.command("status")
+def browser_status() -> None:
+    version = playwright_version()
+    path = provisioned_chromium(version) or (detect_chromium() if version else None)
+    if path:
+        record_chromium(path, version)
+    print(f"Playwright: {version or 'not installed'} | Chromium: {path or 'missing'}")
+
+
 @app.command()
 def validate_spec(path: str = typer.Option(..., "--path", help="Path to OpenAPI spec JSON")) -> None:
     ok, msg = validate_openapi_spec(path)
@@ -164,9 +329,16 @@ def sn_list_namespaces(
     password: Optional[str] = typer.Option(None),
     oauth_token: Optional[str] = typer.Option(None),
     headless: bool = typer.Option(False, help="Use headless browser to enumerate dynamically rendered options"),
+    catalog_mode: str = typer.Option(
+        "auto", callback=_catalog_mode, help="Headless catalog source: network (explorer XHR), dom (dropdowns) or auto"
+    ),
     debug_dir: Optional[str] = typer.Option(None, help="Write HTML/screenshot when nothing is found"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached metadata responses from the state dir"),
+    refresh: bool = typer.Option(False, help="Rebuild the cached catalog instead of answering from it"),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
 ) -> None:
-    sn_kwargs: dict[str, object] = {
+    run = _run_config(state_dir)
+    sn_kwargs: dict[str, Any] = {
         "base_url": base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
     }
     if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
@@ -176,35 +348,16 @@ def sn_list_namespaces(
     if oauth_token is not None or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN"):
         sn_kwargs["oauth_token"] = oauth_token or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN")
     settings = ServiceNowSettings(**sn_kwargs)
-    from .http import HTTPClient, AuthConfig
-
-    auth = (
-        AuthConfig(username=settings.username, password=settings.password)
-        if settings.username and settings.password
-        else (AuthConfig(bearer_token=settings.oauth_token) if settings.oauth_token else AuthConfig())
-    )
-    with HTTPClient(
-        base_url=settings.base_url,
-        verify=settings.verify_tls,
-        timeout_seconds=settings.request_timeout_seconds,
-        user_agent=settings.user_agent,
-        rate_limit_per_second=settings.rate_limit_per_second,
-        auth=auth,
-    ) as client:
+    with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings), cache=_http_cache(settings, cache, run.state_dir)) as client:
         if headless:
-            import asyncio
-            ns, _, _ = asyncio.run(
-                discover_catalog_via_browser(
-                    base_url=settings.base_url, username=settings.username, password=settings.password, oauth_token=settings.oauth_token, debug_dir=debug_dir
-                )
-            )
+            ns, _, _ = _headless_catalog(settings, run.state_dir, refresh=refresh, mode=catalog_mode, debug_dir=debug_dir)
             if not ns:
                 print("No namespaces found")
             else:
                 for n in ns:
                     print(n)
         else:
-            namespaces = list_namespaces(client)
+            namespaces = list_namespaces(client, _catalog_index(client, run.state_dir, refresh=refresh or not cache))
             if not namespaces:
                 print("No namespaces found")
             else:
@@ -220,9 +373,16 @@ def sn_list_apis(
     password: Optional[str] = typer.Option(None),
     oauth_token: Optional[str] = typer.Option(None),
     headless: bool = typer.Option(False, help="Use headless browser to enumerate dynamically rendered options"),
+    catalog_mode: str = typer.Option(
+        "auto", callback=_catalog_mode, help="Headless catalog source: network (explorer XHR), dom (dropdowns) or auto"
+    ),
     debug_dir: Optional[str] = typer.Option(None, help="Write HTML/screenshot when nothing is found"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached metadata responses from the state dir"),
+    refresh: bool = typer.Option(False, help="Rebuild the cached catalog instead of answering from it"),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
 ) -> None:
-    sn_kwargs: dict[str, object] = {
+    run = _run_config(state_dir)
+    sn_kwargs: dict[str, Any] = {
         "base_url": base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
     }
     if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
@@ -232,27 +392,9 @@ def sn_list_apis(
     if oauth_token is not None or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN"):
         sn_kwargs["oauth_token"] = oauth_token or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN")
     settings = ServiceNowSettings(**sn_kwargs)
-    from .http import HTTPClient, AuthConfig
-    auth = (
-        AuthConfig(username=settings.username, password=settings.password)
-        if settings.username and settings.password
-        else (AuthConfig(bearer_token=settings.oauth_token) if settings.oauth_token else AuthConfig())
-    )
-    with HTTPClient(
-        base_url=settings.base_url,
-        verify=settings.verify_tls,
-        timeout_seconds=settings.request_timeout_seconds,
-        user_agent=settings.user_agent,
-        rate_limit_per_second=settings.rate_limit_per_second,
-        auth=auth,
-    ) as client:
+    with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings), cache=_http_cache(settings, cache, run.state_dir)) as client:
         if headless:
-            import asyncio
-            _, ns_to_apis, _ = asyncio.run(
-                discover_catalog_via_browser(
-                    base_url=settings.base_url, username=settings.username, password=settings.password, oauth_token=settings.oauth_token, debug_dir=debug_dir
-                )
-            )
+            _, ns_to_apis, _ = _headless_catalog(settings, run.state_dir, refresh=refresh, mode=catalog_mode, debug_dir=debug_dir)
             apis = ns_to_apis.get(namespace, [])
             if not apis:
                 print("No APIs found for namespace")
@@ -260,7 +402,7 @@ def sn_list_apis(
                 for a in apis:
                     print(a)
         else:
-            apis = list_api_namespaces(client, namespace)
+            apis = list_api_namespaces(client, namespace, _catalog_index(client, run.state_dir, refresh=refresh or not cache))
             if not apis:
                 print("No APIs found for namespace")
             else:
@@ -277,9 +419,16 @@ def sn_list_versions(
     password: Optional[str] = typer.Option(None),
     oauth_token: Optional[str] = typer.Option(None),
     headless: bool = typer.Option(False, help="Use headless browser to enumerate dynamically rendered options"),
+    catalog_mode: str = typer.Option(
+        "auto", callback=_catalog_mode, help="Headless catalog source: network (explorer XHR), dom (dropdowns) or auto"
+    ),
     debug_dir: Optional[str] = typer.Option(None, help="Write HTML/screenshot when nothing is found"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached metadata responses from the state dir"),
+    refresh: bool = typer.Option(False, help="Rebuild the cached catalog instead of answering from it"),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
 ) -> None:
-    sn_kwargs: dict[str, object] = {
+    run = _run_config(state_dir)
+    sn_kwargs: dict[str, Any] = {
         "base_url": base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
     }
     if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
@@ -289,27 +438,9 @@ def sn_list_versions(
     if oauth_token is not None or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN"):
         sn_kwargs["oauth_token"] = oauth_token or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN")
     settings = ServiceNowSettings(**sn_kwargs)
-    from .http import HTTPClient, AuthConfig
-    auth = (
-        AuthConfig(username=settings.username, password=settings.password)
-        if settings.username and settings.password
-        else (AuthConfig(bearer_token=settings.oauth_token) if settings.oauth_token else AuthConfig())
-    )
-    with HTTPClient(
-        base_url=settings.base_url,
-        verify=settings.verify_tls,
-        timeout_seconds=settings.request_timeout_seconds,
-        user_agent=settings.user_agent,
-        rate_limit_per_second=settings.rate_limit_per_second,
-        auth=auth,
-    ) as client:
+    with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings), cache=_http_cache(settings, cache, run.state_dir)) as client:
         if headless:
-            import asyncio
-            _, _, api_versions = asyncio.run(
-                discover_catalog_via_browser(
-                    base_url=settings.base_url, username=settings.username, password=settings.password, oauth_token=settings.oauth_token, debug_dir=debug_dir
-                )
-            )
+            _, _, api_versions = _headless_catalog(settings, run.state_dir, refresh=refresh, mode=catalog_mode, debug_dir=debug_dir)
             versions = api_versions.get((namespace, api_name), [])
             if not versions:
                 print("No versions found for API")
@@ -317,7 +448,7 @@ def sn_list_versions(
                 for v in versions:
                     print(v)
         else:
-            versions = list_api_versions(client, namespace, api_name)
+            versions = list_api_versions(client, namespace, api_name, _catalog_index(client, run.state_dir, refresh=refresh or not cache))
             if not versions:
                 print("No versions found for API")
             else:
@@ -333,8 +464,10 @@ def sn_export_spec(
     api_version: str = typer.Option(...),
     username: Optional[str] = typer.Option(None),
     password: Optional[str] = typer.Option(None),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
 ) -> None:
-    sn_kwargs: dict[str, object] = {
+    run = _run_config(state_dir)
+    sn_kwargs: dict[str, Any] = {
         "base_url": base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
     }
     if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
@@ -342,8 +475,15 @@ def sn_export_spec(
     if password is not None or os.getenv("API_DISCOVERY_SERVICENOW_PASSWORD"):
         sn_kwargs["password"] = password or os.getenv("API_DISCOVERY_SERVICENOW_PASSWORD")
     settings = ServiceNowSettings(**sn_kwargs)
+    session = _browser_session(settings, run.state_dir)
+    text = None
+    template = (session.selectors.get("export_url") or {}).get("template")
+    if template:
+        # Learned from an earlier browser export; no browser needed when it still works
+        with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings)) as client:
+            text = fetch_export_direct(client, template, (namespace, api_name, api_version), session=session)
     import asyncio
-    text = asyncio.run(
+    text = text or asyncio.run(
         export_openapi_via_browser(
             base_url=settings.base_url,
             namespace=namespace,
@@ -351,6 +491,8 @@ def sn_export_spec(
             api_version=api_version,
             username=settings.username,
             password=settings.password,
+            profile=page_profile_from_settings(settings),
+            session=session,
         )
     )
     if text:
@@ -363,63 +505,108 @@ def sn_export_spec(
         print("No spec available via export; use discover-and-synthesize to generate one.")
 
 
+async def _list_catalog_async(
+    settings: ServiceNowSettings, cache: Optional[ResponseCache], state_dir: str, *, refresh: bool = False
+) -> list[tuple[str, str, str]]:
+    from .http import AsyncHTTPClient
+    async with AsyncHTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings), cache=cache) as client:
+        index = await load_or_build_catalog_index_async(client, _catalog_index_path(state_dir), refresh=refresh, include_operations=True)
+        catalogs: list[tuple[str, str, str]] = []
+        for ns in await list_namespaces_async(client, index):
+            for api_name in await list_api_namespaces_async(client, ns, index):
+                for ver in await list_api_versions_async(client, ns, api_name, index):
+                    catalogs.append((ns, api_name, ver))
+        return catalogs
+
+
+async def _export_catalog_async(
+    settings: ServiceNowSettings, catalogs: list[tuple[str, str, str]], state_dir: str, *, max_specs: int, browsers: int, headless: bool = True
+) -> dict[tuple[str, str, str], Optional[str]]:
+    # All exports share one event loop: direct HTTP downloads through the learned export URL,
+    # with one pool of logged-in pages as fallback (headless runs only). Work is dispatched in
+    # windows sized to the specs still wanted, so max_specs bounds the work as before.
+    exports: dict[tuple[str, str, str], Optional[str]] = {}
+    pending = list(catalogs)
+    if not pending or max_specs <= 0:
+        return exports
+    from .http import AsyncHTTPClient
+
+    done = 0
+    session = _browser_session(settings, state_dir)
+
+    def pool() -> BrowserPool:
+        return BrowserPool(
+            base_url=settings.base_url,
+            username=settings.username,
+            password=settings.password,
+            size=browsers,
+            profile=page_profile_from_settings(settings),
+            session=session,
+        )
+
+    async with (
+        AsyncHTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings)) as client,
+        SpecExporter(client, session, pool if headless else None) as exporter,
+    ):
+        while pending and done < max_specs:
+            window, pending = pending[: max_specs - done], pending[max_specs - done :]
+            batch = await exporter.export_many(window)
+            exports.update(batch)
+            # Entries without an export are synthesized from metadata afterwards and count towards the limit too
+            done += len(batch)
+        print(f"Exports: {exporter.stats()}")
+    return exports
+
+
 @sn_app.command("crawl-catalog")
 def sn_crawl_catalog(
     base_url: Optional[str] = typer.Option(None),
     headless: bool = typer.Option(True, help="Use headless browser for dynamic explorer"),
+    catalog_mode: str = typer.Option(
+        "auto", callback=_catalog_mode, help="Headless catalog source: network (explorer XHR), dom (dropdowns) or auto"
+    ),
     username: Optional[str] = typer.Option(None),
     password: Optional[str] = typer.Option(None),
     max_specs: int = typer.Option(200, help="Max number of specs to process in this run"),
     resume: bool = typer.Option(True, help="Reuse caches/state where possible"),
     force: bool = typer.Option(False, help="Force re-discovery even if cached"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached metadata responses from the state dir"),
+    concurrency: Optional[int] = typer.Option(None, help="Max concurrent HTTP requests (default: MAX_CONCURRENCY, 4; 1 = sequential)"),
+    browsers: int = typer.Option(4, help="Logged-in browser pages used concurrently for spec exports"),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
 ) -> None:
-    sn_kwargs: dict[str, object] = {
+    run = _run_config(state_dir)
+    sn_kwargs: dict[str, Any] = {
         "base_url": base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
     }
     if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
         sn_kwargs["username"] = username or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME")
     if password is not None or os.getenv("API_DISCOVERY_SERVICENOW_PASSWORD"):
         sn_kwargs["password"] = password or os.getenv("API_DISCOVERY_SERVICENOW_PASSWORD")
+    if concurrency is not None:
+        sn_kwargs["max_concurrency"] = concurrency
     settings = ServiceNowSettings(**sn_kwargs)
 
     # Discover catalog
     catalogs = []
     import asyncio
     if headless:
-        ns, ns_to_apis, api_versions = asyncio.run(
-            discover_catalog_via_browser(
-                base_url=settings.base_url,
-                username=settings.username,
-                password=settings.password,
-                oauth_token=settings.oauth_token,
-            )
-        )
+        ns, ns_to_apis, api_versions = _headless_catalog(settings, run.state_dir, refresh=force or not cache, mode=catalog_mode)
         for namespace in ns:
             for api_name in ns_to_apis.get(namespace, []):
                 for ver in api_versions.get((namespace, api_name), []):
                     catalogs.append((namespace, api_name, ver))
+    elif settings.max_concurrency > 1:
+        catalogs = asyncio.run(_list_catalog_async(settings, _http_cache(settings, cache, run.state_dir), run.state_dir, refresh=not cache))
     else:
-        from .http import HTTPClient, AuthConfig
-        auth = (
-            AuthConfig(username=settings.username, password=settings.password)
-            if settings.username and settings.password
-            else (AuthConfig(bearer_token=settings.oauth_token) if settings.oauth_token else AuthConfig())
-        )
-        with HTTPClient(
-            base_url=settings.base_url,
-            verify=settings.verify_tls,
-            timeout_seconds=settings.request_timeout_seconds,
-            user_agent=settings.user_agent,
-            rate_limit_per_second=settings.rate_limit_per_second,
-            auth=auth,
-        ) as client:
-            for namespace in list_namespaces(client):
-                for api_name in list_api_namespaces(client, namespace):
-                    for ver in list_api_versions(client, namespace, api_name):
+        with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth_config(settings), cache=_http_cache(settings, cache, run.state_dir)) as client:
+            index = _catalog_index(client, run.state_dir, refresh=not cache, include_operations=True)
+            for namespace in list_namespaces(client, index):
+                for api_name in list_api_namespaces(client, namespace, index):
+                    for ver in list_api_versions(client, namespace, api_name, index):
                         catalogs.append((namespace, api_name, ver))
 
     # Persist catalog index
-    run = RunConfig()
     catalog_path = Path(run.state_dir) / "servicenow" / "_catalog.json"
     catalog_path.parent.mkdir(parents=True, exist_ok=True)
     import json
@@ -427,21 +614,16 @@ def sn_crawl_catalog(
     print(f"Catalog entries: {len(catalogs)}")
 
     # Export or generate up to limit
+    with _browser_required():
+        exports = asyncio.run(_export_catalog_async(settings, catalogs, run.state_dir, max_specs=max_specs, browsers=browsers, headless=headless))
     processed = 0
+    metadata: Optional[tuple[CatalogIndex, OperationParameters]] = None
+    metadata_loaded = False
+    table_spec: Optional[dict] = None
     for namespace, api_name, ver in catalogs:
         if processed >= max_specs:
             break
-        # Try export first
-        text = asyncio.run(
-            export_openapi_via_browser(
-                base_url=settings.base_url,
-                namespace=namespace,
-                api_name=api_name,
-                api_version=ver,
-                username=settings.username,
-                password=settings.password,
-            )
-        )
+        text = exports.get((namespace, api_name, ver))
         out_dir = Path(run.specs_dir) / namespace / api_name / ver
         out_dir.mkdir(parents=True, exist_ok=True)
         if text:
@@ -452,15 +634,18 @@ def sn_crawl_catalog(
 
         # If Table API or no export, generate via our discovery pipeline
         if api_name.lower().startswith("table"):
-            # Narrow generation to reuse our current metadata-based generator (tables)
-            _, dictionaries = discover_servicenow(settings, run, resume=resume, force=force)
-            out_path = synthesize_servicenow_spec(
+            # One discovery (and one spec build) per run serves every Table API version
+            _, dictionaries = discover_servicenow_once(settings, run, resume=resume, force=force)
+            if table_spec is None:
+                table_spec = build_servicenow_spec(base_url=settings.base_url, dictionaries=dictionaries)
+            out_path = synthesize_table_api_version(
                 base_url=settings.base_url,
                 dictionaries=dictionaries,
-                output_path=str(out_dir / "servicenow_generated.json"),
+                specs_dir=run.specs_dir,
                 namespace=namespace,
                 api_name=api_name,
                 api_version=ver,
+                spec=table_spec,
             )
             ok, msg = validate_openapi_spec(out_path)
             if ok:
@@ -468,18 +653,121 @@ def sn_crawl_catalog(
                 processed += 1
             else:
                 print(f"Validation failed for {namespace}/{api_name}/{ver}: {msg}")
+            continue
+
+        # Scripted REST APIs: build the spec from sys_ws_operation metadata instead of giving up
+        if not metadata_loaded:
+            metadata = _scripted_rest_metadata(settings, _http_cache(settings, cache, run.state_dir), run.state_dir, refresh=not cache)
+            metadata_loaded = True
+        if metadata is None:
+            continue
+        catalog, parameters = metadata
+        spec_path = synthesize_scripted_rest_spec(
+            catalog,
+            parameters,
+            namespace=namespace,
+            api_name=api_name,
+            api_version=ver,
+            output_path=out_dir / "synthesized.json",
+            base_url=settings.base_url,
+        )
+        if not spec_path:
+            print(f"No operations found for {namespace}/{api_name}/{ver}")
+            continue
+        ok, msg = validate_openapi_spec(spec_path)
+        if ok:
+            print(f"Synthesized {namespace}/{api_name}/{ver}")
+            processed += 1
+        else:
+            print(f"Validation failed for {namespace}/{api_name}/{ver}: {msg}")
+
+
+@sn_app.command("synthesize-catalog")
+def sn_synthesize_catalog(
+    base_url: Optional[str] = typer.Option(None),
+    username: Optional[str] = typer.Option(None),
+    password: Optional[str] = typer.Option(None),
+    oauth_token: Optional[str] = typer.Option(None),
+    namespace: Optional[str] = typer.Option(None, help="Only synthesize APIs in this namespace"),
+    specs_dir: Optional[str] = typer.Option(None, help="Output directory (default: openapi_specs)"),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached metadata responses from the state dir"),
+    refresh: bool = typer.Option(False, help="Rebuild the cached catalog index instead of answering from it"),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
+) -> None:
+    run = _run_config(state_dir)
+    sn_kwargs: dict[str, Any] = {
+        "base_url": base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
+    }
+    if username is not None or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME"):
+        sn_kwargs["username"] = username or os.getenv("API_DISCOVERY_SERVICENOW_USERNAME")
+    if password is not None or os.getenv("API_DISCOVERY_SERVICENOW_PASSWORD"):
+        sn_kwargs["password"] = password or os.getenv("API_DISCOVERY_SERVICENOW_PASSWORD")
+    if oauth_token is not None or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN"):
+        sn_kwargs["oauth_token"] = oauth_token or os.getenv("API_DISCOVERY_SERVICENOW_OAUTH_TOKEN")
+    settings = ServiceNowSettings(**sn_kwargs)
+    metadata = _scripted_rest_metadata(settings, _http_cache(settings, cache, run.state_dir), run.state_dir, refresh=refresh or not cache)
+    if metadata is None:
+        raise typer.Exit(code=1)
+    index, parameters = metadata
+    entries = [e for e in index.entries() if namespace is None or e[0] == namespace]
+    written = synthesize_catalog_specs(index, parameters, specs_dir or run.specs_dir, entries=entries, base_url=settings.base_url)
+    invalid = 0
+    for (ns, api_name, ver), out_path in written.items():
+        ok, msg = validate_openapi_spec(out_path)
+        if not ok:
+            invalid += 1
+            print(f"Validation failed for {ns}/{api_name}/{ver}: {msg}")
+    print(f"Synthesized {len(written) - invalid} of {len(entries)} catalog entries ({len(entries) - len(written)} without operations)")
 
 
 @app.command()
-def status(platform: str = typer.Argument(...)) -> None:
-    run = RunConfig()
-    store = StateStore(run.state_dir, platform)
+def status(
+    platform: str = typer.Argument(...),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
+) -> None:
+    run = _run_config(state_dir)
+    store = open_state_store(run.state_dir, platform, backend=run.state_backend)
     state = store.load()
     print(f"Known: {len(state.known)} | Unknown: {len(state.unknown)}")
     for name, rec in list(state.known.items())[:10]:
         print(f"- {name}: {'verified' if rec.verified else 'discovered'}")
 
 
+@app.command(name="migrate-state")
+def migrate_state(
+    platform: str = typer.Argument(...),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
+) -> None:
+    # Imports every state.json under the platform dir (including per-version dirs) into state.sqlite
+    root = Path(state_dir or RunConfig().state_dir)
+    for json_path in sorted((root / platform).rglob("state.json")):
+        parts = json_path.parent.relative_to(root / platform).parts
+        names = dict(zip(("namespace", "api_name", "api_version"), parts))
+        store = SqliteStateStore(str(root), platform, **names)
+        count = migrate_json_state(store, json_path=json_path)
+        store.close()
+        print(f"Migrated {count} resources: {json_path} -> {store.db_path}")
+    print("Set API_DISCOVERY_STATE_BACKEND=sqlite to use the migrated state.")
+
+
+@app.command(name="compact-dictionaries")
+def compact_dictionaries(
+    platform: str = typer.Argument(...),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
+) -> None:
+    # Folds legacy per-directory caches into the instance dictionary store, then rewrites its
+    # pack keeping only content some state dir still references
+    root = Path(state_dir or RunConfig().state_dir)
+    folded = 0
+    for cache_dir in sorted(p for p in (root / platform).rglob("dictionaries") if p.is_dir()):
+        parts = cache_dir.parent.relative_to(root / platform).parts
+        folded += StateStore(str(root), platform, **dict(zip(("namespace", "api_name", "api_version"), parts))).fold_legacy_dictionaries()
+    store = StateStore(str(root), platform)
+    before, after = store.compact_dictionary_cache()
+    store.dictionaries.close()
+    print(f"{store.store_dir}: {len(store.dictionaries.tables())} dictionaries ({folded} folded in), {before} -> {after} bytes")
+
+
 @app.command(name="runtime-validate")
 def runtime_validate(
     platform: str = typer.Argument(...),
@@ -487,10 +775,12 @@ def runtime_validate(
     username: Optional[str] = typer.Option(None),
     password: Optional[str] = typer.Option(None),
     oauth_token: Optional[str] = typer.Option(None),
+    concurrency: Optional[int] = typer.Option(None, help="Max concurrent HTTP requests (default: MAX_CONCURRENCY, 4; 1 = sequential)"),
+    state_dir: Optional[str] = typer.Option(None, help="State directory (default: RunConfig.state_dir)"),
 ) -> None:
-    run = RunConfig()
+    run = _run_config(state_dir)
     if platform.lower() == "servicenow":
-        sn_kwargs: dict[str, object] = {}
+        sn_kwargs: dict[str, Any] = {}
         sn_kwargs["base_url"] = base_url or os.getenv("API_DISCOVERY_SERVICENOW_BASE_URL", "")
         if username is not None:
             sn_kwargs["username"] = username
@@ -498,8 +788,10 @@ def runtime_validate(
             sn_kwargs["password"] = password
         if oauth_token is not None:
             sn_kwargs["oauth_token"] = oauth_token
+        if concurrency is not None:
+            sn_kwargs["max_concurrency"] = concurrency
         settings = ServiceNowSettings(**sn_kwargs)
-        store = StateStore(run.state_dir, "servicenow")
+        store = open_state_store(run.state_dir, "servicenow", backend=run.state_backend)
         state = store.load()
         tables = list(state.known.keys()) or store.list_cached_tables()
         results = probe_servicenow_tables(settings, tables)
@@ -16,6 +16,21 @@ class CommonSettings(BaseSettings):
     request_timeout_seconds: float = Field(default=30.0, env="REQUEST_TIMEOUT_SECONDS")
     user_agent: str = Field(default="api-discovery/0.1", env="USER_AGENT")
     rate_limit_per_second: float = Field(default=5.0, env="RATE_LIMIT_PER_SECOND")
+    rate_limit_burst: int = Field(default=1, env="RATE_LIMIT_BURST")
+    # Processes pointing at the same file share one rate-limit budget
+    rate_limit_shared_file: Optional[str] = Field(default=None, env="RATE_LIMIT_SHARED_FILE")
+    # AIMD-adjust the rate from 429/503, Retry-After and X-RateLimit-* headers
+    adaptive_rate_limit: bool = Field(default=False, env="ADAPTIVE_RATE_LIMIT")
+    rate_limit_max_per_second: Optional[float] = Field(default=None, env="RATE_LIMIT_MAX_PER_SECOND")
+    # Requests in flight at once (still paced by the rate limiter); 1 keeps the sequential client
+    max_concurrency: int = Field(default=4, env="MAX_CONCURRENCY")
+    retry_max_attempts: int = Field(default=5, env="RETRY_MAX_ATTEMPTS")
+    # Total retries allowed per client (i.e. per run) across all requests
+    retry_budget: int = Field(default=500, env="RETRY_BUDGET")
+    circuit_breaker_threshold: int = Field(default=10, env="CIRCUIT_BREAKER_THRESHOLD")
+    circuit_breaker_reset_seconds: float = Field(default=30.0, env="CIRCUIT_BREAKER_RESET_SECONDS")
+    http_cache_ttl_seconds: float = Field(default=0.0, env="HTTP_CACHE_TTL_SECONDS")
+    http_cache_max_bytes: int = Field(default=256 * 1024 * 1024, env="HTTP_CACHE_MAX_BYTES")
 
 
 class ServiceNowSettings(CommonSettings):
@@ -25,6 +40,16 @@ class ServiceNowSettings(CommonSettings):
     oauth_token: Optional[str] = Field(default=None, env="SERVICENOW_OAUTH_TOKEN")
     allowlist: Optional[str] = Field(default=None, env="SERVICENOW_ALLOWLIST")
     denylist: Optional[str] = Field(default=None, env="SERVICENOW_DENYLIST")
+    # Incremental runs only see rows that changed, so deleted dictionary fields go unnoticed until a full
+    # run; --incremental falls back to one once the last full run is older than this (0 = never).
+    # API_DISCOVERY_FULL_SYNC_INTERVAL_HOURS
+    full_sync_interval_hours: float = 7 * 24
+    # Headless sessions abort images/fonts/stylesheets/media/analytics; entries here (resource
+    # types or URL substrings, comma-separated) are always let through
+    browser_lean: bool = Field(default=True, env="SERVICENOW_BROWSER_LEAN")
+    browser_allow_resources: Optional[str] = Field(default=None, env="SERVICENOW_BROWSER_ALLOW_RESOURCES")
+    # Saved browser logins (storage_state) are reused for this long before logging in again
+    browser_session_ttl_seconds: float = Field(default=8 * 3600, env="SERVICENOW_BROWSER_SESSION_TTL_SECONDS")
 
 
 class RunConfig(BaseSettings):
@@ -33,4 +58,6 @@ class RunConfig(BaseSettings):
     state_dir: str = Field(default=".state", env="STATE_DIR")
     specs_dir: str = Field(default="openapi_specs", env="SPECS_DIR")
     logs_dir: str = Field(default="var/log", env="LOGS_DIR")
+    # json (state.json, rewritten on save) or sqlite (state.sqlite, row-level upserts)
+    state_backend: str = Field(default="json", env="STATE_BACKEND")
 
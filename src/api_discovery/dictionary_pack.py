@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ClassVar, Dict, Iterator, List, Optional, Self, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: in-process locking only
+    fcntl = None  # type: ignore[assignment]
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on interpreter
+    try:
+        import zstandard as _zstd  # type: ignore[import-not-found,no-redef]
+    except ImportError:
+        _zstd = None
+
+PACK_NAME = "dictionaries.pack"
+INDEX_NAME = "dictionaries.idx"
+CODECS = ("zstd", "gzip")
+
+
+def default_codec() -> str:
+    return "zstd" if _zstd is not None else "gzip"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("zstd requested but neither compression.zstd nor zstandard is available")
+        return _zstd.compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("Pack entry is zstd-compressed but no zstd module is available")
+        return _zstd.decompress(data)
+    return gzip.decompress(data)
+
+
+def content_hash(fields: List[Dict[str, object]]) -> str:
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class FileLock:
+    # Reentrant, process-wide advisory lock (flock) shared by every object using the same path,
+    # so a compaction holding it can call write()/set() without deadlocking on itself.
+    _registry: ClassVar[Dict[str, "FileLock"]] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fh: Optional[object] = None
+
+    @classmethod
+    def for_path(cls, path: str | Path) -> "FileLock":
+        key = str(Path(path).resolve())
+        with cls._registry_lock:
+            lock = cls._registry.get(key)
+            if lock is None:
+                lock = cls._registry[key] = cls(Path(key))
+            return lock
+
+    def __enter__(self) -> Self:
+        self._rlock.acquire()
+        if self._depth == 0:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fh = self.path.open("a")
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            self._fh = fh
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fh is not None:
+            fh, self._fh = self._fh, None
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)  # type: ignore[attr-defined]
+            fh.close()  # type: ignore[attr-defined]
+        self._rlock.release()
+
+
+class _JsonlTail:
+    # Follows an append-only JSONL file: only complete lines past the last read position are
+    # parsed, and a replaced file (new inode, e.g. after compaction) is read again from the start.
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._ino = -1
+        self._pos = 0
+
+    def read_new(self) -> Tuple[bool, List[Dict[str, object]]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            reset, self._ino, self._pos = self._ino != -1, -1, 0
+            return reset, []
+        reset = st.st_ino != self._ino or st.st_size < self._pos
+        if reset:
+            self._ino, self._pos = st.st_ino, 0
+        if st.st_size == self._pos:
+            return reset, []
+        with self.path.open("rb") as fh:
+            fh.seek(self._pos)
+            data = fh.read()
+        end = data.rfind(b"\n") + 1  # a torn last line is left for the next read
+        self._pos += end
+        records: List[Dict[str, object]] = []
+        for line in data[:end].splitlines():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rec, dict):
+                records.append(rec)
+        return reset, records
+
+    def forget(self) -> None:
+        self._ino, self._pos = -1, 0
+
+
+@dataclass(frozen=True)
+class PackEntry:
+    offset: int
+    length: int
+    sha256: str
+    codec: str
+
+
+def _index_line(table: str, entry: PackEntry) -> str:
+    return json.dumps({"t": table, "o": entry.offset, "n": entry.length, "h": entry.sha256, "c": entry.codec}) + "\n"
+
+
+class DictionaryPack:
+    # One append-only segment of compressed per-table records plus an append-only JSONL index
+    # (table -> offset, length, content hash, codec); the last index line for a table wins.
+    # Rewriting a table appends a new record, so compact() reclaims the superseded ones.
+    # Several stores (and processes) may share a pack: writes and compaction hold the file
+    # lock, and the index is re-synced from disk before it is used.
+    def __init__(self, directory: str | Path, *, codec: Optional[str] = None, lock: Optional[FileLock] = None) -> None:
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.pack_path = self.dir / PACK_NAME
+        self.index_path = self.dir / INDEX_NAME
+        self.codec = codec or default_codec()
+        if self.codec not in CODECS:
+            raise ValueError(f"Unknown codec {self.codec!r}; expected one of {', '.join(CODECS)}")
+        self.lock = lock or FileLock.for_path(self.dir / ".lock")
+        self._map: Optional[mmap.mmap] = None
+        self._index: Dict[str, PackEntry] = {}
+        self._tail = _JsonlTail(self.index_path)
+        self._sync()
+
+    def _sync(self) -> None:
+        with self.lock:
+            reset, records = self._tail.read_new()
+            if reset:
+                # Another store compacted the pack: offsets changed and the old mapping is stale
+                self._index = {}
+                self._close_map()
+            size = self.pack_path.stat().st_size if self.pack_path.exists() else 0
+            for rec in records:
+                try:
+                    entry = PackEntry(int(rec["o"]), int(rec["n"]), str(rec["h"]), str(rec["c"]))  # type: ignore[call-overload]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if entry.offset + entry.length <= size:
+                    self._index[str(rec["t"])] = entry
+
+    def __contains__(self, table: str) -> bool:
+        self._sync()
+        return table in self._index
+
+    def tables(self) -> List[str]:
+        self._sync()
+        return list(self._index)
+
+    def entry(self, table: str) -> Optional[PackEntry]:
+        self._sync()
+        return self._index.get(table)
+
+    def write(self, table: str, fields: List[Dict[str, object]], *, digest: Optional[str] = None) -> PackEntry:
+        digest = digest or content_hash(fields)
+        with self.lock:
+            self._sync()
+            current = self._index.get(table)
+            if current is not None and current.sha256 == digest:
+                return current
+            blob = _compress(json.dumps({"fields": fields}, separators=(",", ":")).encode(), self.codec)
+            # Record first, index line second: a crash in between leaves an unreferenced record, never a dangling entry
+            with self.pack_path.open("ab") as pack:
+                offset = pack.seek(0, os.SEEK_END)
+                pack.write(blob)
+            entry = PackEntry(offset, len(blob), digest, self.codec)
+            with self.index_path.open("a") as idx:
+                idx.write(_index_line(table, entry))
+            self._sync()
+            return entry
+
+    def _view(self, end: int) -> mmap.mmap:
+        # Remap only when the pack has grown past the current mapping
+        if self._map is None or len(self._map) < end:
+            self._close_map()
+            with self.pack_path.open("rb") as fh:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _blob(self, table: str) -> Optional[Tuple[PackEntry, bytes]]:
+        # Index sync and slice under the lock, so a concurrent compaction cannot swap the pack in between
+        with self.lock:
+            self._sync()
+            entry = self._index.get(table)
+            if entry is None:
+                return None
+            return entry, self._view(entry.offset + entry.length)[entry.offset : entry.offset + entry.length]
+
+    def read(self, table: str) -> List[Dict[str, object]]:
+        found = self._blob(table)
+        if found is None:
+            return []
+        entry, blob = found
+        try:
+            return list(json.loads(_decompress(blob, entry.codec)).get("fields", []))
+        except Exception:  # noqa: BLE001
+            # A damaged record reads as a cache miss, so the table is simply fetched again
+            return []
+
+    def items(self) -> Iterator[Tuple[str, List[Dict[str, object]]]]:
+        for table in self.tables():
+            yield table, self.read(table)
+
+    def garbage_bytes(self) -> int:
+        self._sync()
+        size = self.pack_path.stat().st_size if self.pack_path.exists() else 0
+        return size - sum(e.length for e in self._index.values())
+
+    def compact(self, keep: Optional[Set[str]] = None) -> Tuple[int, int]:
+        # Rewrites live records (re-encoded with the current codec) into a fresh pack and index,
+        # then swaps both in with os.replace; with ``keep``, other keys are dropped as well.
+        # Runs under the file lock on an index freshly synced from disk. Returns (bytes before, bytes after).
+        tmp_pack = self.pack_path.with_suffix(".pack.tmp")
+        tmp_index = self.index_path.with_suffix(".idx.tmp")
+        index: Dict[str, PackEntry] = {}
+        with self.lock:
+            self._sync()
+            before = self.pack_path.stat().st_size if self.pack_path.exists() else 0
+            with tmp_pack.open("wb") as pack, tmp_index.open("w") as idx:
+                for table in sorted(self._index):
+                    if keep is not None and table not in keep:
+                        continue
+                    entry = self._index[table]
+                    blob = self._view(entry.offset + entry.length)[entry.offset : entry.offset + entry.length]
+                    if entry.codec != self.codec:
+                        blob = _compress(_decompress(blob, entry.codec), self.codec)
+                    new = PackEntry(pack.tell(), len(blob), entry.sha256, self.codec)
+                    pack.write(blob)
+                    idx.write(_index_line(table, new))
+                    index[table] = new
+                pack.flush()
+                os.fsync(pack.fileno())
+                idx.flush()
+                os.fsync(idx.fileno())
+            self._close_map()
+            os.replace(tmp_pack, self.pack_path)
+            os.replace(tmp_index, self.index_path)
+            self._index = {}
+            self._tail.forget()
+            self._sync()
+            return before, self.pack_path.stat().st_size
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def close(self) -> None:
+        with self.lock:
+            self._close_map()
+
+
+class RefIndex:
+    # Append-only JSONL map of table -> content hash (last line wins); the per-directory half
+    # of the content-addressed dictionary store, next to a DictionaryPack keyed by hash.
+    # ``lock`` should be the pack's lock, so compaction sees every ref written before it.
+    def __init__(self, path: str | Path, *, lock: Optional[FileLock] = None) -> None:
+        self.path = Path(path)
+        self.lock = lock or FileLock.for_path(self.path.with_name(".lock"))
+        self._refs: Dict[str, str] = {}
+        self._tail = _JsonlTail(self.path)
+        self._sync()
+
+    def _sync(self) -> None:
+        reset, records = self._tail.read_new()
+        if reset:
+            self._refs = {}
+        for rec in records:
+            if "t" in rec and "h" in rec:
+                self._refs[str(rec["t"])] = str(rec["h"])
+
+    def get(self, table: str) -> Optional[str]:
+        self._sync()
+        return self._refs.get(table)
+
+    def set(self, table: str, digest: str) -> None:
+        with self.lock:
+            self._sync()
+            if self._refs.get(table) == digest:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as fh:
+                fh.write(json.dumps({"t": table, "h": digest}) + "\n")
+            self._sync()
+
+    def tables(self) -> List[str]:
+        self._sync()
+        return list(self._refs)
+
+    def digests(self) -> Set[str]:
+        self._sync()
+        return set(self._refs.values())
+
+    def compact(self) -> None:
+        with self.lock:
+            self._sync()
+            if not self.path.exists():
+                return
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w") as fh:
+                for table in sorted(self._refs):
+                    fh.write(json.dumps({"t": table, "h": self._refs[table]}) + "\n")
+            os.replace(tmp, self.path)
+            self._tail.forget()
+            self._sync()
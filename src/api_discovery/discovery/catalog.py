@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..http import AsyncHTTPClient, HTTPClient
+from .table_api import (
+    aiter_table_keyset,
+    fetch_all_rows,
+    fetch_all_rows_async,
+    iter_table_keyset,
+)
+
+CATALOG_INDEX_FORMAT = 1
+
+_DEFINITION_FIELDS = "sys_id,name,namespace,base_path,api_id,version,active,consumes,produces"
+_VERSION_FIELDS = "sys_id,web_service,version,in_url,active"
+# Instances differ in naming (web_service vs web_service_definition, path vs operation_uri); ask for both
+_OPERATION_FIELDS = (
+    "sys_id,name,http_method,relative_path,path,operation_uri,web_service,web_service_definition,web_service_version,"
+    "requires_authentication,produces,consumes"
+)
+
+
+def _ref(value: object) -> str:
+    # Reference fields come back as {"value": sys_id, "link": ...} unless links are excluded
+    if isinstance(value, dict):
+        return str(value.get("value") or "")
+    return str(value or "")
+
+
+def _truthy(value: object) -> bool:
+    return str(value).lower() in ("true", "1")
+
+
+@dataclass
+class CatalogOperation:
+    sys_id: str
+    name: str
+    http_method: str
+    relative_path: str
+    operation_uri: str = ""
+    requires_authentication: bool = True
+    produces: str = ""
+    consumes: str = ""
+
+
+@dataclass
+class CatalogVersion:
+    version: str
+    sys_id: str = ""
+    in_url: str = ""
+    active: bool = True
+    operations: List[CatalogOperation] = field(default_factory=list)
+
+
+@dataclass
+class CatalogApi:
+    name: str
+    namespace: str
+    sys_ids: List[str] = field(default_factory=list)
+    api_id: str = ""
+    base_path: str = ""
+    consumes: str = ""
+    produces: str = ""
+    versions: Dict[str, CatalogVersion] = field(default_factory=dict)
+
+
+@dataclass
+class CatalogIndex:
+    # namespace -> api name -> CatalogApi (-> version -> operations)
+    namespaces: Dict[str, Dict[str, CatalogApi]] = field(default_factory=dict)
+    base_url: str = ""
+    built_at: float = 0.0
+    has_operations: bool = False
+    # Namespaces only seen in sys_ws_version.in_url (no usable definition row); listed, but hold no APIs
+    orphan_namespaces: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_rows(
+        cls,
+        definitions: List[Dict[str, object]],
+        versions: List[Dict[str, object]],
+        operations: Optional[Iterable[Dict[str, object]]] = None,
+        *,
+        base_url: str = "",
+    ) -> "CatalogIndex":
+        versions_by_def: Dict[str, List[Dict[str, object]]] = {}
+        for row in versions:
+            versions_by_def.setdefault(_ref(row.get("web_service")), []).append(row)
+
+        index = cls(base_url=base_url, built_at=time.time(), has_operations=operations is not None)
+        by_version_id: Dict[str, CatalogVersion] = {}
+        by_definition: Dict[str, CatalogApi] = {}
+        for d in definitions:
+            def_id = str(d.get("sys_id") or "")
+            name = str(d.get("name") or "")
+            if not name:
+                continue
+            def_versions = versions_by_def.get(def_id, [])
+            namespace = _definition_namespace(d, def_versions)
+            if not namespace:
+                continue
+            api = index.namespaces.setdefault(namespace, {}).setdefault(
+                name,
+                CatalogApi(
+                    name=name,
+                    namespace=namespace,
+                    api_id=str(d.get("api_id") or ""),
+                    base_path=str(d.get("base_path") or ""),
+                    consumes=str(d.get("consumes") or ""),
+                    produces=str(d.get("produces") or ""),
+                ),
+            )
+            api.sys_ids.append(def_id)
+            by_definition[def_id] = api
+            if not def_versions:
+                # Definitions without explicit version rows still serve their base path
+                def_versions = [{"version": d.get("version") or "v1", "in_url": d.get("base_path") or "", "active": d.get("active", True)}]
+            for v in def_versions:
+                ver_name = _version_name(v)
+                if not ver_name:
+                    continue
+                ver = api.versions.setdefault(
+                    ver_name,
+                    CatalogVersion(
+                        version=ver_name,
+                        sys_id=str(v.get("sys_id") or ""),
+                        in_url=str(v.get("in_url") or ""),
+                        active=_truthy(v.get("active", True)),
+                    ),
+                )
+                if ver.sys_id:
+                    by_version_id[ver.sys_id] = ver
+        orphans = {_in_url_namespace(v) for v in versions} - set(index.namespaces) - {""}
+        index.orphan_namespaces = sorted(orphans)
+
+        for op in operations or []:
+            rec = CatalogOperation(
+                sys_id=str(op.get("sys_id") or ""),
+                name=str(op.get("name") or ""),
+                http_method=str(op.get("http_method") or "").upper(),
+                relative_path=str(op.get("relative_path") or ""),
+                operation_uri=str(op.get("operation_uri") or op.get("path") or ""),
+                requires_authentication=_truthy(op.get("requires_authentication", True)),
+                produces=str(op.get("produces") or ""),
+                consumes=str(op.get("consumes") or ""),
+            )
+            target = by_version_id.get(_ref(op.get("web_service_version")))
+            if target is not None:
+                target.operations.append(rec)
+                continue
+            # Unversioned operations apply to every version of their definition
+            owner = by_definition.get(_ref(op.get("web_service_definition") or op.get("web_service")))
+            if owner is not None:
+                for ver in owner.versions.values():
+                    ver.operations.append(rec)
+        return index
+
+    @classmethod
+    def build(cls, client: HTTPClient, *, include_operations: bool = True) -> "CatalogIndex":
+        definitions = fetch_all_rows(client, "sys_ws_definition", fields=_DEFINITION_FIELDS)
+        versions = fetch_all_rows(client, "sys_ws_version", fields=_VERSION_FIELDS)
+        # Operations are the largest of the three tables; stream them straight into the index
+        operations = iter_table_keyset(client, "sys_ws_operation", fields=_OPERATION_FIELDS) if include_operations else None
+        return cls.from_rows(definitions, versions, operations, base_url=client.base_url)
+
+    @classmethod
+    async def build_async(cls, client: AsyncHTTPClient, *, include_operations: bool = True) -> "CatalogIndex":
+        pulls = [
+            fetch_all_rows_async(client, "sys_ws_definition", fields=_DEFINITION_FIELDS),
+            fetch_all_rows_async(client, "sys_ws_version", fields=_VERSION_FIELDS),
+        ]
+        if include_operations:
+            pulls.append(_collect(aiter_table_keyset(client, "sys_ws_operation", fields=_OPERATION_FIELDS)))
+        results = await asyncio.gather(*pulls)
+        operations = results[2] if include_operations else None
+        return cls.from_rows(results[0], results[1], operations, base_url=client.base_url)
+
+    def list_namespaces(self) -> List[str]:
+        if not self.namespaces and not self.orphan_namespaces:
+            return []
+        return sorted(set(self.namespaces) | set(self.orphan_namespaces) | {"now"})  # always include Now platform namespace
+
+    def list_apis(self, namespace: str) -> List[str]:
+        return sorted(self.namespaces.get(namespace, {}))
+
+    def list_versions(self, namespace: str, api_name: str) -> List[str]:
+        api = self.namespaces.get(namespace, {}).get(api_name)
+        return sorted(api.versions) if api else []
+
+    def get_api(self, namespace: str, api_name: str) -> Optional[CatalogApi]:
+        return self.namespaces.get(namespace, {}).get(api_name)
+
+    def operations(self, namespace: str, api_name: str, version: str) -> List[CatalogOperation]:
+        api = self.get_api(namespace, api_name)
+        ver = api.versions.get(version) if api else None
+        return list(ver.operations) if ver else []
+
+    def entries(self) -> Iterator[Tuple[str, str, str]]:
+        for namespace in sorted(self.namespaces):
+            for api_name in sorted(self.namespaces[namespace]):
+                for version in sorted(self.namespaces[namespace][api_name].versions):
+                    yield namespace, api_name, version
+
+    def save(self, path: str | Path) -> Path:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "format": CATALOG_INDEX_FORMAT,
+            "base_url": self.base_url,
+            "built_at": self.built_at,
+            "has_operations": self.has_operations,
+            "orphan_namespaces": self.orphan_namespaces,
+            "namespaces": {ns: {name: asdict(api) for name, api in apis.items()} for ns, apis in self.namespaces.items()},
+        }
+        tmp = out.with_suffix(out.suffix + ".tmp")
+        tmp.write_text(json.dumps(payload))
+        tmp.replace(out)
+        return out
+
+    @classmethod
+    def load(cls, path: str | Path) -> Optional["CatalogIndex"]:
+        p = Path(path)
+        if not p.exists():
+            return None
+        try:
+            data = json.loads(p.read_text())
+        except ValueError:
+            return None
+        if data.get("format") != CATALOG_INDEX_FORMAT:
+            return None
+        namespaces: Dict[str, Dict[str, CatalogApi]] = {}
+        for ns, apis in data.get("namespaces", {}).items():
+            for name, raw in apis.items():
+                versions = {
+                    vn: CatalogVersion(**{**v, "operations": [CatalogOperation(**o) for o in v.get("operations", [])]})
+                    for vn, v in raw.get("versions", {}).items()
+                }
+                namespaces.setdefault(ns, {})[name] = CatalogApi(**{**raw, "versions": versions})
+        return cls(
+            namespaces=namespaces,
+            base_url=data.get("base_url", ""),
+            built_at=float(data.get("built_at", 0.0)),
+            has_operations=bool(data.get("has_operations", False)),
+            orphan_namespaces=list(data.get("orphan_namespaces", [])),
+        )
+
+    def is_fresh(self, max_age_seconds: float, *, base_url: str = "", need_operations: bool = False) -> bool:
+        if base_url and self.base_url and self.base_url.rstrip("/") != base_url.rstrip("/"):
+            return False
+        if need_operations and not self.has_operations:
+            return False
+        return time.time() - self.built_at < max_age_seconds
+
+
+async def _collect(rows: AsyncIterator[Dict[str, object]]) -> List[Dict[str, object]]:
+    return [row async for row in rows]
+
+
+def _definition_namespace(d: Dict[str, object], versions: List[Dict[str, object]]) -> str:
+    if d.get("namespace"):
+        return str(d["namespace"])
+    # try /api/{ns}/{api} on the definition, then on any version's in_url
+    for candidate in [d.get("base_path")] + [v.get("in_url") for v in versions]:
+        m = re.match(r"/api/([^/]+)/", str(candidate or ""))
+        if m:
+            return m.group(1)
+    return ""
+
+
+def _in_url_namespace(v: Dict[str, object]) -> str:
+    m = re.match(r"/api/([^/]+)/", str(v.get("in_url") or ""))
+    return m.group(1) if m else ""
+
+
+def _version_name(v: Dict[str, object]) -> str:
+    if v.get("version"):
+        return str(v["version"])
+    m = re.match(r"/api/[^/]+/[^/]+/([^/]+)", str(v.get("in_url") or ""))
+    return m.group(1) if m else ""
+
+
+def load_or_build_catalog_index(
+    client: HTTPClient, path: str | Path, *, max_age_seconds: float = 6 * 3600, refresh: bool = False, include_operations: bool = False
+) -> CatalogIndex:
+    if not refresh:
+        cached = CatalogIndex.load(path)
+        if cached and cached.is_fresh(max_age_seconds, base_url=client.base_url, need_operations=include_operations):
+            return cached
+    index = CatalogIndex.build(client, include_operations=include_operations)
+    index.save(path)
+    return index
+
+
+async def load_or_build_catalog_index_async(
+    client: AsyncHTTPClient, path: str | Path, *, max_age_seconds: float = 6 * 3600, refresh: bool = False, include_operations: bool = False
+) -> CatalogIndex:
+    if not refresh:
+        cached = CatalogIndex.load(path)
+        if cached and cached.is_fresh(max_age_seconds, base_url=client.base_url, need_operations=include_operations):
+            return cached
+    index = await CatalogIndex.build_async(client, include_operations=include_operations)
+    index.save(path)
+    return index
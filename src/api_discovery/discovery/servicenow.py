@@ -1,12 +1,30 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Tuple, Set
+import asyncio
+import logging
 import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, cast
+
+import httpx
 from bs4 import BeautifulSoup
 
-from ..config import ServiceNowSettings, RunConfig
-from ..http import HTTPClient, AuthConfig
-from ..state import StateStore, Evidence
+from ..config import RunConfig, ServiceNowSettings
+from ..dictionary_pack import content_hash
+from ..http import AsyncHTTPClient, AuthConfig, HTTPClient
+from ..state import DiscoveryState, StateStore, evidence, open_state_store
+from .catalog import CatalogIndex
+from .table_api import (
+    aiter_table_keyset,
+    aiter_table_rows,
+    chunked,
+    in_query,
+    iter_table_keyset,
+    iter_table_rows,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def _sn_auth(settings: ServiceNowSettings) -> AuthConfig:
@@ -17,20 +35,72 @@ def _sn_auth(settings: ServiceNowSettings) -> AuthConfig:
     return AuthConfig()
 
 
-def enumerate_tables(client: HTTPClient) -> List[Dict[str, str]]:
-    # sys_db_object contains table metadata
-    resp = client.get("/api/now/table/sys_db_object", params={"sysparm_fields": "name,label,super_class"})
-    data = resp.json()
-    return data.get("result", [])
+_TABLE_FIELDS = "name,label,super_class"
+_UPDATED_FIELD = "sys_updated_on"
+
+
+class _HighWater:
+    # Newest sys_updated_on seen while rows stream past. The field is popped so tracked rows
+    # look exactly like untracked ones (and cached dictionaries stay unchanged).
+    def __init__(self, value: str = "") -> None:
+        self.value = value
+
+    def observe(self, row: Dict[str, object]) -> Dict[str, object]:
+        stamp = str(row.pop(_UPDATED_FIELD, "") or "")
+        self.value = max(self.value, stamp)
+        return row
+
+
+def _tracked_fields(fields: str, high_water: Optional[_HighWater]) -> str:
+    return f"{fields},{_UPDATED_FIELD}" if high_water is not None else fields
+
+
+def _changed_since(stamp: str) -> str:
+    # Inclusive: sys_updated_on has one-second resolution, so a row committed in the same second as the
+    # watermark (after the previous run read that second) would be missed by ">". Re-reading the
+    # watermark second costs a few rows per run; re-fetching those tables is idempotent.
+    return f"{_UPDATED_FIELD}>={stamp}"
+
+
+def _changed_rows(client: HTTPClient, table: str, fields: str, mark: _HighWater) -> List[Dict[str, object]]:
+    query = _changed_since(mark.value)
+    return [mark.observe(r) for r in iter_table_keyset(client, table, fields=_tracked_fields(fields, mark), query=query)]
+
+
+async def _changed_rows_async(client: AsyncHTTPClient, table: str, fields: str, mark: _HighWater) -> List[Dict[str, object]]:
+    query = _changed_since(mark.value)
+    return [mark.observe(r) async for r in aiter_table_keyset(client, table, fields=_tracked_fields(fields, mark), query=query)]
+
+
+def _table_names(client: HTTPClient) -> Set[str]:
+    # Name-only keyset walk of sys_db_object: the reference set deleted tables are reconciled against
+    return {str(r.get("name") or "") for r in iter_table_keyset(client, "sys_db_object", fields="name")} - {""}
+
+
+async def _table_names_async(client: AsyncHTTPClient) -> Set[str]:
+    return {str(r.get("name") or "") async for r in aiter_table_keyset(client, "sys_db_object", fields="name")} - {""}
+
+
+def enumerate_tables(client: HTTPClient, *, high_water: Optional[_HighWater] = None) -> List[Dict[str, str]]:
+    # sys_db_object contains table metadata; paged so large instances are not truncated
+    rows = iter_table_rows(client, "sys_db_object", fields=_tracked_fields(_TABLE_FIELDS, high_water))
+    return cast(List[Dict[str, str]], [high_water.observe(r) if high_water else r for r in rows])
+
+
+async def enumerate_tables_async(client: AsyncHTTPClient, *, high_water: Optional[_HighWater] = None) -> List[Dict[str, str]]:
+    rows = aiter_table_rows(client, "sys_db_object", fields=_tracked_fields(_TABLE_FIELDS, high_water))
+    return cast(List[Dict[str, str]], [high_water.observe(r) if high_water else r async for r in rows])
+
+
+_EXPLORER_PATHS = [
+    "/sn_rpexplorer.do",
+    "/rest_api_explorer.do",
+    "/now/nav/ui/classic/params/target/rest_api_explorer.do",
+]
 
 
 def _fetch_explorer_html(client: HTTPClient) -> str:
-    candidates = [
-        "/sn_rpexplorer.do",
-        "/rest_api_explorer.do",
-        "/now/nav/ui/classic/params/target/rest_api_explorer.do",
-    ]
-    for path in candidates:
+    for path in _EXPLORER_PATHS:
         try:
             resp = client.get(path)
             if resp.status_code == 200 and "<html" in resp.text.lower():
@@ -40,6 +110,17 @@ def _fetch_explorer_html(client: HTTPClient) -> str:
     return ""
 
 
+async def _fetch_explorer_html_async(client: AsyncHTTPClient) -> str:
+    for path in _EXPLORER_PATHS:
+        try:
+            resp = await client.get(path)
+            if resp.status_code == 200 and "<html" in resp.text.lower():
+                return resp.text
+        except Exception:  # noqa: BLE001
+            continue
+    return ""
+
+
 def _extract_select_options(html: str, label_keywords: List[str]) -> List[str]:
     if not html:
         return []
@@ -61,39 +142,7 @@ def _extract_select_options(html: str, label_keywords: List[str]) -> List[str]:
     return []
 
 
-def list_namespaces(client: HTTPClient) -> List[str]:
-    # Metadata-first via sys tables; fallback to GUI parsing
-    try:
-        ns: Set[str] = set()
-        # Scripted REST APIs
-        resp = client.get(
-            "/api/now/table/sys_ws_definition",
-            params={"sysparm_fields": "namespace,base_path,name", "sysparm_limit": 10000},
-        )
-        for row in resp.json().get("result", []) or []:
-            if row.get("namespace"):
-                ns.add(str(row["namespace"]))
-            if row.get("base_path"):
-                # try /api/{ns}/{api}
-                m = re.search(r"/api/([^/]+)/", str(row["base_path"]))
-                if m:
-                    ns.add(m.group(1))
-        # Versions may include in_url like /api/{ns}/{api}/{ver}
-        resp2 = client.get(
-            "/api/now/table/sys_ws_version",
-            params={"sysparm_fields": "in_url", "sysparm_limit": 10000},
-        )
-        for row in resp2.json().get("result", []) or []:
-            m = re.search(r"/api/([^/]+)/", str(row.get("in_url") or ""))
-            if m:
-                ns.add(m.group(1))
-        if ns:
-            ns.add("now")  # always include Now platform namespace
-            return sorted(ns)
-    except Exception:
-        pass
-    # Fallback: try parsing explorer HTML as last resort
-    html = _fetch_explorer_html(client)
+def _namespaces_from_html(html: str) -> List[str]:
     options = _extract_select_options(html, ["namespace"]) or []
     uniq: List[str] = []
     for v in options:
@@ -102,29 +151,7 @@ def list_namespaces(client: HTTPClient) -> List[str]:
     return uniq or ["now"]
 
 
-def list_api_namespaces(client: HTTPClient, namespace: str) -> List[str]:
-    # Metadata-first: sys_ws_definition filtered by namespace from field/base_path/in_url
-    try:
-        defs = client.get(
-            "/api/now/table/sys_ws_definition",
-            params={"sysparm_fields": "sys_id,name,namespace,base_path", "sysparm_limit": 10000},
-        ).json().get("result", []) or []
-        names: Set[str] = set()
-        for d in defs:
-            ns = str(d.get("namespace") or "")
-            if ns:
-                if ns == namespace:
-                    names.add(str(d.get("name")))
-                    continue
-            bp = str(d.get("base_path") or "")
-            m = re.match(r"/api/([^/]+)/([^/]+)/?", bp)
-            if m and m.group(1) == namespace:
-                names.add(str(d.get("name")))
-        if names:
-            return sorted(names)
-    except Exception:
-        pass
-    html = _fetch_explorer_html(client)
+def _apis_from_html(html: str) -> List[str]:
     apis = _extract_select_options(html, ["api name", "api"]) or []
     cleaned: List[str] = []
     for a in apis:
@@ -133,38 +160,7 @@ def list_api_namespaces(client: HTTPClient, namespace: str) -> List[str]:
     return cleaned
 
 
-def list_api_versions(client: HTTPClient, namespace: str, api_name: str) -> List[str]:
-    # Metadata-first: resolve API definitions, then list sys_ws_version for those definitions
-    try:
-        defs = client.get(
-            "/api/now/table/sys_ws_definition",
-            params={"sysparm_fields": "sys_id,name,namespace,base_path", "sysparm_limit": 10000},
-        ).json().get("result", []) or []
-        def_ids: List[str] = []
-        for d in defs:
-            name = str(d.get("name") or "")
-            ns = str(d.get("namespace") or "")
-            if name == api_name and (ns == namespace or (re.match(r"/api/([^/]+)/", str(d.get("base_path") or "")) and re.match(r"/api/([^/]+)/", str(d.get("base_path") or "")).group(1) == namespace)):
-                def_ids.append(str(d.get("sys_id")))
-        if def_ids:
-            q = 'web_serviceIN' + ','.join(def_ids)
-            vers = client.get(
-                "/api/now/table/sys_ws_version",
-                params={"sysparm_query": q, "sysparm_fields": "version,in_url", "sysparm_limit": 10000},
-            ).json().get("result", []) or []
-            vals: Set[str] = set()
-            for v in vers:
-                if v.get("version"):
-                    vals.add(str(v["version"]))
-                elif v.get("in_url"):
-                    m = re.match(r"/api/[^/]+/[^/]+/([^/]+)", str(v["in_url"]))
-                    if m:
-                        vals.add(m.group(1))
-            if vals:
-                return sorted(vals)
-    except Exception:
-        pass
-    html = _fetch_explorer_html(client)
+def _versions_from_html(html: str) -> List[str]:
     versions = _extract_select_options(html, ["version", "api version"]) or []
     cleaned: List[str] = []
     for v in versions:
@@ -173,19 +169,269 @@ def list_api_versions(client: HTTPClient, namespace: str, api_name: str) -> List
     return cleaned or ["v1"]
 
 
-def fetch_dictionary_for_table(client: HTTPClient, table_name: str) -> List[Dict[str, object]]:
-    # sys_dictionary contains field-level metadata
-    query = f"name={table_name}^internal_typeISNOTEMPTY"
-    resp = client.get(
-        "/api/now/table/sys_dictionary",
-        params={
-            "sysparm_fields": "element,column_label,mandatory,internal_type,max_length,reference,read_only,attributes",
-            "sysparm_query": query,
-            "sysparm_limit": 10000,
-        },
+def _index_or_build(client: HTTPClient, index: Optional[CatalogIndex]) -> Optional[CatalogIndex]:
+    if index is not None:
+        return index
+    try:
+        return CatalogIndex.build(client, include_operations=False)
+    except (httpx.HTTPError, OSError, ValueError) as exc:
+        logger.warning("Catalog index unavailable, falling back to the REST API Explorer page: %s", exc)
+        return None
+
+
+async def _index_or_build_async(client: AsyncHTTPClient, index: Optional[CatalogIndex]) -> Optional[CatalogIndex]:
+    if index is not None:
+        return index
+    try:
+        return await CatalogIndex.build_async(client, include_operations=False)
+    except (httpx.HTTPError, OSError, ValueError) as exc:
+        logger.warning("Catalog index unavailable, falling back to the REST API Explorer page: %s", exc)
+        return None
+
+
+# Listers answer from a CatalogIndex (metadata-first); the explorer HTML is only a last resort.
+# Pass a prebuilt index when calling them repeatedly to avoid re-pulling sys_ws_* per call.
+def list_namespaces(client: HTTPClient, index: Optional[CatalogIndex] = None) -> List[str]:
+    idx = _index_or_build(client, index)
+    ns = idx.list_namespaces() if idx else []
+    return ns or _namespaces_from_html(_fetch_explorer_html(client))
+
+
+def list_api_namespaces(client: HTTPClient, namespace: str, index: Optional[CatalogIndex] = None) -> List[str]:
+    idx = _index_or_build(client, index)
+    names = idx.list_apis(namespace) if idx else []
+    return names or _apis_from_html(_fetch_explorer_html(client))
+
+
+def list_api_versions(client: HTTPClient, namespace: str, api_name: str, index: Optional[CatalogIndex] = None) -> List[str]:
+    idx = _index_or_build(client, index)
+    vals = idx.list_versions(namespace, api_name) if idx else []
+    return vals or _versions_from_html(_fetch_explorer_html(client))
+
+
+async def list_namespaces_async(client: AsyncHTTPClient, index: Optional[CatalogIndex] = None) -> List[str]:
+    idx = await _index_or_build_async(client, index)
+    ns = idx.list_namespaces() if idx else []
+    return ns or _namespaces_from_html(await _fetch_explorer_html_async(client))
+
+
+async def list_api_namespaces_async(client: AsyncHTTPClient, namespace: str, index: Optional[CatalogIndex] = None) -> List[str]:
+    idx = await _index_or_build_async(client, index)
+    names = idx.list_apis(namespace) if idx else []
+    return names or _apis_from_html(await _fetch_explorer_html_async(client))
+
+
+async def list_api_versions_async(
+    client: AsyncHTTPClient, namespace: str, api_name: str, index: Optional[CatalogIndex] = None
+) -> List[str]:
+    idx = await _index_or_build_async(client, index)
+    vals = idx.list_versions(namespace, api_name) if idx else []
+    return vals or _versions_from_html(await _fetch_explorer_html_async(client))
+
+
+_DICTIONARY_FIELDS = "element,column_label,mandatory,internal_type,max_length,reference,read_only,attributes"
+_DICTIONARY_QUERY = "internal_typeISNOTEMPTY"
+
+
+def _filter_tables(settings: ServiceNowSettings, tables: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    # Apply allow/deny filtering if configured
+    allow: Iterable[str] = [t.strip() for t in settings.allowlist.split(",") if t.strip()] if settings.allowlist else []
+    deny: Iterable[str] = [t.strip() for t in settings.denylist.split(",") if t.strip()] if settings.denylist else []
+    return [t for t in tables if (not allow or t.get("name") in allow) and (t.get("name") not in deny)]
+
+
+_TABLE_EVIDENCE = evidence(("metadata:sys_db_object", "metadata:sys_dictionary"), 0.7)
+
+
+def _record_table(store: StateStore, state: DiscoveryState, table: Dict[str, str], fields: List[Dict[str, object]]) -> None:
+    store.upsert_resource(
+        state,
+        name=table["name"],
+        kind="table",
+        verified=False,
+        evidence=_TABLE_EVIDENCE,
+        meta={"label": table.get("label"), "super_class": table.get("super_class"), "field_count": len(fields)},
     )
-    data = resp.json()
-    return data.get("result", [])
+
+
+def _add_to_group(grouped: Dict[str, List[Dict[str, object]]], row: Dict[str, object]) -> None:
+    name = str(row.pop("name", "") or "")
+    if name in grouped:
+        grouped[name].append(row)
+
+
+ChunkCallback = Callable[[Dict[str, List[Dict[str, object]]]], None]
+
+
+def _dictionary_queries(tables: List[str], chunk_size: int) -> List[Tuple[str, List[str]]]:
+    # IN chunks rather than a whole-table walk: each chunk completes a set of tables, so progress can be checkpointed
+    return [(in_query("name", chunk, _DICTIONARY_QUERY), chunk) for chunk in chunked(tables, chunk_size)]
+
+
+def fetch_dictionaries_bulk(
+    client: HTTPClient,
+    tables: List[str],
+    *,
+    chunk_size: int = 100,
+    high_water: Optional[_HighWater] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> Dict[str, List[Dict[str, object]]]:
+    # One sys_dictionary pull per chunk of tables instead of a round trip per table; rows are
+    # grouped as they stream in. ``on_chunk`` receives each chunk's tables as soon as that chunk is complete.
+    if not tables:
+        return {}
+    fields = _tracked_fields("name," + _DICTIONARY_FIELDS, high_water)
+    grouped: Dict[str, List[Dict[str, object]]] = {name: [] for name in tables}
+    for query, names in _dictionary_queries(tables, chunk_size):
+        for row in iter_table_keyset(client, "sys_dictionary", fields=fields, query=query):
+            _add_to_group(grouped, high_water.observe(row) if high_water else row)
+        if on_chunk:
+            on_chunk({name: grouped[name] for name in names})
+    return grouped
+
+
+async def fetch_dictionaries_bulk_async(
+    client: AsyncHTTPClient,
+    tables: List[str],
+    *,
+    chunk_size: int = 100,
+    high_water: Optional[_HighWater] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> Dict[str, List[Dict[str, object]]]:
+    if not tables:
+        return {}
+    fields = _tracked_fields("name," + _DICTIONARY_FIELDS, high_water)
+    grouped: Dict[str, List[Dict[str, object]]] = {name: [] for name in tables}
+
+    async def pull(query: str, names: List[str]) -> None:
+        async for row in aiter_table_keyset(client, "sys_dictionary", fields=fields, query=query):
+            _add_to_group(grouped, high_water.observe(row) if high_water else row)
+        if on_chunk:
+            on_chunk({name: grouped[name] for name in names})
+
+    await asyncio.gather(*(pull(q, names) for q, names in _dictionary_queries(tables, chunk_size)))
+    return grouped
+
+
+def _cached_dictionaries(
+    store: StateStore, names: List[str], use_cache: bool, stale: Optional[Set[str]] = None
+) -> Tuple[Dict[str, List[Dict[str, object]]], List[str]]:
+    cached: Dict[str, List[Dict[str, object]]] = {}
+    missing: List[str] = []
+    for name in names:
+        fields = store.read_dictionary_cache(name) if use_cache and name not in (stale or ()) else []
+        if fields:
+            cached[name] = fields
+        else:
+            missing.append(name)
+    return cached, missing
+
+
+def _unchanged(store: StateStore, state: DiscoveryState, name: str, fields: List[Dict[str, object]]) -> bool:
+    # Re-read but identical (e.g. rows stamped exactly at the watermark): not a change
+    return name in state.known and store.dictionary_digest(name) == content_hash(fields)
+
+
+def _record_discovery(
+    store: StateStore,
+    state: DiscoveryState,
+    filtered: List[Dict[str, str]],
+    cached: Dict[str, List[Dict[str, object]]],
+    fetched: Dict[str, List[Dict[str, object]]],
+    *,
+    touch_cached: bool = True,
+    recorded: Optional[Set[str]] = None,
+) -> Dict[str, List[Dict[str, object]]]:
+    recorded = recorded or set()
+    unchanged = {name for name, fields in fetched.items() if _unchanged(store, state, name, fields)}
+    for name, fields in fetched.items():
+        if name not in recorded:
+            store.write_dictionary_cache(name, fields)
+    dictionaries: Dict[str, List[Dict[str, object]]] = {}
+    for t in filtered:
+        name = t["name"]
+        fields = cached.get(name) or fetched.get(name, [])
+        dictionaries[name] = fields
+        # Incremental runs leave unchanged records (and their verified flag) alone
+        if name not in recorded and (touch_cached or (name in fetched and name not in unchanged) or name not in state.known):
+            _record_table(store, state, t, fields)
+    return dictionaries
+
+
+def _checkpointer(
+    store: StateStore, state: DiscoveryState, filtered: List[Dict[str, str]], recorded: Set[str], *, touch_unchanged: bool = True
+) -> ChunkCallback:
+    # Caches and records each finished dictionary chunk right away, so an interrupted crawl
+    # resumes from the journal and the pack instead of from nothing
+    by_name = {t["name"]: t for t in filtered}
+
+    def on_chunk(chunk: Dict[str, List[Dict[str, object]]]) -> None:
+        for name, fields in chunk.items():
+            skip = not touch_unchanged and _unchanged(store, state, name, fields)
+            store.write_dictionary_cache(name, fields)
+            if name in by_name and not skip:
+                _record_table(store, state, by_name[name], fields)
+            recorded.add(name)
+        store.checkpoint(state)
+
+    return on_chunk
+
+
+_FULL_SYNC_MARK = "_full_sync"
+
+
+def _instance_marks(state: DiscoveryState, settings: ServiceNowSettings) -> Optional[Tuple[_HighWater, _HighWater]]:
+    marks = state.watermarks.get(settings.base_url.rstrip("/"), {})
+    if not marks.get("sys_db_object") or not marks.get("sys_dictionary"):
+        return None
+    # Deleted sys_dictionary rows never show up in a delta, so fall back to a full run periodically
+    interval = settings.full_sync_interval_hours * 3600
+    if interval > 0 and time.time() - float(marks.get(_FULL_SYNC_MARK) or 0) >= interval:
+        return None
+    if not any(rec.kind == "table" for rec in state.known.values()):
+        return None
+    return _HighWater(marks["sys_db_object"]), _HighWater(marks["sys_dictionary"])
+
+
+def _save_marks(
+    state: DiscoveryState, settings: ServiceNowSettings, tables: _HighWater, dictionary: Optional[_HighWater], *, full: bool = False
+) -> None:
+    marks = state.watermarks.setdefault(settings.base_url.rstrip("/"), {})
+    if full:
+        marks[_FULL_SYNC_MARK] = str(int(time.time()))
+    if tables.value:
+        marks["sys_db_object"] = tables.value
+    # Only a run that read every dictionary row it reports (full or delta) may move this mark
+    if dictionary is not None and dictionary.value:
+        marks["sys_dictionary"] = dictionary.value
+
+
+def _known_tables(state: DiscoveryState) -> Dict[str, Dict[str, str]]:
+    return {
+        rec.name: {"name": rec.name, "label": str(rec.meta.get("label") or ""), "super_class": str(rec.meta.get("super_class") or "")}
+        for rec in state.known.values()
+        if rec.kind == "table"
+    }
+
+
+def _drop_deleted_tables(store: StateStore, state: DiscoveryState, current: Set[str]) -> None:
+    # Table records whose sys_db_object row is gone; filtered-out tables that still exist are kept
+    for name in [rec.name for rec in state.known.values() if rec.kind == "table" and rec.name not in current]:
+        store.remove_resource(state, name)
+
+
+def _plan_incremental(
+    settings: ServiceNowSettings, state: DiscoveryState, changed_tables: List[Dict[str, object]], changed_fields: List[Dict[str, object]]
+) -> Tuple[List[Dict[str, str]], Set[str]]:
+    # Known tables plus whatever sys_db_object reports as new/changed; a table is stale when its
+    # own row or any of its dictionary rows moved past the watermark.
+    tables = _known_tables(state)
+    for row in changed_tables:
+        if row.get("name"):
+            tables[str(row["name"])] = cast(Dict[str, str], row)
+    filtered = [t for t in _filter_tables(settings, list(tables.values())) if t.get("name")]
+    stale = {str(r.get("name") or "") for r in changed_tables} | {str(r.get("name") or "") for r in changed_fields}
+    return filtered, stale
 
 
 def discover_servicenow(
@@ -194,46 +440,106 @@ def discover_servicenow(
     *,
     resume: bool = False,
     force: bool = False,
+    incremental: bool = False,
 ) -> Tuple[List[Dict[str, str]], Dict[str, List[Dict[str, object]]]]:
+    if settings.max_concurrency > 1:
+        return asyncio.run(discover_servicenow_async(settings, run, resume=resume, force=force, incremental=incremental))
     auth = _sn_auth(settings)
-    with HTTPClient(
-        base_url=settings.base_url,
-        verify=settings.verify_tls,
-        timeout_seconds=settings.request_timeout_seconds,
-        user_agent=settings.user_agent,
-        rate_limit_per_second=settings.rate_limit_per_second,
-        auth=auth,
-    ) as client:
-        tables = enumerate_tables(client)
-        # Apply allow/deny filtering if configured
-        allow: Iterable[str] = [t.strip() for t in settings.allowlist.split(",") if t.strip()] if settings.allowlist else []
-        deny: Iterable[str] = [t.strip() for t in settings.denylist.split(",") if t.strip()] if settings.denylist else []
-        filtered = [t for t in tables if (not allow or t.get("name") in allow) and (t.get("name") not in deny)]
-
-        dictionaries: Dict[str, List[Dict[str, object]]] = {}
-        store = StateStore(run.state_dir, "servicenow")
-        state = store.load()
-
-        for t in filtered:
-            name = t.get("name")
-            if not name:
-                continue
-            cached = store.read_dictionary_cache(name) if resume and not force else []
-            if cached:
-                fields = cached
-            else:
-                fields = fetch_dictionary_for_table(client, name)
-                store.write_dictionary_cache(name, fields)
-            dictionaries[name] = fields
-            store.upsert_resource(
-                state,
-                name=name,
-                kind="table",
-                verified=False,
-                evidence=Evidence(sources=["metadata:sys_db_object", "metadata:sys_dictionary"], confidence=0.7),
-                meta={"label": t.get("label"), "super_class": t.get("super_class"), "field_count": len(fields)},
+    store = open_state_store(run.state_dir, "servicenow", backend=run.state_backend)
+    state = store.load()
+    marks = _instance_marks(state, settings) if incremental and not force else None
+    with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=auth) as client:
+        if marks is not None:
+            # Delta sync: two watermark queries, then refetch only the tables they name
+            table_mark, dict_mark = marks
+            changed_tables = _changed_rows(client, "sys_db_object", _TABLE_FIELDS, table_mark)
+            changed_fields = _changed_rows(client, "sys_dictionary", "name", dict_mark)
+            _drop_deleted_tables(store, state, _table_names(client))
+            filtered, stale = _plan_incremental(settings, state, changed_tables, changed_fields)
+            cached, missing = _cached_dictionaries(store, [t["name"] for t in filtered], True, stale)
+        else:
+            table_mark, dict_mark = _HighWater(), _HighWater()
+            tables = enumerate_tables(client, high_water=table_mark)
+            _drop_deleted_tables(store, state, {t.get("name") or "" for t in tables})
+            filtered = [t for t in _filter_tables(settings, tables) if t.get("name")]
+            cached, missing = _cached_dictionaries(store, [t["name"] for t in filtered], resume and not force)
+        recorded: Set[str] = set()
+        fetched = fetch_dictionaries_bulk(client, missing, high_water=dict_mark, on_chunk=_checkpointer(store, state, filtered, recorded, touch_unchanged=marks is None))
+    dictionaries = _record_discovery(store, state, filtered, cached, fetched, touch_cached=marks is None, recorded=recorded)
+    _save_marks(state, settings, table_mark, dict_mark if marks is not None or not cached else None, full=marks is None and not cached)
+    store.save(state)
+    return filtered, dictionaries
+
+
+async def discover_servicenow_async(
+    settings: ServiceNowSettings,
+    run: RunConfig,
+    *,
+    resume: bool = False,
+    force: bool = False,
+    incremental: bool = False,
+) -> Tuple[List[Dict[str, str]], Dict[str, List[Dict[str, object]]]]:
+    auth = _sn_auth(settings)
+    store = open_state_store(run.state_dir, "servicenow", backend=run.state_backend)
+    state = store.load()
+    marks = _instance_marks(state, settings) if incremental and not force else None
+    async with AsyncHTTPClient.from_settings(settings, base_url=settings.base_url, auth=auth) as client:
+        if marks is not None:
+            table_mark, dict_mark = marks
+            changed_tables, changed_fields, current = await asyncio.gather(
+                _changed_rows_async(client, "sys_db_object", _TABLE_FIELDS, table_mark),
+                _changed_rows_async(client, "sys_dictionary", "name", dict_mark),
+                _table_names_async(client),
             )
+            _drop_deleted_tables(store, state, current)
+            filtered, stale = _plan_incremental(settings, state, changed_tables, changed_fields)
+            cached, missing = _cached_dictionaries(store, [t["name"] for t in filtered], True, stale)
+        else:
+            table_mark, dict_mark = _HighWater(), _HighWater()
+            tables = await enumerate_tables_async(client, high_water=table_mark)
+            _drop_deleted_tables(store, state, {t.get("name") or "" for t in tables})
+            filtered = [t for t in _filter_tables(settings, tables) if t.get("name")]
+            cached, missing = _cached_dictionaries(store, [t["name"] for t in filtered], resume and not force)
+        recorded: Set[str] = set()
+        fetched = await fetch_dictionaries_bulk_async(
+            client, missing, high_water=dict_mark, on_chunk=_checkpointer(store, state, filtered, recorded, touch_unchanged=marks is None)
+        )
+    dictionaries = _record_discovery(store, state, filtered, cached, fetched, touch_cached=marks is None, recorded=recorded)
+    _save_marks(state, settings, table_mark, dict_mark if marks is not None or not cached else None, full=marks is None and not cached)
+    store.save(state)
+    return filtered, dictionaries
+
+
+DiscoveryResult = Tuple[List[Dict[str, str]], Dict[str, List[Dict[str, object]]]]
+_DISCOVERY_MEMO: Dict[Tuple[str, ...], DiscoveryResult] = {}
+
+
+def _discovery_key(settings: ServiceNowSettings, run: RunConfig) -> Tuple[str, ...]:
+    # What the result depends on: the instance, who is asking (ACLs), the table filters and the state it was merged into
+    return (
+        settings.base_url.rstrip("/"),
+        settings.username or "",
+        settings.allowlist or "",
+        settings.denylist or "",
+        str(Path(run.state_dir).resolve()),
+    )
+
+
+def discover_servicenow_once(
+    settings: ServiceNowSettings,
+    run: RunConfig,
+    *,
+    resume: bool = False,
+    force: bool = False,
+    incremental: bool = False,
+) -> DiscoveryResult:
+    # Table discovery does not depend on the catalog entry being generated, so one run per
+    # process serves every Table API version; ``force`` only applies to the first call.
+    key = _discovery_key(settings, run)
+    if key not in _DISCOVERY_MEMO:
+        _DISCOVERY_MEMO[key] = discover_servicenow(settings, run, resume=resume, force=force, incremental=incremental)
+    return _DISCOVERY_MEMO[key]
 
-        store.save(state)
-        return filtered, dictionaries
 
+def clear_discovery_memo() -> None:
+    _DISCOVERY_MEMO.clear()
@@ -1,71 +1,488 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple
-import subprocess
-import sys
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, quote, unquote, urlsplit, urlunsplit
+
+from ..browser import (
+    INSTALL_HINT,
+    BrowserUnavailableError,
+    PageProfile,
+    ensure_chromium,
+)
+from ..config import ServiceNowSettings
+
+_EXPLORER_START_PATHS = [
+    "/sn_rpexplorer.do",
+    "/rest_api_explorer.do",
+    "/now/nav/ui/classic/params/target/rest_api_explorer.do",
+    "/now/nav/ui/classic/params/target/%24restapi.do",
+]
 
 
 async def _ensure_playwright():
     try:
         from playwright.async_api import async_playwright  # noqa: F401
     except Exception as exc:  # noqa: BLE001
-        raise RuntimeError(
-            "Playwright is not installed. Install it with 'uv pip install playwright' and run 'playwright install chromium'"
+        raise BrowserUnavailableError(
+            f"Playwright is not installed. Install it with 'uv pip install playwright'. {INSTALL_HINT}"
         ) from exc
 
 
-async def _install_browsers_if_needed() -> None:
-    try:
-        # Try to run playwright --version quickly
-        subprocess.run([sys.executable, "-m", "playwright", "--version"], check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except Exception:
-        pass
-    # Ensure chromium is available
-    subprocess.run([sys.executable, "-m", "playwright", "install", "chromium", "--with-deps"], check=False)
-
-
-async def _login_servicenow(page, base_url: str, username: Optional[str], password: Optional[str], timeout_ms: int) -> None:
+async def _login_servicenow(page, base_url: str, username: Optional[str], password: Optional[str], timeout_ms: int) -> bool:
+    # True only when the login form was submitted and the page left it
     if not (username and password):
-        return
+        return False
     try:
         await page.goto(base_url.rstrip("/") + "/login.do", timeout=timeout_ms)
         await page.wait_for_load_state("domcontentloaded")
         user = await page.query_selector("#user_name")
         pwd = await page.query_selector("#user_password")
         btn = await page.query_selector("#sysverb_login")
-        if user and pwd and btn:
-            await user.fill(username)
-            await pwd.fill(password)
-            await btn.click()
-            await page.wait_for_load_state("networkidle")
-    except Exception:
-        pass
+        if not (user and pwd and btn):
+            return False
+        await user.fill(username)
+        await pwd.fill(password)
+        await btn.click()
+        await page.wait_for_load_state("networkidle")
+        return not await _on_login_page(page)
+    except Exception:  # noqa: BLE001
+        return False
+
+
+async def _on_login_page(page) -> bool:
+    # An expired session bounces the page (or the classic gsft_main frame) back to login.do
+    for frame in [page] + list(page.frames):
+        try:
+            if "login.do" in (frame.url or "") or await frame.query_selector("#user_password"):
+                return True
+        except Exception:  # noqa: BLE001
+            continue
+    return False
+
+
+def session_state_path(state_dir: str | Path, base_url: str, username: Optional[str]) -> Path:
+    key = hashlib.sha256(f"{base_url.rstrip('/')}\n{username or ''}".encode()).hexdigest()[:16]
+    return Path(state_dir) / "servicenow" / "sessions" / f"{key}.json"
+
+
+# Candidate selectors per explorer control, most specific first
+SELECTOR_CANDIDATES: Dict[str, List[str]] = {
+    "namespace": ['select[aria-label*="Namespace" i]', 'select[id*="namespace" i]', 'select[name*="namespace" i]'],
+    "api": ['select[aria-label*="API" i]', 'select[id*="api" i]', 'select[name*="api" i]'],
+    "version": ['select[aria-label*="Version" i]', 'select[id*="version" i]', 'select[name*="version" i]'],
+    "export": [
+        'a:has-text("Export OpenAPI Specification (JSON)")',
+        'a:has-text("Export OpenAPI Specification (Yaml)")',
+        'a:has-text("Export")',
+    ],
+}
+
+
+class SelectorCache:
+    # Which explorer path, frame and selector worked for each control on one instance. Hits go
+    # straight to the recorded frame/selector; only a miss falls back to the full search.
+    def __init__(self, path: Optional[str | Path] = None) -> None:
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, str]] = {}
+        if self.path and self.path.exists():
+            try:
+                self._entries = dict(json.loads(self.path.read_text()))
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def get(self, role: str) -> Optional[Dict[str, str]]:
+        return self._entries.get(role)
+
+    def put(self, role: str, **entry: str) -> None:
+        if self._entries.get(role) == entry:
+            return
+        self._entries[role] = entry
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries, indent=2, sort_keys=True))
+            tmp.replace(self.path)
+
+    def forget(self, role: str) -> None:
+        self._entries.pop(role, None)
+
+    def ordered_paths(self) -> List[str]:
+        known = (self.get("explorer_path") or {}).get("path")
+        return ([known] if known in _EXPLORER_START_PATHS else []) + [p for p in _EXPLORER_START_PATHS if p != known]
+
+
+def export_url_template(href: str, namespace: str, api_name: str, api_version: str) -> Optional[str]:
+    # Turn one observed export href into a {namespace}/{api}/{version} template. Query values are
+    # matched first; a path segment is only substituted when the value occurs there exactly once
+    # (so a fixed "/api/now/" is not mistaken for the "now" namespace next to ?namespace=now).
+    if "{" in href or "}" in href:
+        return None
+    parts = urlsplit(href)
+    values = {"namespace": namespace, "api": api_name, "version": api_version}
+    found: Set[str] = set()
+    query: List[str] = []
+    for key, value in parse_qsl(parts.query, keep_blank_values=True):
+        name = next((n for n, v in values.items() if v == value and n not in found), None)
+        if name:
+            found.add(name)
+            query.append(f"{quote(key, safe='')}={{{name}}}")
+        else:
+            query.append(f"{quote(key, safe='')}={quote(value, safe='')}")
+    segments = parts.path.split("/")
+    for name, value in values.items():
+        hits = [i for i, seg in enumerate(segments) if unquote(seg) == value]
+        if name not in found and len(hits) == 1:
+            segments[hits[0]] = f"{{{name}}}"
+            found.add(name)
+    if found != set(values):
+        # Without {namespace} every namespace's API of the same name would map to one URL
+        return None
+    return urlunsplit((parts.scheme, parts.netloc, "/".join(segments), "&".join(query), ""))
+
+
+def export_url(template: str, namespace: str, api_name: str, api_version: str) -> str:
+    return template.format(namespace=quote(namespace, safe=""), api=quote(api_name, safe=""), version=quote(api_version, safe=""))
+
+
+def selector_cache_path(state_dir: str | Path, base_url: str) -> Path:
+    key = hashlib.sha256(base_url.rstrip("/").encode()).hexdigest()[:16]
+    return Path(state_dir) / "servicenow" / "selectors" / f"{key}.json"
+
+
+def _frame_key(page, frame) -> str:
+    if frame is page.main_frame:
+        return ""
+    return frame.name or (frame.url or "").split("?", 1)[0]
+
+
+def _frame_for(page, key: str):
+    if not key:
+        return page.main_frame
+    for frame in page.frames:
+        if frame.name == key or (frame.url or "").split("?", 1)[0] == key:
+            return frame
+    return None
+
+
+async def _usable(role: str, el) -> bool:
+    # An export match is only useful with an href: "Export" also labels menu toggles without one
+    return role != "export" or bool(await el.get_attribute("href"))
+
+
+async def _first_usable(frame, selector: str, role: str):
+    for el in await frame.query_selector_all(selector):
+        if await _usable(role, el):
+            return el
+    return None
+
+
+async def _cached_element(page, hit: Dict[str, str], role: str, timeout_ms: int):
+    # A cache hit skips the frame search and its wait, so wait here for the recorded frame to attach
+    # and for the selector to appear in it (the explorer fills its frame after domcontentloaded)
+    deadline = time.monotonic() + timeout_ms / 1000
+    frame = _frame_for(page, hit.get("frame", ""))
+    while frame is None and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+        frame = _frame_for(page, hit.get("frame", ""))
+    if frame is None:
+        return None
+    try:
+        await frame.wait_for_selector(hit["selector"], state="attached", timeout=max(1.0, (deadline - time.monotonic()) * 1000))
+    except Exception:  # noqa: BLE001
+        return None
+    return await _first_usable(frame, hit["selector"], role)
+
+
+async def _resolve(page, cache: SelectorCache, role: str, preferred=None, *, timeout_ms: int = 5000):
+    hit = cache.get(role)
+    if hit:
+        el = await _cached_element(page, hit, role, timeout_ms)
+        if el:
+            cache.hits += 1
+            return el
+        cache.forget(role)
+    cache.misses += 1
+    frames = ([preferred] if preferred is not None else []) + [page.main_frame] + [f for f in page.frames if f is not page.main_frame]
+    for frame in frames:
+        for sel in SELECTOR_CANDIDATES[role]:
+            el = await _first_usable(frame, sel, role)
+            if el:
+                cache.put(role, selector=sel, frame=_frame_key(page, frame))
+                return el
+    return None
+
+
+async def _read_options(page, cache: SelectorCache, role: str, preferred=None, *, timeout_ms: int = 5000) -> List[str]:
+    el = await _resolve(page, cache, role, preferred, timeout_ms=timeout_ms)
+    if not el:
+        return []
+    values = [(await opt.get_attribute("value")) or (await opt.text_content() or "").strip() for opt in await el.query_selector_all("option")]
+    return list(dict.fromkeys(v for v in values if v))
+
+
+async def _select(page, cache: SelectorCache, role: str, value: str, preferred=None, *, timeout_ms: int = 5000) -> bool:
+    el = await _resolve(page, cache, role, preferred, timeout_ms=timeout_ms)
+    if not el:
+        return False
+    try:
+        await el.select_option(value)
+        return True
+    except Exception:  # noqa: BLE001
+        return False
+
+
+def browser_session_from_settings(settings: ServiceNowSettings, state_dir: str | Path) -> BrowserSession:
+    return BrowserSession(
+        settings.base_url,
+        settings.username,
+        settings.password,
+        state_path=session_state_path(state_dir, settings.base_url, settings.username),
+        ttl_seconds=settings.browser_session_ttl_seconds,
+        selectors=SelectorCache(selector_cache_path(state_dir, settings.base_url)),
+    )
+
+
+class BrowserSession:
+    # One instance+user login shared by every context: the Playwright storage_state (cookies and
+    # local storage) is persisted and reused until ``ttl_seconds`` old, and a page bounced to
+    # login.do triggers a single re-login whose cookies are then shared with the other contexts.
+    def __init__(
+        self,
+        base_url: str,
+        username: Optional[str],
+        password: Optional[str],
+        *,
+        state_path: Optional[str | Path] = None,
+        ttl_seconds: float = 8 * 3600,
+        timeout_ms: int = 30000,
+        selectors: Optional[SelectorCache] = None,
+    ) -> None:
+        self.base_url = base_url
+        self.selectors = selectors or SelectorCache()
+        self.username = username
+        self.password = password
+        self.state_path = Path(state_path) if state_path else None
+        self.ttl_seconds = ttl_seconds
+        self.timeout_ms = timeout_ms
+        self.logins = 0
+        self.restored = 0
+        self._state: Optional[Dict[str, object]] = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def has_credentials(self) -> bool:
+        return bool(self.username and self.password)
+
+    def stored_state(self) -> Optional[Dict[str, object]]:
+        if self._state is not None or not self.has_credentials or not self.state_path:
+            return self._state
+        try:
+            if time.time() - self.state_path.stat().st_mtime > self.ttl_seconds:
+                return None
+            self._state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return None
+        return self._state
+
+    def _save(self) -> None:
+        if not self.state_path or self._state is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        # Session cookies are credentials: keep the file private to the user
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as fh:
+            fh.write(json.dumps(self._state))
+        tmp.replace(self.state_path)
+
+    async def _login(self, page) -> None:
+        if not await _login_servicenow(page, self.base_url, self.username, self.password, self.timeout_ms):
+            raise RuntimeError(f"ServiceNow browser login failed for {self.username} at {self.base_url}")
+        self.logins += 1
+        self._generation += 1
+        self._state = await page.context.storage_state()
+        self._save()
+
+    async def new_page(self, browser, profile: PageProfile):
+        # Serialized so concurrently opened pool pages share one login instead of racing N of them
+        async with self._lock:
+            state = self.stored_state()
+            options = dict(profile.context_options())
+            if state is not None:
+                options["storage_state"] = state
+                self.restored += 1
+            context = await browser.new_context(**options)
+            await profile.apply(context)
+            page = await context.new_page()
+            if state is None and self.has_credentials:
+                await self._login(page)
+        return context, page
+
+    async def goto(self, page, url: str, **kwargs) -> None:
+        generation = self._generation
+        await page.goto(url, **kwargs)
+        if not self.has_credentials or not await _on_login_page(page):
+            return
+        async with self._lock:
+            if self._generation == generation:
+                await self._login(page)
+            elif self._state:
+                # Another page already re-logged in; adopt its cookies
+                cookies = self._state.get("cookies")
+                await page.context.add_cookies(list(cookies) if isinstance(cookies, list) else [])
+        await page.goto(url, **kwargs)
+
+
+CatalogTree = Tuple[List[str], Dict[str, List[str]], Dict[Tuple[str, str], List[str]]]
+
+CATALOG_MODES = ("auto", "network", "dom")
+
+# Keys the explorer's JSON payloads use for the namespace/API/version tree
+_NS_KEYS = ("namespace", "api_namespace", "scope_namespace")
+_API_KEYS = ("api_name", "service_name", "name", "api")
+_VERSION_KEYS = ("version", "api_version")
+_URI_KEYS = ("base_uri", "base_path", "in_url", "uri", "service_uri")
+_API_PATH = re.compile(r"/api/([^/?#]+)/([^/?#]+)(?:/(v\d+))?")
+
+
+def _text(value: object) -> str:
+    # Table-style payloads wrap values as {"value": ..., "display_value": ...}
+    if isinstance(value, dict):
+        value = value.get("value") or value.get("display_value")
+    return str(value).strip() if isinstance(value, (str, int, float)) else ""
+
+
+def _first(node: Dict[str, object], keys: Tuple[str, ...]) -> str:
+    for key in keys:
+        text = _text(node.get(key))
+        if text:
+            return text
+    return ""
+
+
+def _node_versions(node: Dict[str, object]) -> List[str]:
+    found = [_first(node, _VERSION_KEYS)]
+    raw = node.get("versions")
+    if isinstance(raw, list):
+        found += [_first(v, _VERSION_KEYS + ("name",)) if isinstance(v, dict) else _text(v) for v in raw]
+    return [v for v in found if v]
+
+
+def _catalog_from_payloads(payloads: Iterable[object]) -> CatalogTree:
+    namespace_to_apis: Dict[str, List[str]] = {}
+    api_versions: Dict[Tuple[str, str], List[str]] = {}
+
+    def add(ns: str, api: str, versions: List[str]) -> None:
+        apis = namespace_to_apis.setdefault(ns, [])
+        if api not in apis:
+            apis.append(api)
+        known = api_versions.setdefault((ns, api), [])
+        known.extend(v for v in versions if v not in known)
+
+    def walk(node: object, inherited_ns: str) -> None:
+        if isinstance(node, list):
+            for item in node:
+                walk(item, inherited_ns)
+            return
+        if not isinstance(node, dict):
+            return
+        ns, api, versions = _first(node, _NS_KEYS), _first(node, _API_KEYS), _node_versions(node)
+        m = _API_PATH.match(_first(node, _URI_KEYS))
+        if m:
+            ns, api = ns or m.group(1), api or m.group(2)
+            if m.group(3):
+                versions.append(m.group(3))
+        # The explorer describes every API with its versions (a list, a version field or a versioned
+        # base URI); a namespace/name pair without one is some other JSON, and must not mask the DOM fallback
+        if not ns and versions:
+            ns = inherited_ns
+        if ns and api and versions:
+            add(ns, api, versions)
+        for child in node.values():
+            if isinstance(child, (dict, list)):
+                walk(child, ns or inherited_ns)
+
+    for payload in payloads:
+        walk(payload, "")
+    return list(namespace_to_apis), namespace_to_apis, api_versions
+
+
+async def _json_or_none(response) -> Optional[object]:
+    try:
+        return await response.json()
+    except Exception:  # noqa: BLE001
+        return None
+
+
+async def _catalog_from_network(page, session: BrowserSession, timeout_ms: int) -> CatalogTree:
+    # The explorer fetches its namespace/API/version data as JSON; capture those responses
+    # during a single page load instead of driving the <select> elements.
+    pending: List[asyncio.Future] = []
+
+    def on_response(response) -> None:
+        if "json" in (response.headers.get("content-type") or ""):
+            pending.append(asyncio.ensure_future(_json_or_none(response)))
+
+    page.on("response", on_response)
+    try:
+        for path in _EXPLORER_START_PATHS:
+            try:
+                await session.goto(page, session.base_url.rstrip("/") + path, timeout=timeout_ms, wait_until="networkidle")
+            except Exception:  # noqa: BLE001
+                continue
+            payloads = [p for p in await asyncio.gather(*pending) if p is not None]
+            pending.clear()
+            tree = _catalog_from_payloads(payloads)
+            if tree[0]:
+                return tree
+    finally:
+        page.remove_listener("response", on_response)
+    return [], {}, {}
 
 
 async def discover_catalog_via_browser(
-    *, base_url: str, username: Optional[str], password: Optional[str], oauth_token: Optional[str], timeout_ms: int = 60000, debug_dir: Optional[str] = None
-) -> Tuple[List[str], Dict[str, List[str]], Dict[Tuple[str, str], List[str]]]:
+    *,
+    base_url: str,
+    username: Optional[str],
+    password: Optional[str],
+    oauth_token: Optional[str],
+    timeout_ms: int = 60000,
+    debug_dir: Optional[str] = None,
+    mode: str = "auto",
+    profile: Optional[PageProfile] = None,
+    session: Optional[BrowserSession] = None,
+) -> CatalogTree:
+    # mode: "network" reads the explorer's XHR payloads, "dom" drives the dropdowns,
+    # "auto" tries the network first and falls back to the DOM when it yields nothing.
+    if mode not in CATALOG_MODES:
+        raise ValueError(f"Unknown catalog mode {mode!r}; expected one of {', '.join(CATALOG_MODES)}")
     await _ensure_playwright()
-    await _install_browsers_if_needed()
     from playwright.async_api import async_playwright
 
+    profile = profile or PageProfile()
+    session = session or BrowserSession(base_url, username, password, timeout_ms=timeout_ms)
     async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        context = await browser.new_context()
-        page = await context.new_page()
-
-        await _login_servicenow(page, base_url, username, password, timeout_ms)
-
-        start_paths = [
-            "/sn_rpexplorer.do",
-            "/rest_api_explorer.do",
-            "/now/nav/ui/classic/params/target/rest_api_explorer.do",
-            "/now/nav/ui/classic/params/target/%24restapi.do",
-        ]
+        ensure_chromium(p)
+        browser = await p.chromium.launch(args=profile.launch_args())
+        context, page = await session.new_page(browser, profile)
+
         namespaces: List[str] = []
         namespace_to_apis: Dict[str, List[str]] = {}
         api_versions: Dict[Tuple[str, str], List[str]] = {}
+        if mode != "dom":
+            namespaces, namespace_to_apis, api_versions = await _catalog_from_network(page, session, timeout_ms)
+        use_dom = not namespaces and mode != "network"
 
         async def get_explorer_frame() -> Optional[object]:  # object to avoid type import
             # Prefer the classic frame
@@ -87,52 +504,17 @@ async def discover_catalog_via_browser(
                     continue
             return None
 
-        for path in start_paths:
+        selectors = session.selectors
+        for path in selectors.ordered_paths() if use_dom else []:
             try:
-                await page.goto(base_url.rstrip("/") + path, timeout=timeout_ms)
+                await session.goto(page, base_url.rstrip("/") + path, timeout=timeout_ms)
                 await page.wait_for_load_state('domcontentloaded')
-                fr = await get_explorer_frame()
+                # The frame search (and its wait) is only needed when no selector is known yet
+                fr = None if selectors.get("namespace") else await get_explorer_frame()
                 # Wait a moment for dynamic population
                 await page.wait_for_timeout(1000)
 
-                # selectors to try (page and frames)
-                ns_selectors = [
-                    'select[aria-label*="Namespace" i]',
-                    'select[id*="namespace" i]',
-                    'select[name*="namespace" i]',
-                ]
-                api_selectors = [
-                    'select[aria-label*="API" i]',
-                    'select[id*="api" i]',
-                    'select[name*="api" i]',
-                ]
-                ver_selectors = [
-                    'select[aria-label*="Version" i]',
-                    'select[id*="version" i]',
-                    'select[name*="version" i]',
-                ]
-
-                async def read_options(selectors: List[str]) -> List[str]:
-                    # Prefer explorer frame if available
-                    if fr:
-                        for sel in selectors:
-                            el = await fr.query_selector(sel)
-                            if el:
-                                return [opt.get("value") or (await opt.text_content() or "").strip() for opt in await el.query_selector_all("option")]
-                    # Try on page as fallback
-                    for sel in selectors:
-                        el = await page.query_selector(sel)
-                        if el:
-                            return [opt.get("value") or (await opt.text_content() or "").strip() for opt in await el.query_selector_all("option")]
-                    # Try other frames
-                    for frame in page.frames:
-                        for sel in selectors:
-                            el = await frame.query_selector(sel)
-                            if el:
-                                return [opt.get("value") or (await opt.text_content() or "").strip() for opt in await el.query_selector_all("option")]
-                    return []
-
-                ns_opts = [v for v in await read_options(ns_selectors) if v]
+                ns_opts = await _read_options(page, selectors, "namespace", fr, timeout_ms=timeout_ms)
                 if not ns_opts:
                     # capture debug once if requested
                     if debug_dir:
@@ -146,85 +528,18 @@ async def discover_catalog_via_browser(
                         # dump frame urls
                         (dbg / "frames.txt").write_text("\n".join([f.url for f in page.frames if f.url]))
                     continue
-                namespaces = list(dict.fromkeys(ns_opts))
+                selectors.put("explorer_path", path=path)
+                namespaces = ns_opts
 
                 # iterate apis and versions by selecting
                 for ns in namespaces:
-                    # Select namespace on explorer frame, page, or frames
-                    selected = False
-                    if fr:
-                        for sel in ns_selectors:
-                            el = await fr.query_selector(sel)
-                            if el:
-                                try:
-                                    await el.select_option(ns)
-                                    selected = True
-                                    break
-                                except Exception:
-                                    pass
-                    for sel in ns_selectors:
-                        el = await page.query_selector(sel)
-                        if el:
-                            try:
-                                await el.select_option(ns)
-                                selected = True
-                                break
-                            except Exception:
-                                pass
-                    if not selected:
-                        for frame in page.frames:
-                            for sel in ns_selectors:
-                                el = await frame.query_selector(sel)
-                                if el:
-                                    try:
-                                        await el.select_option(ns)
-                                        selected = True
-                                        break
-                                    except Exception:
-                                        pass
-                            if selected:
-                                break
+                    await _select(page, selectors, "namespace", ns, fr)
                     await page.wait_for_timeout(300)
-                    api_opts = [v for v in await read_options(api_selectors) if v]
-                    namespace_to_apis[ns] = list(dict.fromkeys(api_opts))
+                    namespace_to_apis[ns] = await _read_options(page, selectors, "api", fr)
                     for api_name in namespace_to_apis[ns]:
-                        # select api on page or frames
-                        selected_api = False
-                        if fr:
-                            for sel in api_selectors:
-                                el = await fr.query_selector(sel)
-                                if el:
-                                    try:
-                                        await el.select_option(api_name)
-                                        selected_api = True
-                                        break
-                                    except Exception:
-                                        pass
-                        for sel in api_selectors:
-                            el = await page.query_selector(sel)
-                            if el:
-                                try:
-                                    await el.select_option(api_name)
-                                    selected_api = True
-                                    break
-                                except Exception:
-                                    pass
-                        if not selected_api:
-                            for frame in page.frames:
-                                for sel in api_selectors:
-                                    el = await frame.query_selector(sel)
-                                    if el:
-                                        try:
-                                            await el.select_option(api_name)
-                                            selected_api = True
-                                            break
-                                        except Exception:
-                                            pass
-                                if selected_api:
-                                    break
+                        await _select(page, selectors, "api", api_name, fr)
                         await page.wait_for_timeout(300)
-                        ver_opts = [v for v in await read_options(ver_selectors) if v]
-                        api_versions[(ns, api_name)] = list(dict.fromkeys(ver_opts))
+                        api_versions[(ns, api_name)] = await _read_options(page, selectors, "version", fr)
 
                 break
             except Exception:
@@ -235,88 +550,210 @@ async def discover_catalog_via_browser(
     return namespaces, namespace_to_apis, api_versions
 
 
-async def export_openapi_via_browser(
-    *, base_url: str, namespace: str, api_name: str, api_version: str, username: Optional[str], password: Optional[str], timeout_ms: int = 30000
+HEADLESS_CATALOG_FORMAT = 1
+
+
+def save_catalog_tree(path: str | Path, tree: CatalogTree, *, base_url: str, mode: str = "auto") -> Path:
+    namespaces, namespace_to_apis, api_versions = tree
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "format": HEADLESS_CATALOG_FORMAT,
+        "base_url": base_url.rstrip("/"),
+        "mode": mode,
+        "built_at": time.time(),
+        "namespaces": namespaces,
+        "apis": namespace_to_apis,
+        # JSON has no tuple keys: one record per (namespace, api)
+        "versions": [{"namespace": ns, "api": api, "versions": vers} for (ns, api), vers in api_versions.items()],
+    }
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload))
+    tmp.replace(out)
+    return out
+
+
+def load_catalog_tree(path: str | Path, *, base_url: str, max_age_seconds: float, mode: str = "auto") -> Optional[CatalogTree]:
+    # An "auto" request takes a tree built by any mode; an explicit mode only its own
+    try:
+        data = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != HEADLESS_CATALOG_FORMAT or data.get("base_url") != base_url.rstrip("/"):
+        return None
+    if mode != "auto" and data.get("mode", "auto") != mode:
+        return None
+    if time.time() - float(data.get("built_at", 0.0)) >= max_age_seconds:
+        return None
+    api_versions = {(r["namespace"], r["api"]): list(r["versions"]) for r in data.get("versions", [])}
+    return list(data.get("namespaces", [])), dict(data.get("apis", {})), api_versions
+
+
+async def load_or_discover_catalog(
+    path: str | Path, *, base_url: str, max_age_seconds: float = 6 * 3600, refresh: bool = False, mode: str = "auto", **discover_kwargs
+) -> CatalogTree:
+    # One browser crawl feeds every headless lister until the cache expires or --refresh is given
+    if not refresh:
+        cached = load_catalog_tree(path, base_url=base_url, max_age_seconds=max_age_seconds, mode=mode)
+        if cached is not None:
+            return cached
+    tree = await discover_catalog_via_browser(base_url=base_url, mode=mode, **discover_kwargs)
+    if tree[0]:
+        save_catalog_tree(path, tree, base_url=base_url, mode=mode)
+    return tree
+
+
+async def _export_on_page(
+    page, session: BrowserSession, *, namespace: str, api_name: str, api_version: str, timeout_ms: int = 30000
 ) -> Optional[str]:
-    await _ensure_playwright()
-    await _install_browsers_if_needed()
-    from playwright.async_api import async_playwright
+    selectors = session.selectors
+    for path in selectors.ordered_paths():
+        try:
+            await session.goto(page, session.base_url.rstrip("/") + path, timeout=timeout_ms)
+            await page.wait_for_timeout(1000)
+            # select dropdowns similar to discover and click Export JSON link
+            await _select(page, selectors, "namespace", namespace, timeout_ms=timeout_ms)
+            await page.wait_for_timeout(200)
+            await _select(page, selectors, "api", api_name)
+            await page.wait_for_timeout(200)
+            await _select(page, selectors, "version", api_version)
+            await page.wait_for_timeout(200)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        context = await browser.new_context()
-        page = await context.new_page()
-        await _login_servicenow(page, base_url, username, password, timeout_ms)
-        start_paths = [
-            "/sn_rpexplorer.do",
-            "/rest_api_explorer.do",
-            "/now/nav/ui/classic/params/target/rest_api_explorer.do",
-            "/now/nav/ui/classic/params/target/%24restapi.do",
-        ]
-        for path in start_paths:
-            try:
-                await page.goto(base_url.rstrip("/") + path, timeout=timeout_ms)
-                await page.wait_for_timeout(1000)
-                # select dropdowns similar to discover and click Export JSON link
-                async def select_value(sel_parts: List[str], value: str) -> None:
-                    # try on page first
-                    for sel in sel_parts:
-                        el = await page.query_selector(sel)
-                        if el:
-                            try:
-                                await el.select_option(value)
-                                return
-                            except Exception:
-                                pass
-                    # then frames
-                    for frame in page.frames:
-                        for sel in sel_parts:
-                            el = await frame.query_selector(sel)
-                            if el:
-                                try:
-                                    await el.select_option(value)
-                                    return
-                                except Exception:
-                                    pass
-
-                await select_value(['select[aria-label*="Namespace" i]', 'select[id*="namespace" i]'], namespace)
-                await page.wait_for_timeout(200)
-                await select_value(['select[aria-label*="API" i]', 'select[id*="api" i]'], api_name)
-                await page.wait_for_timeout(200)
-                await select_value(['select[aria-label*="Version" i]', 'select[id*="version" i]'], api_version)
-                await page.wait_for_timeout(200)
-
-                # try to find the export JSON link (page and frames)
-                async def find_export() -> Optional[str]:
-                    candidates = [
-                        'a:has-text("Export OpenAPI Specification (JSON)")',
-                        'a:has-text("Export OpenAPI Specification (Yaml)")',
-                        'a:has-text("Export")',
-                    ]
-                    for sel in candidates:
-                        el = await page.query_selector(sel)
-                        if el:
-                            href = await el.get_attribute("href")
-                            if href:
-                                return href
-                    for frame in page.frames:
-                        for sel in candidates:
-                            el = await frame.query_selector(sel)
-                            if el:
-                                href = await el.get_attribute("href")
-                                if href:
-                                    return href
-                    return None
-
-                href = await find_export()
-                if href and href.startswith("http"):
-                    resp = await context.request.get(href, timeout=timeout_ms)
-                    if resp.ok:
-                        return await resp.text()
-            except Exception:
-                continue
-        await context.close()
-        await browser.close()
+            link = await _resolve(page, selectors, "export")
+            href = await link.get_attribute("href") if link else None
+            if href and href.startswith("http"):
+                resp = await page.context.request.get(href, timeout=timeout_ms)
+                if resp.ok:
+                    selectors.put("explorer_path", path=path)
+                    # Lets later exports skip the browser entirely (see sn_export.SpecExporter)
+                    template = export_url_template(href, namespace, api_name, api_version)
+                    if template:
+                        selectors.put("export_url", template=template)
+                    return await resp.text()
+        except Exception:
+            continue
     return None
 
 
+class BrowserPool:
+    # One Chromium process with ``size`` logged-in contexts (one page each). Jobs borrow a page
+    # from the queue, so N exports run concurrently without paying a cold start or login per spec.
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        username: Optional[str],
+        password: Optional[str],
+        size: int = 4,
+        timeout_ms: int = 30000,
+        profile: Optional[PageProfile] = None,
+        session: Optional[BrowserSession] = None,
+    ) -> None:
+        self.base_url = base_url
+        self.session = session or BrowserSession(base_url, username, password, timeout_ms=timeout_ms)
+        self.size = max(1, size)
+        self.timeout_ms = timeout_ms
+        self.profile = profile or PageProfile()
+        self.export_seconds: List[float] = []
+        # Playwright objects (the package is optional, so they are typed as Any)
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._contexts: List[Any] = []
+        self._pages: Optional[asyncio.Queue] = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        await _ensure_playwright()
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        try:
+            ensure_chromium(self._playwright)
+            self._browser = await self._playwright.chromium.launch(args=self.profile.launch_args())
+            self._pages = asyncio.Queue()
+            pages = await asyncio.gather(*(self._open_page() for _ in range(self.size)))
+            for page in pages:
+                self._pages.put_nowait(page)
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _open_page(self):
+        context, page = await self.session.new_page(self._browser, self.profile)
+        self._contexts.append(context)
+        return page
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        pages = self._pages
+        if pages is None:
+            raise RuntimeError("BrowserPool is not started; use it as 'async with BrowserPool(...)'")
+        page = await pages.get()
+        try:
+            yield page
+        finally:
+            pages.put_nowait(page)
+
+    async def export(self, namespace: str, api_name: str, api_version: str) -> Optional[str]:
+        async with self.page() as page:
+            started = time.monotonic()
+            try:
+                return await _export_on_page(
+                    page, self.session, namespace=namespace, api_name=api_name, api_version=api_version, timeout_ms=self.timeout_ms
+                )
+            finally:
+                self.export_seconds.append(time.monotonic() - started)
+
+    async def export_many(self, entries: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Optional[str]]:
+        keys = list(dict.fromkeys(entries))
+        texts = await asyncio.gather(*(self.export(*key) for key in keys))
+        return dict(zip(keys, texts))
+
+    def stats(self) -> Dict[str, float]:
+        done = len(self.export_seconds)
+        return {
+            "pages": self.size,
+            "exports": done,
+            "avg_export_seconds": round(sum(self.export_seconds) / done, 3) if done else 0.0,
+            "blocked_requests": self.profile.blocked,
+            "allowed_requests": self.profile.allowed,
+            "logins": self.session.logins,
+            "restored_sessions": self.session.restored,
+            "selector_hits": self.session.selectors.hits,
+            "selector_misses": self.session.selectors.misses,
+        }
+
+    async def close(self) -> None:
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception:  # noqa: BLE001
+                pass
+        self._contexts = []
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+async def export_openapi_via_browser(
+    *,
+    base_url: str,
+    namespace: str,
+    api_name: str,
+    api_version: str,
+    username: Optional[str],
+    password: Optional[str],
+    timeout_ms: int = 30000,
+    profile: Optional[PageProfile] = None,
+    session: Optional[BrowserSession] = None,
+) -> Optional[str]:
+    async with BrowserPool(
+        base_url=base_url, username=username, password=password, size=1, timeout_ms=timeout_ms, profile=profile, session=session
+    ) as pool:
+        return await pool.export(namespace, api_name, api_version)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ..http import AsyncHTTPClient, HTTPClient
+from .sn_browser import BrowserPool, BrowserSession, export_url
+
+ExportKey = Tuple[str, str, str]
+
+
+def looks_like_spec(text: str) -> bool:
+    # Guards the direct path: a login page or an error document must fall back to the browser
+    stripped = text.lstrip()
+    if stripped.startswith(("openapi:", "swagger:")):
+        return True
+    try:
+        data = json.loads(stripped)
+    except ValueError:
+        return False
+    return isinstance(data, dict) and ("openapi" in data or "swagger" in data)
+
+
+def _cookie_matches(cookie: Dict[str, object], host: str) -> bool:
+    domain = str(cookie.get("domain") or "").lstrip(".").lower()
+    return bool(domain) and (host == domain or host.endswith(f".{domain}"))
+
+
+def _session_headers(session: Optional[BrowserSession]) -> Dict[str, str]:
+    # Export endpoints behind the UI session accept the browser's cookies as well as basic auth;
+    # only cookies scoped to the instance host are sent (storage_state also holds SSO/IdP cookies)
+    if session is None:
+        return {}
+    state = session.stored_state() or {}
+    stored = state.get("cookies")
+    host = (urlsplit(session.base_url).hostname or "").lower()
+    cookies = [
+        c for c in (stored if isinstance(stored, list) else []) if isinstance(c, dict) and c.get("name") and _cookie_matches(c, host)
+    ]
+    return {"Cookie": "; ".join(f"{c['name']}={c.get('value', '')}" for c in cookies)} if cookies else {}
+
+
+def fetch_export_direct(
+    client: HTTPClient, template: str, key: ExportKey, *, session: Optional[BrowserSession] = None
+) -> Optional[str]:
+    try:
+        resp = client.get(export_url(template, *key), headers=_session_headers(session))
+    except Exception:  # noqa: BLE001
+        return None
+    return resp.text if resp.status_code == 200 and looks_like_spec(resp.text) else None
+
+
+async def fetch_export_direct_async(
+    client: AsyncHTTPClient, template: str, key: ExportKey, *, session: Optional[BrowserSession] = None
+) -> Optional[str]:
+    try:
+        resp = await client.get(export_url(template, *key), headers=_session_headers(session))
+    except Exception:  # noqa: BLE001
+        return None
+    return resp.text if resp.status_code == 200 and looks_like_spec(resp.text) else None
+
+
+class SpecExporter:
+    # Exports through the learned export URL template over HTTP (concurrent, rate limited by the
+    # client); Playwright is only started to seed the template or for entries the direct fetch
+    # could not serve. Without a pool_factory (no headless browser) only direct exports are made.
+    def __init__(self, client: AsyncHTTPClient, session: BrowserSession, pool_factory: Optional[Callable[[], BrowserPool]]) -> None:
+        self.client = client
+        self.session = session
+        self.pool_factory = pool_factory
+        self.direct = 0
+        self.via_browser = 0
+        self._pool: Optional[BrowserPool] = None
+
+    @property
+    def template(self) -> Optional[str]:
+        # Templates learned before {namespace} was required would export every namespace's API from one URL
+        template = (self.session.selectors.get("export_url") or {}).get("template")
+        return template if template and "{namespace}" in template else None
+
+    async def _browser(self) -> BrowserPool:
+        if self._pool is None:
+            assert self.pool_factory is not None
+            self._pool = await self.pool_factory().__aenter__()
+        return self._pool
+
+    async def _via_browser(self, keys: List[ExportKey]) -> Dict[ExportKey, Optional[str]]:
+        if not keys or self.pool_factory is None:
+            return {}
+        results = await (await self._browser()).export_many(keys)
+        self.via_browser += sum(1 for text in results.values() if text)
+        return results
+
+    async def _direct(self, keys: List[ExportKey]) -> Dict[ExportKey, Optional[str]]:
+        template = self.template
+        if not template or not keys:
+            return {}
+        texts = await asyncio.gather(*(fetch_export_direct_async(self.client, template, k, session=self.session) for k in keys))
+        self.direct += sum(1 for text in texts if text)
+        return dict(zip(keys, texts))
+
+    async def export_many(self, entries: Iterable[ExportKey]) -> Dict[ExportKey, Optional[str]]:
+        todo = list(dict.fromkeys(entries))
+        results: Dict[ExportKey, Optional[str]] = {}
+        if not self.template and todo and self.pool_factory is not None:
+            # No template yet: one pool's worth of browser exports teaches it
+            seed_size = (await self._browser()).size
+            results.update(await self._via_browser(todo[:seed_size]))
+            todo = todo[seed_size:]
+        results.update(await self._direct(todo))
+        results.update(await self._via_browser([k for k in todo if not results.get(k)]))
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        stats: Dict[str, object] = {"direct": self.direct, "via_browser": self.via_browser}
+        if self._pool is not None:
+            stats["browser_pool"] = self._pool.stats()
+        return stats
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.__aexit__(None, None, None)
+            self._pool = None
+
+    async def __aenter__(self) -> "SpecExporter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
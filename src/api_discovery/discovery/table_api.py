@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+from ..http import AsyncHTTPClient, HTTPClient
+
+DEFAULT_PAGE_SIZE = 10000
+DEFAULT_PREFETCH = 4
+
+
+def _page_params(fields: str, query: str, limit: int, offset: int) -> Dict[str, object]:
+    # Offset pages are fetched concurrently; without an explicit order the instance may return
+    # overlapping or gapped pages, so every page is ordered by sys_id
+    return {
+        "sysparm_fields": fields,
+        "sysparm_limit": limit,
+        "sysparm_offset": offset,
+        "sysparm_query": f"{query}^ORDERBYsys_id" if query else "ORDERBYsys_id",
+        "sysparm_exclude_reference_link": "true",
+    }
+
+
+def _rows(resp: httpx.Response) -> List[Dict[str, object]]:
+    return resp.json().get("result", []) or []
+
+
+def _total_from_headers(resp: httpx.Response) -> Optional[int]:
+    try:
+        return int(resp.headers["X-Total-Count"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _stats_params(query: str) -> Dict[str, object]:
+    params: Dict[str, object] = {"sysparm_count": "true"}
+    if query:
+        params["sysparm_query"] = query
+    return params
+
+
+def _count_from_stats(resp: httpx.Response) -> Optional[int]:
+    try:
+        return int(resp.json()["result"]["stats"]["count"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def count_rows(client: HTTPClient, table: str, query: str = "") -> Optional[int]:
+    # Aggregate API: a single cheap COUNT when X-Total-Count is not returned
+    try:
+        return _count_from_stats(client.get(f"/api/now/stats/{table}", params=_stats_params(query)))
+    except Exception:  # noqa: BLE001
+        return None
+
+
+async def count_rows_async(client: AsyncHTTPClient, table: str, query: str = "") -> Optional[int]:
+    try:
+        return _count_from_stats(await client.get(f"/api/now/stats/{table}", params=_stats_params(query)))
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def iter_table_rows(
+    client: HTTPClient,
+    table: str,
+    *,
+    fields: str,
+    query: str = "",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    prefetch: int = DEFAULT_PREFETCH,
+) -> Iterator[Dict[str, object]]:
+    # The first page tells us the total (X-Total-Count, else the stats API); the remaining
+    # pages are then fetched on ``prefetch`` threads and yielded in arrival order. The client's
+    # rate limiter still bounds the overall request rate.
+    path = f"/api/now/table/{table}"
+    first = client.get(path, params=_page_params(fields, query, page_size, 0))
+    page = _rows(first)
+    yield from page
+    if len(page) < page_size:
+        return
+    total = _total_from_headers(first)
+    if total is None:
+        total = count_rows(client, table, query)
+    if total is None or prefetch <= 1:
+        # Unknown size (or no prefetch): walk pages until a short one
+        offset = page_size
+        while True:
+            page = _rows(client.get(path, params=_page_params(fields, query, page_size, offset)))
+            yield from page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    pool = ThreadPoolExecutor(max_workers=prefetch)
+    try:
+        futures = [
+            pool.submit(client.get, path, params=_page_params(fields, query, page_size, offset))
+            for offset in range(page_size, total, page_size)
+        ]
+        for fut in as_completed(futures):
+            yield from _rows(fut.result())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def aiter_table_rows(
+    client: AsyncHTTPClient, table: str, *, fields: str, query: str = "", page_size: int = DEFAULT_PAGE_SIZE
+) -> AsyncIterator[Dict[str, object]]:
+    # Same plan as iter_table_rows; concurrency is bounded by the client's max_concurrency
+    path = f"/api/now/table/{table}"
+    first = await client.get(path, params=_page_params(fields, query, page_size, 0))
+    page = _rows(first)
+    for row in page:
+        yield row
+    if len(page) < page_size:
+        return
+    total = _total_from_headers(first)
+    if total is None:
+        total = await count_rows_async(client, table, query)
+    if total is None:
+        offset = page_size
+        while True:
+            page = _rows(await client.get(path, params=_page_params(fields, query, page_size, offset)))
+            for row in page:
+                yield row
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    tasks = [
+        asyncio.ensure_future(client.get(path, params=_page_params(fields, query, page_size, offset)))
+        for offset in range(page_size, total, page_size)
+    ]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            for row in _rows(await fut):
+                yield row
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _keyset_params(fields: str, query: str, limit: int, last_sys_id: str) -> Dict[str, object]:
+    clauses = [query] if query else []
+    if last_sys_id:
+        clauses.append(f"sys_id>{last_sys_id}")
+    clauses.append("ORDERBYsys_id")
+    return {
+        "sysparm_fields": fields,
+        "sysparm_limit": limit,
+        "sysparm_query": "^".join(clauses),
+        "sysparm_exclude_reference_link": "true",
+        "sysparm_no_count": "true",
+    }
+
+
+def _keyset_fields(fields: str) -> tuple[str, bool]:
+    names = [f for f in fields.split(",") if f]
+    if "sys_id" in names:
+        return fields, False
+    return ",".join(names + ["sys_id"]), True
+
+
+def iter_table_keyset(
+    client: HTTPClient, table: str, *, fields: str, query: str = "", page_size: int = DEFAULT_PAGE_SIZE
+) -> Iterator[Dict[str, object]]:
+    # Keyset pagination (sys_id > last seen, ordered by sys_id): every page is an indexed range
+    # scan on the instance, unlike deep sysparm_offset values, and only one page is held in memory.
+    path = f"/api/now/table/{table}"
+    request_fields, strip_sys_id = _keyset_fields(fields)
+    last = ""
+    while True:
+        page = _rows(client.get(path, params=_keyset_params(request_fields, query, page_size, last)))
+        if not page:
+            return
+        last = str(page[-1].get("sys_id") or "")
+        for row in page:
+            if strip_sys_id:
+                row.pop("sys_id", None)
+            yield row
+        if len(page) < page_size or not last:
+            return
+
+
+async def aiter_table_keyset(
+    client: AsyncHTTPClient, table: str, *, fields: str, query: str = "", page_size: int = DEFAULT_PAGE_SIZE
+) -> AsyncIterator[Dict[str, object]]:
+    path = f"/api/now/table/{table}"
+    request_fields, strip_sys_id = _keyset_fields(fields)
+    last = ""
+    while True:
+        page = _rows(await client.get(path, params=_keyset_params(request_fields, query, page_size, last)))
+        if not page:
+            return
+        last = str(page[-1].get("sys_id") or "")
+        for row in page:
+            if strip_sys_id:
+                row.pop("sys_id", None)
+            yield row
+        if len(page) < page_size or not last:
+            return
+
+
+def fetch_all_rows(
+    client: HTTPClient, table: str, *, fields: str, query: str = "", page_size: int = DEFAULT_PAGE_SIZE
+) -> List[Dict[str, object]]:
+    return list(iter_table_rows(client, table, fields=fields, query=query, page_size=page_size))
+
+
+async def fetch_all_rows_async(
+    client: AsyncHTTPClient, table: str, *, fields: str, query: str = "", page_size: int = DEFAULT_PAGE_SIZE
+) -> List[Dict[str, object]]:
+    return [row async for row in aiter_table_rows(client, table, fields=fields, query=query, page_size=page_size)]
+
+
+def chunked(values: List[str], size: int) -> List[List[str]]:
+    return [values[i : i + size] for i in range(0, len(values), max(1, size))]
+
+
+def in_query(field: str, values: List[str], extra: Optional[str] = None) -> str:
+    query = f"{field}IN" + ",".join(values)
+    return f"{query}^{extra}" if extra else query
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
-import time
+import asyncio
+import hashlib
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential_jitter
+
+from .cache import CachedResponse, ResponseCache
+from .config import CommonSettings
+from .ratelimit import (
+    AdaptiveRateController,
+    RateLimiter,
+    build_rate_limiter,
+    rate_controller_from_settings,
+    rate_limiter_from_settings,
+)
+from .retry import (
+    RETRYABLE_STATUSES,
+    CircuitBreaker,
+    RetryPolicy,
+    circuit_breaker_from_settings,
+    path_family,
+    retry_policy_from_settings,
+)
 
 
 @dataclass
@@ -15,6 +34,57 @@ class AuthConfig:
     bearer_token: Optional[str] = None
 
 
+def _build_auth(user_agent: str, auth: Optional[AuthConfig]) -> Tuple[Dict[str, str], Optional[httpx.Auth]]:
+    headers: Dict[str, str] = {"User-Agent": user_agent}
+    auth_obj: Optional[httpx.Auth] = None
+
+    if auth and auth.username and auth.password:
+        auth_obj = httpx.BasicAuth(auth.username, auth.password)
+    elif auth and auth.bearer_token:
+        headers["Authorization"] = f"Bearer {auth.bearer_token}"
+    return headers, auth_obj
+
+
+def _auth_identity(auth: Optional[AuthConfig]) -> str:
+    # Cached responses are scoped to the credentials that fetched them (ACLs differ per user)
+    if auth and auth.username and auth.password:
+        return "basic:" + auth.username
+    if auth and auth.bearer_token:
+        return "bearer:" + hashlib.sha256(auth.bearer_token.encode()).hexdigest()[:16]
+    return "anonymous"
+
+
+def _settle_cached(
+    cache: ResponseCache, key: str, cached: Optional[CachedResponse], request: httpx.Request, response: httpx.Response
+) -> httpx.Response:
+    if response.status_code == 304 and cached is not None:
+        cache.refresh(key, str(request.url))
+        return cached.to_response(request)
+    if response.status_code == 200:
+        cache.store(key, response)
+    return response
+
+
+def _observe(client: "HTTPClient | AsyncHTTPClient", family: str, response: httpx.Response) -> None:
+    if client.rate_controller:
+        client.rate_controller.observe(response.status_code, response.headers)
+    if response.status_code in RETRYABLE_STATUSES:
+        client.circuit_breaker.record_failure(family)
+    else:
+        client.circuit_breaker.record_success(family)
+
+
+def _client_stats(client: "HTTPClient | AsyncHTTPClient") -> Dict[str, object]:
+    budget = client.retry_policy.budget
+    return {
+        "requests": client.requests_sent,
+        "retries": client.retry_policy.retries,
+        "retry_budget_remaining": budget.remaining if budget else None,
+        "current_rate": client.rate_limiter.rate,
+        "circuit_breakers": client.circuit_breaker.states(),
+    }
+
+
 class HTTPClient:
     def __init__(
         self,
@@ -24,41 +94,104 @@ class HTTPClient:
         timeout_seconds: float = 30.0,
         user_agent: str = "api-discovery/0.1",
         rate_limit_per_second: float = 5.0,
+        rate_limit_burst: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_controller: Optional[AdaptiveRateController] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cache: Optional[ResponseCache] = None,
         auth: Optional[AuthConfig] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = httpx.Timeout(timeout_seconds)
         self.verify = verify
         self.user_agent = user_agent
-        self._min_interval = 1.0 / max(rate_limit_per_second, 0.1)
-        self._last_request_at = 0.0
-
-        headers: Dict[str, str] = {"User-Agent": self.user_agent}
-        auth_obj: Optional[httpx.Auth] = None
-
-        if auth and auth.username and auth.password:
-            auth_obj = httpx.BasicAuth(auth.username, auth.password)
-        elif auth and auth.bearer_token:
-            headers["Authorization"] = f"Bearer {auth.bearer_token}"
+        self.rate_limiter = rate_limiter or build_rate_limiter(rate_limit_per_second, burst=rate_limit_burst)
+        self.rate_controller = rate_controller
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.requests_sent = 0
+        self._count_lock = threading.Lock()  # page prefetch sends from worker threads
+        self.cache = cache
+        self._cache_identity = _auth_identity(auth)
 
+        headers, auth_obj = _build_auth(self.user_agent, auth)
         self._client = httpx.Client(
             base_url=self.base_url, headers=headers, timeout=self.timeout, verify=self.verify, auth=auth_obj
         )
 
+    @classmethod
+    def from_settings(
+        cls, settings: CommonSettings, *, base_url: str, auth: Optional[AuthConfig] = None, cache: Optional[ResponseCache] = None
+    ) -> "HTTPClient":
+        limiter = rate_limiter_from_settings(settings)
+        return cls(
+            base_url=base_url,
+            verify=settings.verify_tls,
+            timeout_seconds=settings.request_timeout_seconds,
+            user_agent=settings.user_agent,
+            rate_limiter=limiter,
+            rate_controller=rate_controller_from_settings(settings, limiter),
+            retry_policy=retry_policy_from_settings(settings),
+            circuit_breaker=circuit_breaker_from_settings(settings),
+            cache=cache,
+            auth=auth,
+        )
+
+    @property
+    def current_rate(self) -> float:
+        return self.rate_limiter.rate
+
+    def stats(self) -> Dict[str, object]:
+        return _client_stats(self)
+
     def _respect_rate_limit(self) -> None:
-        now = time.monotonic()
-        elapsed = now - self._last_request_at
-        if elapsed < self._min_interval:
-            time.sleep(self._min_interval - elapsed)
-        self._last_request_at = time.monotonic()
+        self.rate_limiter.acquire()
+
+    def _send(self, method: str, url: str, family: str, **kwargs: Any) -> httpx.Response:
+        probe = self.circuit_breaker.before_request(family)
+        try:
+            self._respect_rate_limit()
+            with self._count_lock:
+                self.requests_sent += 1
+            try:
+                response = self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                self.circuit_breaker.record_failure(family)
+                raise
+            _observe(self, family, response)
+        finally:
+            if probe:
+                self.circuit_breaker.end_probe(family)
+        if response.status_code != 304:  # answer to a cache revalidation, not a redirect
+            response.raise_for_status()
+        return response
 
-    @retry(wait=wait_exponential_jitter(initial=0.25, max=4.0), stop=stop_after_attempt(5))
     def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
-        self._respect_rate_limit()
-        response = self._client.request(method, url, **kwargs)
-        response.raise_for_status()
+        if self.cache is not None and method.upper() == "GET":
+            return self._cached_get(url, **kwargs)
+        return self._request(method, url, **kwargs)
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        # Only transient failures (transport errors, 429, 502/503/504) are retried
+        family = path_family(url)
+        for attempt in self.retry_policy.retrying():
+            with attempt:
+                response = self._send(method, url, family, **kwargs)
         return response
 
+    def _cached_get(self, url: str, **kwargs: Any) -> httpx.Response:
+        assert self.cache is not None
+        request = self._client.build_request("GET", url, params=kwargs.get("params"))
+        key = self.cache.key("GET", str(request.url), self._cache_identity)
+        cached = self.cache.lookup(key)
+        if cached is not None and cached.fresh:
+            return cached.to_response(request)
+        if cached is not None:
+            kwargs["headers"] = {**cached.validators(), **(kwargs.get("headers") or {})}
+        response = self._request("GET", url, **kwargs)
+        return _settle_cached(self.cache, key, cached, request, response)
+
     def get(self, url: str, **kwargs: Any) -> httpx.Response:
         return self.request("GET", url, **kwargs)
 
@@ -80,3 +213,139 @@ class HTTPClient:
     def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
         self.close()
 
+
+class AsyncHTTPClient:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        verify: bool = True,
+        timeout_seconds: float = 30.0,
+        user_agent: str = "api-discovery/0.1",
+        rate_limit_per_second: float = 5.0,
+        rate_limit_burst: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_controller: Optional[AdaptiveRateController] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cache: Optional[ResponseCache] = None,
+        max_concurrency: int = 8,
+        auth: Optional[AuthConfig] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(timeout_seconds)
+        self.verify = verify
+        self.user_agent = user_agent
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter or build_rate_limiter(rate_limit_per_second, burst=rate_limit_burst)
+        self.rate_controller = rate_controller
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.requests_sent = 0
+        self.cache = cache
+        self._cache_identity = _auth_identity(auth)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        headers, auth_obj = _build_auth(self.user_agent, auth)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=self.timeout,
+            verify=self.verify,
+            auth=auth_obj,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+        )
+
+    @classmethod
+    def from_settings(
+        cls, settings: CommonSettings, *, base_url: str, auth: Optional[AuthConfig] = None, cache: Optional[ResponseCache] = None
+    ) -> "AsyncHTTPClient":
+        limiter = rate_limiter_from_settings(settings)
+        return cls(
+            base_url=base_url,
+            verify=settings.verify_tls,
+            timeout_seconds=settings.request_timeout_seconds,
+            user_agent=settings.user_agent,
+            rate_limiter=limiter,
+            rate_controller=rate_controller_from_settings(settings, limiter),
+            retry_policy=retry_policy_from_settings(settings),
+            circuit_breaker=circuit_breaker_from_settings(settings),
+            cache=cache,
+            max_concurrency=settings.max_concurrency,
+            auth=auth,
+        )
+
+    @property
+    def current_rate(self) -> float:
+        return self.rate_limiter.rate
+
+    def stats(self) -> Dict[str, object]:
+        return _client_stats(self)
+
+    async def _respect_rate_limit(self) -> None:
+        # Request starts are paced by the limiter; they may still overlap in flight.
+        await self.rate_limiter.acquire_async()
+
+    async def _send(self, method: str, url: str, family: str, **kwargs: Any) -> httpx.Response:
+        probe = self.circuit_breaker.before_request(family)
+        try:
+            async with self._semaphore:
+                await self._respect_rate_limit()
+                self.requests_sent += 1
+                try:
+                    response = await self._client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    self.circuit_breaker.record_failure(family)
+                    raise
+            _observe(self, family, response)
+        finally:
+            if probe:
+                self.circuit_breaker.end_probe(family)
+        if response.status_code != 304:  # answer to a cache revalidation, not a redirect
+            response.raise_for_status()
+        return response
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        if self.cache is not None and method.upper() == "GET":
+            return await self._cached_get(url, **kwargs)
+        return await self._request(method, url, **kwargs)
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        family = path_family(url)
+        async for attempt in self.retry_policy.async_retrying():
+            with attempt:
+                response = await self._send(method, url, family, **kwargs)
+        return response
+
+    async def _cached_get(self, url: str, **kwargs: Any) -> httpx.Response:
+        assert self.cache is not None
+        request = self._client.build_request("GET", url, params=kwargs.get("params"))
+        key = self.cache.key("GET", str(request.url), self._cache_identity)
+        cached = self.cache.lookup(key)
+        if cached is not None and cached.fresh:
+            return cached.to_response(request)
+        if cached is not None:
+            kwargs["headers"] = {**cached.validators(), **(kwargs.get("headers") or {})}
+        response = await self._request("GET", url, **kwargs)
+        return _settle_cached(self.cache, key, cached, request, response)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def head(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("HEAD", url, **kwargs)
+
+    async def options(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("OPTIONS", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
+        await self.aclose()
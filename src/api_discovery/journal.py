@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+
+class Journal:
+    # Append-only JSONL log. Entries are buffered and written + fsync'd in batches: when
+    # ``batch_size`` entries are pending or ``flush_seconds`` have passed since the last flush,
+    # so a crash loses at most that window. A torn final line is skipped on replay.
+    def __init__(self, path: str | Path, *, batch_size: int = 500, flush_seconds: float = 2.0) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.flushes = 0
+        self._pending: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, entry: Dict[str, object]) -> None:
+        with self._lock:
+            self._pending.append(json.dumps(entry, separators=(",", ":")))
+            due = len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as fh:
+                fh.write("\n".join(lines) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            self.flushes += 1
+
+    def entries(self) -> Iterator[Dict[str, object]]:
+        if not self.path.exists():
+            return
+        with self.path.open("r") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict):
+                    yield entry
+
+    def size(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def reset(self) -> None:
+        # Called once the entries are folded into a snapshot; anything still buffered is dropped too
+        with self._lock:
+            self._pending = []
+            self.path.unlink(missing_ok=True)
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Protocol, Tuple
+
+from .config import CommonSettings
+
+
+class RateLimiter(Protocol):
+    rate: float
+
+    def acquire(self) -> None: ...
+
+    async def acquire_async(self) -> None: ...
+
+    def set_rate(self, rate_per_second: float) -> None: ...
+
+    def pause(self, seconds: float) -> None: ...
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate: float, burst: int) -> float:
+    return min(float(burst), tokens + max(0.0, now - updated_at) * rate)
+
+
+class TokenBucket:
+    # Reservation-style bucket: a caller takes a token immediately (the balance may go
+    # negative) and then waits outside the lock until its token would have been minted.
+    def __init__(self, rate_per_second: float, burst: int = 1) -> None:
+        self.rate = max(rate_per_second, 0.1)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = _refill(self._tokens, self._updated_at, now, self.rate, self.burst) - 1.0
+            self._updated_at = now
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def set_rate(self, rate_per_second: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = _refill(self._tokens, self._updated_at, now, self.rate, self.burst)
+            self._updated_at = now
+            self.rate = max(rate_per_second, 0.1)
+
+    def pause(self, seconds: float) -> None:
+        # Push the balance into debt so the next token is minted only after ``seconds``
+        with self._lock:
+            now = time.monotonic()
+            tokens = _refill(self._tokens, self._updated_at, now, self.rate, self.burst)
+            self._tokens = min(tokens, -seconds * self.rate)
+            self._updated_at = now
+
+
+class FileTokenBucket:
+    # Same algorithm as TokenBucket, but the balance lives in a small JSON file guarded by
+    # flock(2), so every process pointing at the same file draws from one shared budget.
+    def __init__(self, path: str, rate_per_second: float, burst: int = 1) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rate = max(rate_per_second, 0.1)
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+
+    def _read(self, fd: int) -> Tuple[float, float]:
+        os.lseek(fd, 0, os.SEEK_SET)
+        raw = os.read(fd, 4096)
+        try:
+            data = json.loads(raw.decode() or "{}")
+            return float(data["tokens"]), float(data["updated_at"])
+        except (ValueError, KeyError, TypeError):
+            return float(self.burst), time.time()
+
+    def _write(self, fd: int, tokens: float, updated_at: float) -> None:
+        payload = json.dumps({"tokens": tokens, "updated_at": updated_at}).encode()
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, payload)
+
+    def _reserve(self) -> float:
+        try:
+            import fcntl
+        except ImportError as exc:  # pragma: no cover - non-POSIX
+            raise RuntimeError("Shared rate limiting requires a POSIX platform with fcntl") from exc
+
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                tokens, updated_at = self._read(fd)
+                # Wall clock rather than monotonic: the timestamp is compared across processes.
+                now = time.time()
+                tokens = _refill(tokens, updated_at, now, self.rate, self.burst) - 1.0
+                self._write(fd, tokens, now)
+                return max(0.0, -tokens / self.rate)
+            finally:
+                os.close(fd)
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def set_rate(self, rate_per_second: float) -> None:
+        # Rate is per process; the shared file only holds the balance
+        self.rate = max(rate_per_second, 0.1)
+
+    def pause(self, seconds: float) -> None:
+        import fcntl
+
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                tokens, updated_at = self._read(fd)
+                now = time.time()
+                tokens = _refill(tokens, updated_at, now, self.rate, self.burst)
+                self._write(fd, min(tokens, -seconds * self.rate), now)
+            finally:
+                os.close(fd)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    # ServiceNow sends X-RateLimit-Reset as epoch seconds; tolerate a relative delta as well
+    if not value:
+        return None
+    try:
+        reset = float(value.strip())
+    except ValueError:
+        return None
+    if reset > 1e12:  # epoch milliseconds
+        reset /= 1000.0
+    return max(0.0, reset - time.time()) if reset > 1e9 else max(0.0, reset)
+
+
+class AdaptiveRateController:
+    # AIMD: add ``increase_step`` req/s after every ``success_window`` healthy responses,
+    # multiply by ``decrease_factor`` on 429/503, and never exceed what the instance's
+    # X-RateLimit-Remaining/X-RateLimit-Reset headers say is left in the current window.
+    THROTTLE_STATUSES = frozenset({429, 503})
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        *,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        increase_step: float = 0.5,
+        decrease_factor: float = 0.5,
+        success_window: int = 20,
+    ) -> None:
+        self.limiter = limiter
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else limiter.rate * 5
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.success_window = max(1, success_window)
+        self.throttled = 0
+        self.increases = 0
+        self.decreases = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.limiter.rate
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        with self._lock:
+            rate = self.limiter.rate
+            pause_for = 0.0
+            if status_code in self.THROTTLE_STATUSES:
+                self.throttled += 1
+                self.decreases += 1
+                self._successes = 0
+                rate = max(self.min_rate, rate * self.decrease_factor)
+                pause_for = parse_retry_after(headers.get("Retry-After")) or 0.0
+            elif status_code < 500:
+                self._successes += 1
+                if self._successes >= self.success_window and rate < self.max_rate:
+                    self._successes = 0
+                    self.increases += 1
+                    rate = min(self.max_rate, rate + self.increase_step)
+
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset_in = _parse_reset(headers.get("X-RateLimit-Reset"))
+            if remaining is not None and reset_in is not None:
+                try:
+                    left = max(0, int(remaining))
+                except ValueError:
+                    left = -1
+                if left == 0:
+                    pause_for = max(pause_for, reset_in)
+                elif left > 0:
+                    rate = min(rate, max(self.min_rate, left / max(reset_in, 1.0)))
+
+            if rate != self.limiter.rate:
+                self.limiter.set_rate(rate)
+            if pause_for > 0:
+                self.limiter.pause(pause_for)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "current_rate": self.limiter.rate,
+            "max_rate": self.max_rate,
+            "throttled": self.throttled,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+def build_rate_limiter(rate_per_second: float, *, burst: int = 1, shared_file: Optional[str] = None) -> RateLimiter:
+    if shared_file:
+        return FileTokenBucket(shared_file, rate_per_second, burst)
+    return TokenBucket(rate_per_second, burst)
+
+
+def rate_limiter_from_settings(settings: CommonSettings) -> RateLimiter:
+    return build_rate_limiter(
+        settings.rate_limit_per_second, burst=settings.rate_limit_burst, shared_file=settings.rate_limit_shared_file
+    )
+
+
+def rate_controller_from_settings(settings: CommonSettings, limiter: RateLimiter) -> Optional[AdaptiveRateController]:
+    if not settings.adaptive_rate_limit:
+        return None
+    return AdaptiveRateController(limiter, max_rate=settings.rate_limit_max_per_second)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+from .config import CommonSettings
+from .ratelimit import parse_retry_after
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, family: str, retry_in: float) -> None:
+        super().__init__(f"Circuit open for {family}; retry in {retry_in:.1f}s")
+        self.family = family
+        self.retry_in = retry_in
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUSES
+    # Connect/read/write errors and timeouts; HTTPStatusError is handled above
+    return isinstance(exc, httpx.TransportError)
+
+
+def path_family(url: str) -> str:
+    # /api/now/table/incident -> /api/now/table/*, /api/now/v2/table/x -> /api/now/v2/table/*,
+    # /api/x_acme/orders/v1/items -> /api/x_acme/orders/*; anything else is its own family
+    path = urlsplit(url).path or "/"
+    parts = [p for p in path.split("/") if p]
+    if len(parts) >= 3 and parts[0] == "api":
+        keep = 4 if re.fullmatch(r"v\d+", parts[2]) and len(parts) >= 4 else 3
+        return "/" + "/".join(parts[:keep]) + "/*"
+    return path
+
+
+class RetryBudget:
+    def __init__(self, max_retries: int) -> None:
+        self.max_retries = max(0, max_retries)
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return self.max_retries - self.spent
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.spent >= self.max_retries:
+                return False
+            self.spent += 1
+            return True
+
+
+@dataclass
+class _BreakerState:
+    failures: int = 0
+    opened_at: Optional[float] = None
+    half_open: bool = False
+
+
+class CircuitBreaker:
+    # Opens a path family after ``failure_threshold`` consecutive transient failures; after
+    # ``reset_timeout`` one probe request is let through (half-open) to decide whether to close.
+    def __init__(self, failure_threshold: int = 10, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._states: Dict[str, _BreakerState] = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, family: str) -> bool:
+        # True when this request is the half-open probe; the caller must end it with end_probe()
+        with self._lock:
+            st = self._states.get(family)
+            if not st or st.opened_at is None:
+                return False
+            waited = time.monotonic() - st.opened_at
+            if waited < self.reset_timeout or st.half_open:
+                raise CircuitOpenError(family, max(0.0, self.reset_timeout - waited))
+            st.half_open = True
+            return True
+
+    def end_probe(self, family: str) -> None:
+        # A probe that ended without a verdict (cancelled, non-transport error) lets the next request probe instead
+        with self._lock:
+            st = self._states.get(family)
+            if st is not None:
+                st.half_open = False
+
+    def record_success(self, family: str) -> None:
+        with self._lock:
+            self._states.pop(family, None)
+
+    def record_failure(self, family: str) -> None:
+        with self._lock:
+            st = self._states.setdefault(family, _BreakerState())
+            st.failures += 1
+            if st.half_open or st.failures >= self.failure_threshold:
+                st.opened_at = time.monotonic()
+                st.half_open = False
+
+    def state(self, family: str) -> str:
+        with self._lock:
+            st = self._states.get(family)
+            if not st or st.opened_at is None:
+                return "closed"
+            if st.half_open or time.monotonic() - st.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            families = list(self._states)
+        return {family: self.state(family) for family in families}
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 5,
+        budget: Optional[RetryBudget] = None,
+        initial_wait: float = 0.25,
+        max_wait: float = 4.0,
+        max_retry_after: float = 60.0,
+        honor_retry_after: bool = True,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.budget = budget
+        self.max_retry_after = max_retry_after
+        # False when an AdaptiveRateController already pauses the shared limiter for Retry-After:
+        # the retry then goes straight back to the limiter instead of sleeping a second time
+        self.honor_retry_after = honor_retry_after
+        self.retries = 0
+        self._backoff = wait_exponential_jitter(initial=initial_wait, max=max_wait)
+        self._lock = threading.Lock()
+
+    def should_retry(self, exc: BaseException) -> bool:
+        if not is_transient(exc):
+            return False
+        return self.budget is None or self.budget.remaining > 0
+
+    def _before_sleep(self, retry_state: RetryCallState) -> None:
+        # Charged here rather than in should_retry so the final, non-retried attempt is free
+        if self.budget is not None:
+            self.budget.try_spend()
+        with self._lock:
+            self.retries += 1
+
+    def _wait(self, retry_state: RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after) if self.honor_retry_after else 0.0
+        return self._backoff(retry_state)
+
+    def retrying(self) -> Retrying:
+        return Retrying(
+            retry=retry_if_exception(self.should_retry),
+            wait=self._wait,
+            stop=stop_after_attempt(self.max_attempts),
+            before_sleep=self._before_sleep,
+            reraise=True,
+        )
+
+    def async_retrying(self) -> AsyncRetrying:
+        return AsyncRetrying(
+            retry=retry_if_exception(self.should_retry),
+            wait=self._wait,
+            stop=stop_after_attempt(self.max_attempts),
+            before_sleep=self._before_sleep,
+            reraise=True,
+        )
+
+
+def retry_policy_from_settings(settings: CommonSettings) -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=settings.retry_max_attempts,
+        budget=RetryBudget(settings.retry_budget),
+        honor_retry_after=not settings.adaptive_rate_limit,
+    )
+
+
+def circuit_breaker_from_settings(settings: CommonSettings) -> CircuitBreaker:
+    return CircuitBreaker(settings.circuit_breaker_threshold, settings.circuit_breaker_reset_seconds)
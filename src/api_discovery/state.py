@@ -1,19 +1,90 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass, asdict, field
+import os
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from pydantic import BaseModel
+from .dictionary_pack import PACK_NAME, DictionaryPack, FileLock, RefIndex, content_hash
+from .journal import Journal
 
+_SOURCES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
 
-class Evidence(BaseModel):
-    sources: List[str]
+
+@dataclass(frozen=True, slots=True)
+class Evidence:
+    # Immutable, so records can share instances: a crawl produces a handful of distinct
+    # (sources, confidence) pairs across 100k+ records. Build them through evidence().
+    sources: Tuple[str, ...]
     confidence: float
 
+    def __post_init__(self) -> None:
+        # Same coercion the pydantic model did: a non-numeric confidence raises ValueError
+        sources = tuple(sys.intern(str(s)) for s in self.sources)
+        object.__setattr__(self, "sources", _SOURCES.setdefault(sources, sources))
+        object.__setattr__(self, "confidence", float(self.confidence))
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"sources": list(self.sources), "confidence": self.confidence}
+
+    # Kept for callers written against the pydantic Evidence model
+    model_dump = to_dict
+
+
+_EVIDENCE: Dict[Tuple[Tuple[str, ...], float], Evidence] = {}
+
+
+def evidence(sources: Iterable[str], confidence: float) -> Evidence:
+    key = (tuple(sources), float(confidence))
+    found = _EVIDENCE.get(key)
+    if found is None:
+        found = _EVIDENCE[key] = Evidence(*key)
+    return found
+
+
+def _evidence_from(data: object) -> Optional[Evidence]:
+    if not isinstance(data, dict):
+        return None
+    return evidence(data.get("sources") or (), data.get("confidence") or 0.0)
+
+
+class OrderedNameSet:
+    # Insertion-ordered set of names with O(1) add/discard/membership (a dict with None values)
+    __slots__ = ("_items",)
 
-@dataclass
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._items: Dict[str, None] = dict.fromkeys(names)
+
+    def add(self, name: str) -> None:
+        self._items[name] = None
+
+    def discard(self, name: str) -> None:
+        self._items.pop(name, None)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, OrderedNameSet):
+            return list(self._items) == list(other._items)
+        return isinstance(other, list) and list(self._items) == other
+
+    def __repr__(self) -> str:
+        return f"OrderedNameSet({list(self._items)!r})"
+
+
+@dataclass(slots=True)
 class ResourceRecord:
     name: str
     kind: str  # e.g., table, endpoint
@@ -22,15 +93,84 @@ class ResourceRecord:
     meta: Dict[str, object] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class DiscoveryState:
     known: Dict[str, ResourceRecord] = field(default_factory=dict)
-    unknown: List[str] = field(default_factory=list)
+    unknown: OrderedNameSet = field(default_factory=OrderedNameSet)
     platform: str = ""
     generator_version: str = "0.1.0"
+    # instance -> table -> highest sys_updated_on seen, for incremental re-discovery
+    watermarks: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.unknown, OrderedNameSet):
+            self.unknown = OrderedNameSet(self.unknown)
+
+
+def _read_json_state(path: Path, platform: str) -> DiscoveryState:
+    if not path.exists():
+        return DiscoveryState(platform=platform)
+    data = json.loads(path.read_text())
+    known = {key: ResourceRecord(**{**val, "evidence": _evidence_from(val.get("evidence"))}) for key, val in data.get("known", {}).items()}
+    return DiscoveryState(
+        known=known,
+        unknown=data.get("unknown", []),
+        platform=data.get("platform", platform),
+        generator_version=data.get("generator_version", "0.1.0"),
+        watermarks=data.get("watermarks", {}),
+    )
+
+
+def _upsert(state: DiscoveryState, rec: ResourceRecord) -> None:
+    state.known[rec.name] = rec
+    state.unknown.discard(rec.name)
+
+
+def _add_unknown(state: DiscoveryState, name: str) -> bool:
+    if name in state.unknown or name in state.known:
+        return False
+    state.unknown.add(name)
+    return True
+
+
+def _set_verified(state: DiscoveryState, name: str, evidence: Optional[Evidence]) -> bool:
+    rec = state.known.get(name)
+    if not rec:
+        return False
+    rec.verified = True
+    if evidence:
+        rec.evidence = evidence
+    return True
+
+
+def _replay(state: DiscoveryState, journal: Journal) -> int:
+    applied = 0
+    for entry in journal.entries():
+        op, name = entry.get("op"), str(entry.get("name") or "")
+        evidence = _evidence_from(entry.get("evidence"))
+        if op == "upsert":
+            meta = entry.get("meta")
+            _upsert(state, ResourceRecord(name, str(entry.get("kind") or ""), bool(entry.get("verified")), evidence, meta if isinstance(meta, dict) else {}))
+        elif op == "unknown":
+            _add_unknown(state, name)
+        elif op == "verified":
+            _set_verified(state, name, evidence)
+        elif op == "remove":
+            state.known.pop(name, None)
+            state.unknown.discard(name)
+        else:
+            continue
+        applied += 1
+    return applied
 
 
 class StateStore:
+    # Mutations only mark names dirty; checkpoint() journals their current records to state.journal
+    # (fsync'd) and load() replays it, so a crash loses at most what changed since the last checkpoint.
+    # save() folds everything into state.json and drops the journal, so upserts stay plain dict writes.
+    journaled = True
+    compact_journal_bytes = 8 * 1024 * 1024
+
     def __init__(self, root_dir: str, platform: str, *, namespace: str | None = None, api_name: str | None = None, api_version: str | None = None) -> None:
         self.root = Path(root_dir)
         self.platform = platform
@@ -45,22 +185,42 @@ class StateStore:
         self.platform_dir.mkdir(parents=True, exist_ok=True)
         self.state_path = self.platform_dir / "state.json"
         self.cache_dir = self.platform_dir / "dictionaries"
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Dictionary content is stored once per instance (platform dir), keyed by content hash;
+        # each state dir only keeps table -> hash references into it. Nothing is opened or created
+        # until a dictionary is read or written, so status-style commands leave the tree alone.
+        self.store_dir = self.root / platform / "_dictionaries"
+        # Every ref file shares the store's file lock, so compaction never runs between a pack write and its ref
+        self.dictionary_lock = FileLock.for_path(self.store_dir / ".lock")
+        self.journal = Journal(self.platform_dir / "state.journal") if self.journaled else None
+        self._dirty: Dict[str, None] = {}
 
     def load(self) -> DiscoveryState:
-        if not self.state_path.exists():
-            return DiscoveryState(platform=self.platform)
-        data = json.loads(self.state_path.read_text())
-        known = {
-            key: ResourceRecord(**{**val, "evidence": Evidence(**val["evidence"]) if val.get("evidence") else None})
-            for key, val in data.get("known", {}).items()
-        }
-        return DiscoveryState(
-            known=known,
-            unknown=data.get("unknown", []),
-            platform=data.get("platform", self.platform),
-            generator_version=data.get("generator_version", "0.1.0"),
-        )
+        state = _read_json_state(self.state_path, self.platform)
+        if self.journal is not None:
+            _replay(state, self.journal)
+        return state
+
+    def _touch(self, name: str) -> None:
+        if self.journal is not None:
+            self._dirty[name] = None
+
+    def checkpoint(self, state: DiscoveryState) -> None:
+        # For long runs: make pending mutations durable, and fold the journal into state.json once it grows large
+        if self.journal is None:
+            return
+        dirty, self._dirty = self._dirty, {}
+        for name in dirty:
+            rec = state.known.get(name)
+            if rec is not None:
+                ev = rec.evidence.to_dict() if rec.evidence else None
+                self.journal.append({"op": "upsert", "name": name, "kind": rec.kind, "verified": rec.verified, "evidence": ev, "meta": rec.meta})
+            elif name in state.unknown:
+                self.journal.append({"op": "unknown", "name": name})
+            else:
+                self.journal.append({"op": "remove", "name": name})
+        self.journal.flush()
+        if self.journal.size() >= self.compact_journal_bytes:
+            self.save(state)
 
     def save(self, state: DiscoveryState) -> None:
         serializable_known: dict[str, dict[str, object]] = {}
@@ -69,7 +229,7 @@ class StateStore:
                 "name": v.name,
                 "kind": v.kind,
                 "verified": v.verified,
-                "evidence": v.evidence.model_dump() if v.evidence else None,
+                "evidence": v.evidence.to_dict() if v.evidence else None,
                 "meta": v.meta,
             }
 
@@ -78,26 +238,74 @@ class StateStore:
             "unknown": list(state.unknown),
             "platform": state.platform,
             "generator_version": state.generator_version,
+            "watermarks": state.watermarks,
         }
-        self.state_path.write_text(json.dumps(serializable, indent=2, sort_keys=True))
+        # Snapshot first (atomic replace), then drop the journal it now covers
+        tmp = self.state_path.with_suffix(".json.tmp")
+        with tmp.open("w") as fh:
+            fh.write(json.dumps(serializable, indent=2, sort_keys=True))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.state_path)
+        self._dirty = {}
+        if self.journal is not None:
+            self.journal.reset()
 
     def upsert_resource(
         self, state: DiscoveryState, name: str, kind: str, *, verified: bool = False, evidence: Optional[Evidence] = None, meta: Optional[Dict[str, object]] = None
     ) -> None:
-        state.known[name] = ResourceRecord(name=name, kind=kind, verified=verified, evidence=evidence, meta=meta or {})
-        if name in state.unknown:
-            state.unknown = [u for u in state.unknown if u != name]
+        rec = ResourceRecord(name=name, kind=kind, verified=verified, evidence=evidence, meta=meta or {})
+        _upsert(state, rec)
+        self._touch(name)
 
     def add_unknown(self, state: DiscoveryState, name: str) -> None:
-        if name not in state.unknown and name not in state.known:
-            state.unknown.append(name)
+        if _add_unknown(state, name):
+            self._touch(name)
+
+    def remove_resource(self, state: DiscoveryState, name: str) -> None:
+        if state.known.pop(name, None) is not None:
+            self._touch(name)
+
+    @cached_property
+    def dictionaries(self) -> DictionaryPack:
+        return DictionaryPack(self.store_dir, lock=self.dictionary_lock)
+
+    @cached_property
+    def instance_refs(self) -> RefIndex:
+        return RefIndex(self.store_dir / "refs.idx", lock=self.dictionary_lock)
+
+    @cached_property
+    def refs(self) -> RefIndex:
+        if self.platform_dir == self.root / self.platform:
+            return self.instance_refs
+        return RefIndex(self.cache_dir / "refs.idx", lock=self.dictionary_lock)
+
+    @cached_property
+    def _legacy_pack(self) -> Optional[DictionaryPack]:
+        return DictionaryPack(self.cache_dir) if (self.cache_dir / PACK_NAME).exists() else None
 
     def write_dictionary_cache(self, table: str, fields: list[dict[str, object]]) -> Path:
-        path = self.cache_dir / f"{table}.json"
-        path.write_text(json.dumps({"fields": fields}, indent=2))
-        return path
+        digest = content_hash(fields)
+        with self.dictionaries.lock:
+            self.dictionaries.write(digest, fields, digest=digest)
+            self.refs.set(table, digest)
+            self.instance_refs.set(table, digest)
+        return self.dictionaries.pack_path
+
+    def dictionary_digest(self, table: str) -> Optional[str]:
+        # The instance-wide ref is the newest download of the table by any state dir
+        return self.instance_refs.get(table) or self.refs.get(table)
 
     def read_dictionary_cache(self, table: str) -> list[dict[str, object]]:
+        digest = self.dictionary_digest(table)
+        if digest and digest in self.dictionaries:
+            return self.dictionaries.read(digest)
+        return self._read_legacy_dictionary(table)
+
+    def _read_legacy_dictionary(self, table: str) -> list[dict[str, object]]:
+        # Per-directory packs keyed by table, and per-table JSON files before that; fold_legacy_dictionaries imports both
+        if self._legacy_pack is not None and table in self._legacy_pack:
+            return self._legacy_pack.read(table)
         path = self.cache_dir / f"{table}.json"
         if not path.exists():
             return []
@@ -105,12 +313,204 @@ class StateStore:
         return list(data.get("fields", []))
 
     def list_cached_tables(self) -> list[str]:
-        return [p.stem for p in self.cache_dir.glob("*.json")]
+        tables = self.instance_refs.tables() + self.refs.tables()
+        if not tables:
+            # Listing legacy files means a directory scan, so they only count until the store has entries
+            tables = (self._legacy_pack.tables() if self._legacy_pack else []) + [p.stem for p in self.cache_dir.glob("*.json")]
+        return list(dict.fromkeys(tables))
+
+    def fold_legacy_dictionaries(self) -> int:
+        folded = 0
+        if self._legacy_pack is not None:
+            for table, fields in self._legacy_pack.items():
+                self.write_dictionary_cache(table, fields)
+                folded += 1
+            self._legacy_pack.close()
+            self._legacy_pack.pack_path.unlink(missing_ok=True)
+            self._legacy_pack.index_path.unlink(missing_ok=True)
+            self._legacy_pack = None
+        for path in sorted(self.cache_dir.glob("*.json")):
+            if self.refs.get(path.stem) is None:
+                self.write_dictionary_cache(path.stem, list(json.loads(path.read_text()).get("fields", [])))
+                folded += 1
+            path.unlink()
+        return folded
+
+    def compact_dictionary_cache(self) -> tuple[int, int]:
+        # Content still referenced by any state dir of this instance survives; the rest is dropped.
+        # Refs are re-read from disk under the store lock: other stores and processes write to them too.
+        self.fold_legacy_dictionaries()
+        live: set[str] = set()
+        with self.dictionaries.lock:
+            for path in (self.root / self.platform).rglob("refs.idx"):
+                refs = self.instance_refs if path == self.instance_refs.path else RefIndex(path, lock=self.dictionaries.lock)
+                refs.compact()
+                live |= refs.digests()
+            return self.dictionaries.compact(keep=live)
+
+    def set_verified(self, state: DiscoveryState, name: str, *, evidence: Optional[Evidence] = None) -> None:
+        if _set_verified(state, name, evidence):
+            self._touch(name)
+
+
+_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    verified INTEGER NOT NULL DEFAULT 0,
+    evidence TEXT,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS resources_kind ON resources (kind, verified);
+CREATE INDEX IF NOT EXISTS resources_verified ON resources (verified);
+CREATE TABLE IF NOT EXISTS unknown (seq INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_Row = Tuple[str, str, int, Optional[str], str]
+
+
+def _record_row(rec: ResourceRecord) -> _Row:
+    return (rec.name, rec.kind, int(rec.verified), _evidence_json(rec.evidence) if rec.evidence else None, json.dumps(rec.meta, sort_keys=True))
+
+
+@lru_cache(maxsize=256)
+def _evidence_json(ev: Evidence) -> str:
+    return json.dumps(ev.to_dict())
+
+
+class SqliteStateStore(StateStore):
+    # Same interface as StateStore, but state lives in state.sqlite (WAL): upsert_resource,
+    # add_unknown and set_verified write their row immediately, and save() only rewrites rows
+    # that changed since they were loaded or last written. Dictionary caches stay on disk.
+    journaled = False  # every mutation is already its own committed row
+
+    def __init__(self, root_dir: str, platform: str, **kwargs: str | None) -> None:
+        super().__init__(root_dir, platform, **kwargs)
+        self.db_path = self.platform_dir / "state.sqlite"
+        fresh = not self.db_path.exists()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_STATE_SCHEMA)
+        self._written: Dict[str, _Row] = {}
+        if fresh and self.state_path.exists():
+            migrate_json_state(self)
+
+    def load(self) -> DiscoveryState:
+        with self._lock:
+            rows = self._conn.execute("SELECT name, kind, verified, evidence, meta FROM resources").fetchall()
+            unknown = OrderedNameSet(r[0] for r in self._conn.execute("SELECT name FROM unknown ORDER BY seq"))
+            meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        known: Dict[str, ResourceRecord] = {}
+        self._written = {}
+        for name, kind, verified, evidence, rec_meta in rows:
+            known[name] = ResourceRecord(
+                name=name,
+                kind=kind,
+                verified=bool(verified),
+                evidence=_evidence_from(json.loads(evidence)) if evidence else None,
+                meta=json.loads(rec_meta),
+            )
+            self._written[name] = (name, kind, int(verified), evidence, rec_meta)
+        return DiscoveryState(
+            known=known,
+            unknown=unknown,
+            platform=meta.get("platform", self.platform),
+            generator_version=meta.get("generator_version", "0.1.0"),
+            watermarks=json.loads(meta.get("watermarks", "{}")),
+        )
+
+    def save(self, state: DiscoveryState) -> None:
+        changed = [row for row in map(_record_row, state.known.values()) if self._written.get(row[0]) != row]
+        removed = [(name,) for name in self._written if name not in state.known]
+        meta = {"platform": state.platform, "generator_version": state.generator_version, "watermarks": json.dumps(state.watermarks, sort_keys=True)}
+        with self._lock, self._conn:
+            self._upsert_rows(changed)
+            self._conn.executemany("DELETE FROM resources WHERE name = ?", removed)
+            self._conn.execute("DELETE FROM unknown")
+            self._conn.executemany("INSERT OR IGNORE INTO unknown (name) VALUES (?)", [(u,) for u in state.unknown])
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(meta.items()))
+        for name, in removed:
+            self._written.pop(name, None)
+
+    def _upsert_rows(self, rows: List[_Row]) -> None:
+        self._conn.executemany(
+            "INSERT INTO resources (name, kind, verified, evidence, meta) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, verified = excluded.verified, "
+            "evidence = excluded.evidence, meta = excluded.meta",
+            rows,
+        )
+        self._written.update((row[0], row) for row in rows)
+
+    def _write_record(self, rec: ResourceRecord) -> None:
+        with self._lock, self._conn:
+            self._upsert_rows([_record_row(rec)])
+
+    def upsert_resource(
+        self, state: DiscoveryState, name: str, kind: str, *, verified: bool = False, evidence: Optional[Evidence] = None, meta: Optional[Dict[str, object]] = None
+    ) -> None:
+        was_unknown = name in state.unknown
+        super().upsert_resource(state, name, kind, verified=verified, evidence=evidence, meta=meta)
+        with self._lock, self._conn:
+            self._upsert_rows([_record_row(state.known[name])])
+            if was_unknown:
+                self._conn.execute("DELETE FROM unknown WHERE name = ?", (name,))
+
+    def add_unknown(self, state: DiscoveryState, name: str) -> None:
+        if name in state.unknown or name in state.known:
+            return
+        super().add_unknown(state, name)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO unknown (name) VALUES (?)", (name,))
 
     def set_verified(self, state: DiscoveryState, name: str, *, evidence: Optional[Evidence] = None) -> None:
+        super().set_verified(state, name, evidence=evidence)
         rec = state.known.get(name)
         if rec:
-            rec.verified = True
-            if evidence:
-                rec.evidence = evidence
+            self._write_record(rec)
+
+    def remove_resource(self, state: DiscoveryState, name: str) -> None:
+        super().remove_resource(state, name)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM resources WHERE name = ?", (name,))
+        self._written.pop(name, None)
+
+    def names(self, *, kind: Optional[str] = None, verified: Optional[bool] = None) -> List[str]:
+        # Served from the (kind, verified) indexes without loading the state
+        clauses: List[str] = []
+        params: List[object] = []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if verified is not None:
+            clauses.append("verified = ?")
+            params.append(int(verified))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return [r[0] for r in self._conn.execute(f"SELECT name FROM resources{where} ORDER BY name", params)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_state(store: SqliteStateStore, *, json_path: Optional[Path] = None) -> int:
+    # One-shot import of an existing state.json; the JSON file is left in place as a backup
+    source = Path(json_path) if json_path else store.state_path
+    state = _read_json_state(source, store.platform)
+    _replay(state, Journal(source.parent / "state.journal"))
+    store.save(state)
+    return len(state.known)
+
+
+STATE_BACKENDS = ("json", "sqlite")
+
 
+def open_state_store(root_dir: str, platform: str, *, backend: str = "json", **kwargs: str | None) -> StateStore:
+    if backend == "sqlite":
+        return SqliteStateStore(root_dir, platform, **kwargs)
+    if backend != "json":
+        raise ValueError(f"Unknown state backend {backend!r}; expected one of {', '.join(STATE_BACKENDS)}")
+    return StateStore(root_dir, platform, **kwargs)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 def _sn_field_to_schema(field: Dict[str, object]) -> Dict[str, object]:
@@ -23,15 +23,7 @@ def _sn_field_to_schema(field: Dict[str, object]) -> Dict[str, object]:
     return mapping.get(internal_type, {"type": "string"})
 
 
-def synthesize_servicenow_spec(
-    *,
-    base_url: str,
-    dictionaries: Dict[str, List[Dict[str, object]]],
-    output_path: str,
-    namespace: str | None = None,
-    api_name: str | None = None,
-    api_version: str | None = None,
-) -> str:
+def build_servicenow_spec(*, base_url: str, dictionaries: Dict[str, List[Dict[str, object]]]) -> Dict[str, object]:
     components: Dict[str, object] = {"schemas": {}}
     paths: Dict[str, object] = {}
 
@@ -117,7 +109,7 @@ def synthesize_servicenow_spec(
             },
         }
 
-    spec = {
+    spec: Dict[str, object] = {
         "openapi": "3.0.3",
         "info": {"title": "ServiceNow Generated API", "version": "0.1.0"},
         "servers": [
@@ -137,7 +129,10 @@ def synthesize_servicenow_spec(
         "paths": paths,
         "x-generator": {"name": "api-discovery", "version": "0.1.0"},
     }
+    return spec
+
 
+def _write_spec(spec: Dict[str, object], output_path: str, namespace: str | None, api_name: str | None, api_version: str | None) -> str:
     parts = [Path(output_path).parent]
     if namespace:
         parts.append(Path(namespace))
@@ -152,3 +147,32 @@ def synthesize_servicenow_spec(
     out_file.write_text(out)
     return str(out_file)
 
+
+def synthesize_servicenow_spec(
+    *,
+    base_url: str,
+    dictionaries: Dict[str, List[Dict[str, object]]],
+    output_path: str,
+    namespace: str | None = None,
+    api_name: str | None = None,
+    api_version: str | None = None,
+) -> str:
+    spec = build_servicenow_spec(base_url=base_url, dictionaries=dictionaries)
+    return _write_spec(spec, output_path, namespace, api_name, api_version)
+
+
+def synthesize_table_api_version(
+    *,
+    base_url: str,
+    dictionaries: Dict[str, List[Dict[str, object]]],
+    specs_dir: str | Path,
+    namespace: str,
+    api_name: str,
+    api_version: str,
+    spec: Optional[Dict[str, object]] = None,
+) -> str:
+    # Writes <specs_dir>/<namespace>/<api>/<version>/servicenow_generated.json. Every Table API
+    # version of an instance is generated from the same dictionaries, so callers looping over
+    # versions can build ``spec`` once and pass it in.
+    spec = spec if spec is not None else build_servicenow_spec(base_url=base_url, dictionaries=dictionaries)
+    return _write_spec(spec, str(Path(specs_dir) / "servicenow_generated.json"), namespace, api_name, api_version)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..discovery.catalog import (
+    CatalogApi,
+    CatalogIndex,
+    CatalogOperation,
+    CatalogVersion,
+)
+from ..discovery.table_api import fetch_all_rows
+from ..http import HTTPClient
+
+# Parameter definitions are shared between operations through the *_map tables
+_PARAMETER_FIELDS = "sys_id,name,short_description,is_required,example_value"
+_QUERY_MAP_FIELDS = "web_service_operation,web_service_query_parameter"
+_HEADER_MAP_FIELDS = "web_service_operation,web_service_header"
+_PATH_PARAM = re.compile(r"\{([^}/]+)\}")
+_BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+
+def _ref(value: object) -> str:
+    if isinstance(value, dict):
+        return str(value.get("value") or "")
+    return str(value or "")
+
+
+def _parameter(row: Dict[str, object], location: str) -> Dict[str, object]:
+    param: Dict[str, object] = {
+        "name": str(row.get("name") or ""),
+        "in": location,
+        "required": str(row.get("is_required")).lower() in ("true", "1"),
+        "schema": {"type": "string"},
+    }
+    if row.get("short_description"):
+        param["description"] = str(row["short_description"])
+    if row.get("example_value"):
+        param["example"] = str(row["example_value"])
+    return param
+
+
+@dataclass
+class OperationParameters:
+    # operation sys_id -> OpenAPI query/header parameter objects
+    by_operation: Dict[str, List[Dict[str, object]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(
+        cls,
+        query_params: List[Dict[str, object]],
+        query_maps: List[Dict[str, object]],
+        headers: List[Dict[str, object]],
+        header_maps: List[Dict[str, object]],
+    ) -> "OperationParameters":
+        out = cls()
+        for defs, maps, ref_field, location in (
+            (query_params, query_maps, "web_service_query_parameter", "query"),
+            (headers, header_maps, "web_service_header", "header"),
+        ):
+            by_id = {str(row.get("sys_id") or ""): row for row in defs if row.get("name")}
+            for m in maps:
+                row = by_id.get(_ref(m.get(ref_field)))
+                op_id = _ref(m.get("web_service_operation"))
+                if row is not None and op_id:
+                    out.by_operation.setdefault(op_id, []).append(_parameter(row, location))
+        return out
+
+    @classmethod
+    def fetch(cls, client: HTTPClient) -> "OperationParameters":
+        return cls.from_rows(
+            fetch_all_rows(client, "sys_ws_query_parameter", fields=_PARAMETER_FIELDS),
+            fetch_all_rows(client, "sys_ws_query_parameter_map", fields=_QUERY_MAP_FIELDS),
+            fetch_all_rows(client, "sys_ws_header", fields=_PARAMETER_FIELDS),
+            fetch_all_rows(client, "sys_ws_header_map", fields=_HEADER_MAP_FIELDS),
+        )
+
+    def for_operation(self, sys_id: str) -> List[Dict[str, object]]:
+        return list(self.by_operation.get(sys_id, []))
+
+
+def _operation_path(api: CatalogApi, version: CatalogVersion, op: CatalogOperation) -> str:
+    # operation_uri is the full resolved path; otherwise join the version (or API) base with relative_path
+    if op.operation_uri.startswith("/"):
+        return op.operation_uri
+    base = (version.in_url or api.base_path or f"/api/{api.namespace}/{api.name}").rstrip("/")
+    relative = op.relative_path.strip()
+    return f"{base}/{relative.lstrip('/')}" if relative and relative != "/" else base
+
+
+def _media_types(value: str, default: str = "application/json") -> List[str]:
+    return [t.strip() for t in (value or default).split(",") if t.strip()] or [default]
+
+
+def _operation_id(op: CatalogOperation, method: str, used: Dict[str, int]) -> str:
+    base = re.sub(r"[^0-9A-Za-z_]+", "_", op.name or op.sys_id or "operation").strip("_") or "operation"
+    candidate = f"{method.lower()}_{base}"
+    used[candidate] = used.get(candidate, 0) + 1
+    return candidate if used[candidate] == 1 else f"{candidate}_{used[candidate]}"
+
+
+def build_scripted_rest_spec(
+    api: CatalogApi, version: CatalogVersion, parameters: OperationParameters, *, base_url: str
+) -> Optional[Dict[str, object]]:
+    if not version.operations:
+        return None
+    paths: Dict[str, Dict[str, object]] = {}
+    used_ids: Dict[str, int] = {}
+    for op in sorted(version.operations, key=lambda o: (o.relative_path, o.http_method, o.name)):
+        method = (op.http_method or "GET").upper()
+        path = _operation_path(api, version, op)
+        params = [
+            {"name": name, "in": "path", "required": True, "schema": {"type": "string"}}
+            for name in dict.fromkeys(_PATH_PARAM.findall(path))
+        ]
+        params += parameters.for_operation(op.sys_id)
+        item: Dict[str, object] = {
+            "operationId": _operation_id(op, method, used_ids),
+            "summary": op.name or f"{method} {path}",
+            "responses": {
+                "200": {"description": "OK", "content": {t: {} for t in _media_types(op.produces or api.produces)}}
+            },
+        }
+        if params:
+            item["parameters"] = params
+        if method in _BODY_METHODS:
+            item["requestBody"] = {"content": {t: {"schema": {}} for t in _media_types(op.consumes or api.consumes)}}
+        if not op.requires_authentication:
+            item["security"] = []
+        paths.setdefault(path, {})[method.lower()] = item
+
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": f"{api.namespace}/{api.name}", "version": version.version},
+        "servers": [
+            {
+                "url": "{server_url}",
+                "variables": {"server_url": {"default": base_url}},
+            }
+        ],
+        "security": [{"basic": []}, {"oauth2": []}],
+        "components": {
+            "securitySchemes": {
+                "basic": {"type": "http", "scheme": "basic"},
+                "oauth2": {"type": "oauth2", "flows": {"clientCredentials": {"tokenUrl": "TOKEN_URL", "scopes": {}}}},
+            },
+        },
+        "paths": paths,
+        "x-generator": {"name": "api-discovery", "version": "0.1.0", "source": "sys_ws_operation"},
+    }
+
+
+def synthesize_scripted_rest_spec(
+    index: CatalogIndex,
+    parameters: OperationParameters,
+    *,
+    namespace: str,
+    api_name: str,
+    api_version: str,
+    output_path: str | Path,
+    base_url: str = "",
+) -> Optional[str]:
+    api = index.get_api(namespace, api_name)
+    version = api.versions.get(api_version) if api is not None else None
+    if api is None or version is None:
+        return None
+    spec = build_scripted_rest_spec(api, version, parameters, base_url=base_url or index.base_url)
+    if spec is None:
+        return None
+    out = Path(output_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(spec, indent=2))
+    return str(out)
+
+
+def synthesize_catalog_specs(
+    index: CatalogIndex,
+    parameters: OperationParameters,
+    specs_dir: str | Path,
+    *,
+    entries: Optional[Iterable[Tuple[str, str, str]]] = None,
+    base_url: str = "",
+    file_name: str = "synthesized.json",
+) -> Dict[Tuple[str, str, str], str]:
+    # Everything comes from the index already in memory: no per-API requests
+    written: Dict[Tuple[str, str, str], str] = {}
+    for namespace, api_name, version in entries if entries is not None else index.entries():
+        out = synthesize_scripted_rest_spec(
+            index,
+            parameters,
+            namespace=namespace,
+            api_name=api_name,
+            api_version=version,
+            output_path=Path(specs_dir) / namespace / api_name / version / file_name,
+            base_url=base_url,
+        )
+        if out:
+            written[(namespace, api_name, version)] = out
+    return written
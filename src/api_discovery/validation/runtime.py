@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from typing import Iterable, Tuple
+import asyncio
+from typing import Iterable
 
 from ..config import ServiceNowSettings
-from ..http import HTTPClient, AuthConfig
+from ..http import AsyncHTTPClient, AuthConfig, HTTPClient
 
 
 def _auth(settings: ServiceNowSettings) -> AuthConfig:
@@ -15,15 +16,10 @@ def _auth(settings: ServiceNowSettings) -> AuthConfig:
 
 
 def probe_servicenow_tables(settings: ServiceNowSettings, tables: Iterable[str]) -> list[tuple[str, bool, str]]:
+    if settings.max_concurrency > 1:
+        return asyncio.run(probe_servicenow_tables_async(settings, tables))
     results: list[tuple[str, bool, str]] = []
-    with HTTPClient(
-        base_url=settings.base_url,
-        verify=settings.verify_tls,
-        timeout_seconds=settings.request_timeout_seconds,
-        user_agent=settings.user_agent,
-        rate_limit_per_second=settings.rate_limit_per_second,
-        auth=_auth(settings),
-    ) as client:
+    with HTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth(settings)) as client:
         for table in tables:
             try:
                 # Prefer HEAD/OPTIONS if supported; many instances accept GET with sysparm_limit=1 safely
@@ -33,3 +29,15 @@ def probe_servicenow_tables(settings: ServiceNowSettings, tables: Iterable[str])
                 results.append((table, False, str(exc)))
     return results
 
+
+async def probe_servicenow_tables_async(settings: ServiceNowSettings, tables: Iterable[str]) -> list[tuple[str, bool, str]]:
+    async with AsyncHTTPClient.from_settings(settings, base_url=settings.base_url, auth=_auth(settings)) as client:
+
+        async def probe(table: str) -> tuple[str, bool, str]:
+            try:
+                await client.get(f"/api/now/table/{table}", params={"sysparm_limit": 1})
+                return (table, True, "GET ok")
+            except Exception as exc:  # noqa: BLE001
+                return (table, False, str(exc))
+
+        return list(await asyncio.gather(*(probe(t) for t in tables)))
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from api_discovery.http import AsyncHTTPClient, HTTPClient
+
+Handler = Callable[[httpx.Request], httpx.Response]
+
+
+@pytest.fixture
+def mock_client() -> Iterator[Callable[[Handler], HTTPClient]]:
+    # HTTPClient whose transport is an httpx.MockTransport; rate limiting is effectively off
+    clients: list[HTTPClient] = []
+
+    def make(handler: Handler) -> HTTPClient:
+        client = HTTPClient("https://example.service-now.com", rate_limit_per_second=1000, rate_limit_burst=100)
+        client._client = httpx.Client(base_url=client.base_url, transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def mock_async_client() -> Callable[..., AsyncHTTPClient]:
+    def make(handler: Handler, **kwargs: object) -> AsyncHTTPClient:
+        client = AsyncHTTPClient("https://example.service-now.com", rate_limit_per_second=1000, rate_limit_burst=100, **kwargs)  # type: ignore[arg-type]
+        client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+        return client
+
+    return make
+
+
+class FakeInstance:
+    # Serves sys_db_object/sys_dictionary rows, honouring sys_updated_on watermarks, nameIN chunks and sysparm_fields
+    def __init__(self) -> None:
+        self.tables: list[dict[str, str]] = []
+        self.dictionary: list[dict[str, str]] = []
+        self.requests: list[httpx.Request] = []
+
+    def _rows(self, rows: list[dict[str, str]], query: str) -> list[dict[str, str]]:
+        for clause in query.split("^"):
+            if clause.startswith("sys_updated_on>="):
+                rows = [r for r in rows if r["sys_updated_on"] >= clause[len("sys_updated_on>="):]]
+            elif clause.startswith("sys_updated_on>"):
+                rows = [r for r in rows if r["sys_updated_on"] > clause[len("sys_updated_on>"):]]
+            elif clause.startswith("nameIN"):
+                rows = [r for r in rows if r["name"] in clause[len("nameIN"):].split(",")]
+        return rows
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        query = request.url.params.get("sysparm_query", "")
+        table = request.url.path.rsplit("/", 1)[-1]
+        if "sys_id>" in query or table not in ("sys_db_object", "sys_dictionary"):
+            return httpx.Response(200, json={"result": []})
+        fields = request.url.params["sysparm_fields"].split(",")
+        rows = self._rows(self.tables if table == "sys_db_object" else self.dictionary, query)
+        return httpx.Response(200, json={"result": [{k: v for k, v in r.items() if k in fields} for r in rows]})
+
+
+@pytest.fixture
+def fake_instance(monkeypatch: pytest.MonkeyPatch) -> FakeInstance:
+    # Every client built through HTTPClient/AsyncHTTPClient.from_settings talks to the fake instance
+    instance = FakeInstance()
+    sync_client, async_client = httpx.Client, httpx.AsyncClient
+
+    class Client(sync_client):  # type: ignore[misc, valid-type]
+        def __init__(self, **kwargs: object) -> None:
+            super().__init__(**{**kwargs, "transport": httpx.MockTransport(instance.handler)})  # type: ignore[arg-type]
+
+    class AsyncClient(async_client):  # type: ignore[misc, valid-type]
+        def __init__(self, **kwargs: object) -> None:
+            kwargs.pop("limits", None)
+            super().__init__(**{**kwargs, "transport": httpx.MockTransport(instance.handler)})  # type: ignore[arg-type]
+
+    monkeypatch.setattr(httpx, "Client", Client)
+    monkeypatch.setattr(httpx, "AsyncClient", AsyncClient)
+    return instance
+
+
+class FakePage:
+    def __init__(self, context: FakeContext) -> None:
+        self.context = context
+        self.url = "about:blank"
+
+    async def goto(self, url: str, **kwargs: object) -> None:
+        self.url = url
+
+
+class FakeContext:
+    def __init__(self, browser: FakeBrowser, **kwargs: object) -> None:
+        self.browser = browser
+        self.options = kwargs
+        self.routes: list[tuple[str, object]] = []
+        self.closed = False
+
+    async def storage_state(self) -> dict[str, object]:
+        return {"cookies": [{"name": "JSESSIONID", "value": f"s{len(self.browser.contexts)}"}], "origins": []}
+
+    async def route(self, pattern: str, handler: object) -> None:
+        self.routes.append((pattern, handler))
+
+    async def new_page(self) -> FakePage:
+        return FakePage(self)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.contexts: list[FakeContext] = []
+        self.closed = False
+
+    async def new_context(self, **kwargs: object) -> FakeContext:
+        context = FakeContext(self, **kwargs)
+        self.contexts.append(context)
+        return context
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakePlaywright:
+    # Stands in for playwright.async_api: records every launched browser
+    def __init__(self, executable_path: str = "") -> None:
+        self.executable_path = executable_path
+        self.browsers: list[FakeBrowser] = []
+        self.launch_options: list[dict[str, object]] = []
+        self.stopped = 0
+        self.chromium = self
+
+    async def launch(self, **kwargs: object) -> FakeBrowser:
+        self.launch_options.append(kwargs)
+        self.browsers.append(FakeBrowser())
+        return self.browsers[-1]
+
+    async def start(self) -> FakePlaywright:
+        return self
+
+    async def stop(self) -> None:
+        self.stopped += 1
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> FakePlaywright:
+    import types
+
+    chromium = tmp_path / "chrome"
+    chromium.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    playwright = FakePlaywright(str(chromium))
+    package = types.ModuleType("playwright")
+    module = types.ModuleType("playwright.async_api")
+    module.async_playwright = lambda: playwright  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "playwright", package)
+    monkeypatch.setitem(sys.modules, "playwright.async_api", module)
+    return playwright
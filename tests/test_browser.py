@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from api_discovery import browser
+from api_discovery.cli import app
+
+
+class Chromium:
+    def __init__(self, executable_path: str) -> None:
+        self.executable_path = executable_path
+
+
+class Playwright:
+    def __init__(self, executable_path: str) -> None:
+        self.chromium = Chromium(executable_path)
+
+
+@pytest.fixture
+def cache_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(browser, "playwright_version", lambda: "1.50.0")
+    return tmp_path
+
+
+def test_marker_is_keyed_by_playwright_version(cache_home: Path) -> None:
+    chromium = cache_home / "chrome"
+    chromium.write_text("")
+    browser.record_chromium(str(chromium), "1.50.0")
+    assert browser.provisioned_chromium("1.50.0") == str(chromium)
+    assert browser.provisioned_chromium("1.51.0") is None
+    chromium.unlink()
+    assert browser.provisioned_chromium("1.50.0") is None
+
+
+def test_ensure_chromium_records_or_raises(cache_home: Path) -> None:
+    chromium = cache_home / "chrome"
+    with pytest.raises(RuntimeError, match="browser install"):
+        browser.ensure_chromium(Playwright(str(chromium)))
+    chromium.write_text("")
+    assert browser.ensure_chromium(Playwright(str(chromium))) == str(chromium)
+    assert browser.provisioned_chromium() == str(chromium)
+
+
+def test_install_requires_playwright(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("api_discovery.cli.playwright_version", lambda: None)
+    result = CliRunner().invoke(app, ["browser", "install"])
+    assert result.exit_code != 0
+    assert "Playwright is not installed" in result.output
+
+
+def test_install_reports_a_failed_playwright_install(monkeypatch: pytest.MonkeyPatch) -> None:
+    def install(*, with_deps: bool = False) -> str:
+        raise subprocess.CalledProcessError(1, ["python", "-m", "playwright", "install", "chromium", "--with-deps"])
+
+    monkeypatch.setattr("api_discovery.cli.playwright_version", lambda: "1.50.0")
+    monkeypatch.setattr("api_discovery.cli.install_chromium", install)
+    result = CliRunner().invoke(app, ["browser", "install", "--with-deps"])
+    assert result.exit_code == 1
+    assert "Chromium install failed" in result.output and "needs root" in result.output
+    assert not isinstance(result.exception, subprocess.CalledProcessError)
+
+
+def test_status_reports_missing_chromium(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("api_discovery.cli.playwright_version", lambda: None)
+    result = CliRunner().invoke(app, ["browser", "status"])
+    assert result.exit_code == 0
+    assert "Playwright: not installed | Chromium: missing" in result.output
+
+
+class Route:
+    def __init__(self, resource_type: str, url: str) -> None:
+        self.request = type("Request", (), {"resource_type": resource_type, "url": url})()
+        self.outcome = ""
+
+    async def abort(self) -> None:
+        self.outcome = "aborted"
+
+    async def continue_(self) -> None:
+        self.outcome = "continued"
+
+
+def test_lean_profile_blocks_heavy_resources() -> None:
+    profile = browser.PageProfile(allow=("stylesheet", "/cdn/"))
+    assert profile.should_block("image", "https://x/logo.png")
+    assert profile.should_block("script", "https://www.googletagmanager.com/gtm.js")
+    assert not profile.should_block("xhr", "https://x/api/now/ui/meta")
+    assert not profile.should_block("stylesheet", "https://x/app.css")  # explicitly allowed type
+    assert not profile.should_block("font", "https://x/cdn/font.woff")  # explicitly allowed URL
+    assert not browser.PageProfile(lean=False).should_block("image", "https://x/logo.png")
+    assert browser.PageProfile(lean=False).launch_args() == [] and browser.PageProfile(lean=False).context_options() == {}
+
+
+def test_profile_route_counts_requests() -> None:
+    profile = browser.PageProfile()
+    routes = [Route("image", "https://x/a.png"), Route("document", "https://x/page.do"), Route("font", "https://x/f.woff")]
+
+    async def run() -> None:
+        for route in routes:
+            await profile._route(route)
+
+    asyncio.run(run())
+    assert [r.outcome for r in routes] == ["aborted", "continued", "aborted"]
+    assert (profile.blocked, profile.allowed) == (2, 1)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import httpx
+
+from api_discovery.cache import ResponseCache
+
+URL = "/api/now/table/sys_ws_definition"
+
+
+def test_fresh_hit_skips_the_network(tmp_path: Path, mock_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"result": [{"name": "incident"}]})
+
+    client = mock_client(handler)
+    client.cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    assert client.get(URL, params={"sysparm_limit": 1}).json() == {"result": [{"name": "incident"}]}
+    assert client.get(URL, params={"sysparm_limit": 1}).json() == {"result": [{"name": "incident"}]}
+    assert len(calls) == 1
+    assert client.cache.hits == 1
+    client.get(URL, params={"sysparm_limit": 2})  # different query, different key
+    assert len(calls) == 2
+
+
+def test_non_catalog_paths_are_not_served_from_cache_by_default(tmp_path: Path, mock_client) -> None:
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"result": []})
+
+    client = mock_client(handler)
+    client.cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    for _ in range(2):
+        client.get("/api/now/table/sys_db_object")
+        client.get("/api/now/table/incident")
+    assert len(calls) == 4
+    client.cache = ResponseCache(str(tmp_path / "opt-in.sqlite"), ttls={"/api/now/table/sys_db_object": 60})
+    for _ in range(2):
+        client.get("/api/now/table/sys_db_object")
+    assert len(calls) == 5
+
+
+def test_stale_entry_is_revalidated(tmp_path: Path, mock_client) -> None:
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"result": [{"name": "incident"}]}, headers={"ETag": '"v1"'})
+
+    client = mock_client(handler)
+    client.cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttls={"/api/now/table/*": 0})
+    first = client.get(URL)
+    second = client.get(URL)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert seen[1].headers["If-None-Match"] == '"v1"'
+    assert client.cache.revalidated == 1
+
+
+def test_eviction_by_size(tmp_path: Path, mock_client) -> None:
+    client = mock_client(lambda request: httpx.Response(200, content=b"x" * 100))
+    client.cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=250)
+    for i in range(4):
+        client.get(URL, params={"page": i})
+    client.cache.misses = 0
+    client.get(URL, params={"page": 0})  # least recently used: evicted
+    assert client.cache.misses == 1
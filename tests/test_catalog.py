@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from api_discovery.discovery.catalog import CatalogIndex
+
+DEFINITIONS = [
+    {"sys_id": "d1", "name": "orders", "namespace": "x_acme", "base_path": "/api/x_acme/orders", "active": "true"},
+    # No namespace column: derived from the base path
+    {"sys_id": "d2", "name": "legacy", "namespace": "", "base_path": "/api/x_old/legacy"},
+    {"sys_id": "d3", "name": "orphan", "namespace": ""},
+]
+VERSIONS = [
+    {"sys_id": "v1", "web_service": {"value": "d1", "link": "https://x"}, "version": "v1", "in_url": "/api/x_acme/orders/v1", "active": "true"},
+    {"sys_id": "v2", "web_service": "d1", "version": "", "in_url": "/api/x_acme/orders/v2", "active": "false"},
+    # Version whose definition is not readable: its namespace is still listed
+    {"sys_id": "v3", "web_service": "d9", "version": "v1", "in_url": "/api/x_hidden/things/v1"},
+]
+OPERATIONS = [
+    {"sys_id": "o1", "name": "List", "http_method": "get", "relative_path": "/", "web_service_version": "v1"},
+    {"sys_id": "o2", "name": "Ping", "http_method": "GET", "relative_path": "/ping", "web_service_definition": "d1"},
+    {"sys_id": "o3", "name": "Legacy", "http_method": "POST", "relative_path": "/", "web_service": "d2", "requires_authentication": "false"},
+]
+
+
+def test_from_rows() -> None:
+    index = CatalogIndex.from_rows(DEFINITIONS, VERSIONS, OPERATIONS, base_url="https://x")
+    assert index.list_namespaces() == ["now", "x_acme", "x_hidden", "x_old"]
+    assert index.list_apis("x_hidden") == []
+    assert index.list_apis("x_acme") == ["orders"]
+    assert index.list_versions("x_acme", "orders") == ["v1", "v2"]  # v2 named from in_url
+    assert index.list_versions("x_old", "legacy") == ["v1"]  # definition without version rows
+    api = index.get_api("x_acme", "orders")
+    assert api is not None and api.sys_ids == ["d1"]
+    assert api.versions["v2"].active is False
+    assert [op.name for op in index.operations("x_acme", "orders", "v1")] == ["List", "Ping"]
+    assert [op.name for op in index.operations("x_acme", "orders", "v2")] == ["Ping"]  # unversioned: every version
+    assert index.operations("x_acme", "orders", "v1")[0].http_method == "GET"
+    assert index.operations("x_old", "legacy", "v1")[0].requires_authentication is False
+    assert list(index.entries()) == [("x_acme", "orders", "v1"), ("x_acme", "orders", "v2"), ("x_old", "legacy", "v1")]
+
+
+def test_save_load_round_trip(tmp_path: Path) -> None:
+    index = CatalogIndex.from_rows(DEFINITIONS, VERSIONS, OPERATIONS, base_url="https://x")
+    loaded = CatalogIndex.load(index.save(tmp_path / "_catalog.json"))
+    assert loaded is not None
+    assert loaded.namespaces == index.namespaces
+    assert loaded.list_namespaces() == index.list_namespaces()
+    assert loaded.is_fresh(60, base_url="https://x/", need_operations=True)
+    assert not loaded.is_fresh(60, base_url="https://y")
+
+
+def test_without_operations_is_not_fresh_for_synthesis() -> None:
+    index = CatalogIndex.from_rows(DEFINITIONS, VERSIONS)
+    assert index.operations("x_acme", "orders", "v1") == []
+    assert not index.is_fresh(60, need_operations=True)
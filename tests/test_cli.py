@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from api_discovery import cli
+from api_discovery.browser import BrowserUnavailableError
+from api_discovery.cli import app
+from api_discovery.discovery import sn_browser
+from api_discovery.discovery.catalog import CatalogIndex
+from api_discovery.discovery.sn_browser import save_catalog_tree
+from api_discovery.state import SqliteStateStore, StateStore
+
+TREE = (["now", "x_acme"], {"now": ["table"], "x_acme": ["orders"]}, {("now", "table"): ["v1", "v2"], ("x_acme", "orders"): ["v1"]})
+
+
+@pytest.fixture
+def state_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("API_DISCOVERY_STATE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_headless_listers_answer_from_the_cached_catalog(state_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def crawl(**kwargs: object) -> object:
+        raise AssertionError("the cached catalog should have been used")
+
+    monkeypatch.setattr(sn_browser, "discover_catalog_via_browser", crawl)
+    save_catalog_tree(state_dir / "servicenow" / "_headless_catalog.json", TREE, base_url="https://x.service-now.com")
+    runner = CliRunner()
+    result = runner.invoke(app, ["sn", "list-namespaces", "--headless", "--base-url", "https://x.service-now.com", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == ["now", "x_acme"]
+    result = runner.invoke(app, ["sn", "list-versions", "--headless", "--base-url", "https://x.service-now.com", "--namespace", "now", "--api-name", "table"])
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == ["v1", "v2"]
+
+
+def test_state_dir_option_overrides_the_configured_state_dir(state_dir: Path, tmp_path_factory: pytest.TempPathFactory) -> None:
+    other = tmp_path_factory.mktemp("other-state")
+    save_catalog_tree(other / "servicenow" / "_headless_catalog.json", TREE, base_url="https://x.service-now.com")
+    args = ["sn", "list-apis", "--headless", "--base-url", "https://x.service-now.com", "--namespace", "x_acme", "--state-dir", str(other)]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == ["orders"]
+    assert not (state_dir / "servicenow").exists()
+
+
+def test_synthesize_catalog_from_the_cached_index(state_dir: Path, fake_instance) -> None:
+    index = CatalogIndex.from_rows(
+        [{"sys_id": "d1", "name": "orders", "namespace": "x_acme", "base_path": "/api/x_acme/orders"}],
+        [{"sys_id": "v1", "web_service": "d1", "version": "v1", "in_url": "/api/x_acme/orders/v1"}],
+        [{"sys_id": "o1", "name": "List", "http_method": "GET", "relative_path": "/", "web_service_version": "v1"}],
+        base_url="https://x.service-now.com",
+    )
+    index.save(state_dir / "servicenow" / "_catalog_index.json")
+    specs = state_dir / "specs"
+    result = CliRunner().invoke(app, ["sn", "synthesize-catalog", "--base-url", "https://x.service-now.com", "--specs-dir", str(specs)])
+    assert result.exit_code == 0, result.output
+    assert "Synthesized 1 of 1 catalog entries" in result.output
+    assert (specs / "x_acme" / "orders" / "v1" / "synthesized.json").exists()
+    # Only the parameter/header tables were pulled; the index came from the state dir
+    assert not any("sys_ws_definition" in r.url.path for r in fake_instance.requests)
+
+
+def test_migrate_state_and_status(state_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    for names in ({}, {"namespace": "now", "api_name": "table", "api_version": "v2"}):
+        store = StateStore(str(state_dir), "servicenow", **names)
+        state = store.load()
+        store.upsert_resource(state, "incident", "table")
+        store.save(state)
+    runner = CliRunner()
+    result = runner.invoke(app, ["migrate-state", "servicenow", "--state-dir", str(state_dir)])
+    assert result.exit_code == 0, result.output
+    assert result.output.count("Migrated 1 resources") == 2
+    assert SqliteStateStore(str(state_dir), "servicenow", namespace="now", api_name="table", api_version="v2").names() == ["incident"]
+
+    monkeypatch.setenv("API_DISCOVERY_STATE_BACKEND", "sqlite")
+    result = runner.invoke(app, ["status", "servicenow"])
+    assert result.exit_code == 0, result.output
+    assert "Known: 1 | Unknown: 0" in result.output
+
+
+@pytest.mark.parametrize("command", ["list-namespaces", "crawl-catalog"])
+def test_unknown_catalog_mode_is_rejected(command: str) -> None:
+    result = CliRunner().invoke(app, ["sn", command, "--base-url", "https://x.service-now.com", "--catalog-mode", "xhr"])
+    assert result.exit_code == 2
+    assert "Expected one of auto, network, dom" in result.output
+
+
+def test_concurrency_option_overrides_the_setting_only_when_given(state_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    seen: list[int] = []
+
+    def discover(settings: object, run: object, **kwargs: object) -> tuple[list, dict]:
+        seen.append(settings.max_concurrency)  # type: ignore[attr-defined]
+        return [], {}
+
+    monkeypatch.setattr(cli, "discover_servicenow", discover)
+    args = ["discover", "servicenow", "--base-url", "https://x.service-now.com", "--state-dir", str(state_dir)]
+    runner = CliRunner()
+    assert runner.invoke(app, args).exit_code == 0
+    monkeypatch.setenv("API_DISCOVERY_MAX_CONCURRENCY", "2")
+    assert runner.invoke(app, args).exit_code == 0
+    assert runner.invoke(app, [*args, "--concurrency", "1"]).exit_code == 0
+    assert seen == [4, 2, 1]
+
+
+def test_crawl_catalog_reports_a_missing_browser_cleanly(state_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def unavailable() -> None:
+        raise BrowserUnavailableError("Playwright is not installed.")
+
+    monkeypatch.setattr(sn_browser, "_ensure_playwright", unavailable)
+    result = CliRunner().invoke(app, ["sn", "crawl-catalog", "--base-url", "https://x.service-now.com"])
+    assert result.exit_code == 1
+    assert "Playwright is not installed." in result.output and "--no-headless" in result.output
+    assert not isinstance(result.exception, BrowserUnavailableError)
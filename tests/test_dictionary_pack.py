@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from api_discovery.cli import app
+from api_discovery.dictionary_pack import DictionaryPack, RefIndex, content_hash
+from api_discovery.state import StateStore
+
+FIELDS = [{"element": "number", "internal_type": "string"}, {"element": "state", "internal_type": "integer"}]
+
+
+@pytest.mark.parametrize("codec", ["gzip", None])
+def test_write_read(tmp_path: Path, codec: str | None) -> None:
+    pack = DictionaryPack(tmp_path, codec=codec)
+    entry = pack.write("incident", FIELDS)
+    assert entry.sha256 == content_hash(FIELDS)
+    assert pack.write("incident", FIELDS) == entry  # unchanged content is not appended again
+    assert pack.read("incident") == FIELDS
+    assert pack.read("missing") == []
+    pack.close()
+    reopened = DictionaryPack(tmp_path, codec=codec)
+    assert reopened.tables() == ["incident"]
+    assert reopened.read("incident") == FIELDS
+
+
+def test_compact_drops_superseded_records(tmp_path: Path) -> None:
+    pack = DictionaryPack(tmp_path, codec="gzip")
+    pack.write("incident", [{"element": "old"}])
+    pack.write("incident", FIELDS)
+    pack.write("problem", [{"element": "p"}])
+    assert pack.garbage_bytes() > 0
+
+    before, after = pack.compact()
+    assert after < before
+    assert pack.garbage_bytes() == 0
+    assert sorted(pack.tables()) == ["incident", "problem"]
+    assert pack.read("incident") == FIELDS
+    assert DictionaryPack(tmp_path, codec="gzip").read("incident") == FIELDS
+
+
+def test_compact_keeps_only_referenced_content(tmp_path: Path) -> None:
+    pack = DictionaryPack(tmp_path, codec="gzip")
+    pack.write("incident", FIELDS)
+    pack.write("problem", [{"element": "p"}])
+    pack.compact(keep={"incident"})
+    assert pack.tables() == ["incident"]
+    assert pack.read("incident") == FIELDS
+
+
+def test_index_follows_writes_from_other_instances(tmp_path: Path) -> None:
+    first, second = DictionaryPack(tmp_path, codec="gzip"), DictionaryPack(tmp_path, codec="gzip")
+    second.write("incident", FIELDS)
+    assert first.read("incident") == FIELDS
+    first.compact()
+    second.write("problem", [{"element": "p"}])  # after the pack was replaced underneath it
+    assert sorted(first.tables()) == ["incident", "problem"]
+    assert second.read("incident") == FIELDS
+
+
+def test_legacy_json_files_are_folded_in(tmp_path: Path) -> None:
+    store = StateStore(str(tmp_path), "servicenow")
+    store.cache_dir.mkdir()
+    (store.cache_dir / "incident.json").write_text(json.dumps({"fields": FIELDS}))
+    assert store.list_cached_tables() == ["incident"]
+    assert store.read_dictionary_cache("incident") == FIELDS
+
+    result = CliRunner().invoke(app, ["compact-dictionaries", "servicenow", "--state-dir", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert not (store.cache_dir / "incident.json").exists()
+    assert StateStore(str(tmp_path), "servicenow").read_dictionary_cache("incident") == FIELDS
+
+
+def test_store_creates_nothing_until_a_dictionary_is_written(tmp_path: Path) -> None:
+    store = StateStore(str(tmp_path), "servicenow", namespace="now", api_name="table", api_version="v2")
+    store.load()
+    assert store.read_dictionary_cache("incident") == []
+    assert store.list_cached_tables() == []
+    assert not store.store_dir.exists() and not store.cache_dir.exists()
+    store.write_dictionary_cache("incident", FIELDS)
+    assert store.store_dir.is_dir() and (store.cache_dir / "refs.idx").exists()
+
+
+def test_ref_index_last_line_wins(tmp_path: Path) -> None:
+    refs = RefIndex(tmp_path / "refs.idx")
+    refs.set("incident", "a")
+    refs.set("incident", "b")
+    refs.set("problem", "c")
+    assert RefIndex(tmp_path / "refs.idx").get("incident") == "b"
+    refs.compact()
+    assert len((tmp_path / "refs.idx").read_text().splitlines()) == 2
+    assert RefIndex(tmp_path / "refs.idx").digests() == {"b", "c"}
+
+
+def test_store_shares_content_between_versions(tmp_path: Path) -> None:
+    v1 = StateStore(str(tmp_path), "servicenow", namespace="now", api_name="table", api_version="v1")
+    v2 = StateStore(str(tmp_path), "servicenow", namespace="now", api_name="table", api_version="v2")
+    v1.write_dictionary_cache("incident", FIELDS)
+    v2.write_dictionary_cache("incident", FIELDS)
+    assert v2.dictionaries.tables() == [content_hash(FIELDS)]
+    assert v2.read_dictionary_cache("incident") == FIELDS
+
+
+def test_compact_keeps_refs_written_by_other_stores(tmp_path: Path) -> None:
+    root = StateStore(str(tmp_path), "servicenow")
+    root.write_dictionary_cache("incident", FIELDS)
+    per_version = StateStore(str(tmp_path), "servicenow", namespace="now", api_name="table", api_version="v2")
+    per_version.write_dictionary_cache("problem", [{"element": "p"}])
+    per_version.write_dictionary_cache("incident", [{"element": "replaced"}])
+
+    root.compact_dictionary_cache()
+
+    assert sorted(RefIndex(root.store_dir / "refs.idx").tables()) == ["incident", "problem"]
+    assert root.read_dictionary_cache("problem") == [{"element": "p"}]
+    assert per_version.read_dictionary_cache("problem") == [{"element": "p"}]
+    assert per_version.read_dictionary_cache("incident") == [{"element": "replaced"}]
+    # The first incident download is no longer referenced by any state dir
+    assert content_hash(FIELDS) not in root.dictionaries.tables()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+
+def test_async_client_caps_in_flight_requests(mock_async_client):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"result": []})
+
+    async def run() -> list[int]:
+        client = mock_async_client(handler, max_concurrency=3)
+        try:
+            responses = await asyncio.gather(*(client.get(f"/api/now/table/t{i}") for i in range(12)))
+        finally:
+            await client.aclose()
+        return [r.status_code for r in responses]
+
+    assert asyncio.run(run()) == [200] * 12
+    assert peak == 3
+
+
+def test_sync_client_raises_for_status_after_retries(mock_client):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200 if calls > 1 else 503, json={"result": []})
+
+    assert mock_client(handler).get("/api/now/table/incident").json() == {"result": []}
+    assert calls == 2
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from api_discovery.journal import Journal
+from api_discovery.state import StateStore
+
+_SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+
+def test_entries_skip_torn_last_line(tmp_path: Path) -> None:
+    journal = Journal(tmp_path / "state.journal", batch_size=2)
+    journal.append({"op": "unknown", "name": "a"})
+    assert not journal.path.exists()  # still buffered
+    journal.append({"op": "unknown", "name": "b"})
+    assert journal.flushes == 1
+    with journal.path.open("a") as fh:
+        fh.write('{"op": "unknown", "na')
+    assert [e["name"] for e in journal.entries()] == ["a", "b"]
+
+
+def test_reset_drops_file_and_buffer(tmp_path: Path) -> None:
+    journal = Journal(tmp_path / "state.journal")
+    journal.append({"op": "unknown", "name": "a"})
+    journal.flush()
+    journal.append({"op": "unknown", "name": "b"})
+    journal.reset()
+    journal.flush()
+    assert journal.size() == 0
+    assert list(journal.entries()) == []
+
+
+def test_replay_after_crash(tmp_path: Path) -> None:
+    # The child saves once, journals more mutations, checkpoints, then dies without saving
+    script = textwrap.dedent(
+        f"""
+        import os, sys
+        sys.path.insert(0, {_SRC!r})
+        from api_discovery.state import StateStore
+        store = StateStore({str(tmp_path)!r}, "servicenow")
+        state = store.load()
+        store.upsert_resource(state, "incident", "table")
+        store.save(state)
+        store.upsert_resource(state, "problem", "table", meta={{"label": "Problem"}})
+        store.add_unknown(state, "u_mystery")
+        store.set_verified(state, "incident")
+        store.checkpoint(state)
+        store.upsert_resource(state, "lost", "table")  # buffered only: lost with the process
+        os._exit(1)
+        """
+    )
+    assert subprocess.run([sys.executable, "-c", script], check=False).returncode == 1
+    journal = tmp_path / "servicenow" / "state.journal"
+    with journal.open("a") as fh:
+        fh.write('{"op":"upsert","name":"torn"')  # a write cut short by the crash
+
+    store = StateStore(str(tmp_path), "servicenow")
+    state = store.load()
+    assert sorted(state.known) == ["incident", "problem"]
+    assert state.known["incident"].verified is True
+    assert state.known["problem"].meta == {"label": "Problem"}
+    assert list(state.unknown) == ["u_mystery"]
+
+    store.save(state)
+    assert not journal.exists()
+    assert sorted(StateStore(str(tmp_path), "servicenow").load().known) == ["incident", "problem"]
+    assert os.path.exists(tmp_path / "servicenow" / "state.json")
+
+
+def test_checkpoint_journals_each_dirty_record_once(tmp_path: Path) -> None:
+    store = StateStore(str(tmp_path), "servicenow")
+    state = store.load()
+    for label in ("Incident", "Incident v2"):
+        store.upsert_resource(state, "incident", "table", meta={"label": label})
+    store.add_unknown(state, "u_mystery")
+    assert store.journal is not None and store.journal.size() == 0  # upserts stay in memory until a checkpoint
+    store.set_verified(state, "incident")
+    store.checkpoint(state)
+    entries = list(store.journal.entries())
+    assert [(e["op"], e["name"]) for e in entries] == [("upsert", "incident"), ("unknown", "u_mystery")]
+    assert entries[0]["meta"] == {"label": "Incident v2"} and entries[0]["verified"] is True
+    store.save(state)
+    store.remove_resource(state, "incident")
+    store.checkpoint(state)
+    assert "incident" not in StateStore(str(tmp_path), "servicenow").load().known
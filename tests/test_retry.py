@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from tenacity import RetryCallState
+
+from api_discovery.config import CommonSettings
+from api_discovery.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    path_family,
+    retry_policy_from_settings,
+)
+
+FAMILY = "/api/now/table/*"
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(FAMILY)
+
+
+def test_opens_after_threshold() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(FAMILY)
+    assert breaker.state(FAMILY) == "closed"
+    breaker.record_failure(FAMILY)
+    assert breaker.state(FAMILY) == "open"
+    with pytest.raises(CircuitOpenError) as err:
+        breaker.before_request(FAMILY)
+    assert err.value.retry_in > 0
+    assert breaker.before_request("/api/now/stats/*") is False  # other families are unaffected
+
+
+def test_half_open_probe_success_closes() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.02)
+    _open(breaker)
+    time.sleep(0.03)
+    assert breaker.state(FAMILY) == "half-open"
+    assert breaker.before_request(FAMILY) is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(FAMILY)  # only one probe at a time
+    breaker.record_success(FAMILY)
+    assert breaker.state(FAMILY) == "closed"
+
+
+def test_half_open_probe_failure_reopens() -> None:
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.02)
+    _open(breaker)
+    time.sleep(0.03)
+    assert breaker.before_request(FAMILY) is True
+    breaker.record_failure(FAMILY)
+    assert breaker.state(FAMILY) == "open"
+
+
+def test_abandoned_probe_lets_the_next_request_probe() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.02)
+    _open(breaker)
+    time.sleep(0.03)
+    assert breaker.before_request(FAMILY) is True
+    breaker.end_probe(FAMILY)
+    assert breaker.before_request(FAMILY) is True
+
+
+def test_cancelled_async_probe_does_not_wedge_the_family(mock_async_client) -> None:
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"result": []})
+
+    async def run() -> str:
+        client = mock_async_client(slow)
+        client.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        _open(client.circuit_breaker)
+        await asyncio.sleep(0.02)
+        probe = asyncio.ensure_future(client.get("/api/now/table/incident"))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        await client._client.aclose()
+        return client.circuit_breaker.state(FAMILY)
+
+    assert asyncio.run(run()) == "half-open"
+
+
+def test_retries_transient_statuses(mock_client) -> None:
+    statuses = iter([503, 429, 200])
+    client = mock_client(lambda request: httpx.Response(next(statuses), json={"result": []}, headers={"Retry-After": "0"}))
+    client.retry_policy = RetryPolicy(max_attempts=5, initial_wait=0, max_wait=0)
+    assert client.get("/api/now/table/incident").status_code == 200
+    assert client.requests_sent == 3
+    assert client.retry_policy.retries == 2
+
+
+def test_retry_after_is_honoured_by_one_layer_only() -> None:
+    error = httpx.HTTPStatusError("busy", request=httpx.Request("GET", "https://x"), response=httpx.Response(429, headers={"Retry-After": "7"}))
+    state = RetryCallState(None, None, (), {})  # type: ignore[arg-type]
+    state.set_exception((httpx.HTTPStatusError, error, None))
+    assert RetryPolicy()._wait(state) == 7
+    # With the adaptive limiter the controller pauses the shared bucket, so the retry itself does not sleep
+    policy = retry_policy_from_settings(CommonSettings(adaptive_rate_limit=True))
+    assert policy.honor_retry_after is False
+    assert policy._wait(state) == 0
+
+
+def test_retry_budget_is_shared() -> None:
+    budget = RetryBudget(1)
+    policy = RetryPolicy(budget=budget)
+    error = httpx.HTTPStatusError("busy", request=httpx.Request("GET", "https://x"), response=httpx.Response(503))
+    assert policy.should_retry(error)
+    assert budget.try_spend()
+    assert not policy.should_retry(error)
+
+
+def test_path_family() -> None:
+    assert path_family("https://x/api/now/table/incident?sysparm_limit=1") == "/api/now/table/*"
+    assert path_family("/api/now/v2/table/incident") == "/api/now/v2/table/*"
+    assert path_family("/api/x_acme/orders/v1/items") == "/api/x_acme/orders/*"
+    assert path_family("/login.do") == "/login.do"
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from api_discovery.discovery.catalog import CatalogIndex
+from api_discovery.synthesis.scripted_rest import (
+    OperationParameters,
+    build_scripted_rest_spec,
+    synthesize_catalog_specs,
+    synthesize_scripted_rest_spec,
+)
+
+INDEX = CatalogIndex.from_rows(
+    [{"sys_id": "d1", "name": "orders", "namespace": "x_acme", "base_path": "/api/x_acme/orders", "produces": "application/json"}],
+    [{"sys_id": "v1", "web_service": "d1", "version": "v1", "in_url": "/api/x_acme/v1/orders"}],
+    [
+        {"sys_id": "o1", "name": "Get order", "http_method": "GET", "relative_path": "/{id}", "web_service_version": "v1"},
+        {"sys_id": "o2", "name": "Create order", "http_method": "POST", "relative_path": "/", "web_service_version": "v1",
+         "consumes": "application/json,application/xml", "requires_authentication": "false"},
+        {"sys_id": "o3", "name": "Get order", "http_method": "GET", "operation_uri": "/api/x_acme/v1/orders/{id}/lines",
+         "relative_path": "", "web_service_version": "v1"},
+    ],
+    base_url="https://x",
+)
+PARAMETERS = OperationParameters.from_rows(
+    [{"sys_id": "q1", "name": "expand", "is_required": "true", "short_description": "Expand lines"}],
+    [{"web_service_operation": {"value": "o1"}, "web_service_query_parameter": {"value": "q1"}}],
+    [{"sys_id": "h1", "name": "X-Tenant", "example_value": "acme"}],
+    [{"web_service_operation": "o1", "web_service_header": "h1"}, {"web_service_operation": "o1", "web_service_header": "missing"}],
+)
+
+
+def _spec() -> dict:
+    api = INDEX.get_api("x_acme", "orders")
+    assert api is not None
+    spec = build_scripted_rest_spec(api, api.versions["v1"], PARAMETERS, base_url="https://x")
+    assert spec is not None
+    return spec
+
+
+def test_paths_and_methods() -> None:
+    paths = _spec()["paths"]
+    assert sorted(paths) == ["/api/x_acme/v1/orders", "/api/x_acme/v1/orders/{id}", "/api/x_acme/v1/orders/{id}/lines"]
+    assert list(paths["/api/x_acme/v1/orders"]) == ["post"]
+
+
+def test_parameters() -> None:
+    params = _spec()["paths"]["/api/x_acme/v1/orders/{id}"]["get"]["parameters"]
+    assert params[0] == {"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}
+    assert params[1]["in"] == "query" and params[1]["required"] is True and params[1]["description"] == "Expand lines"
+    assert params[2] == {"name": "X-Tenant", "in": "header", "required": False, "schema": {"type": "string"}, "example": "acme"}
+
+
+def test_body_security_and_unique_operation_ids() -> None:
+    paths = _spec()["paths"]
+    create = paths["/api/x_acme/v1/orders"]["post"]
+    assert list(create["requestBody"]["content"]) == ["application/json", "application/xml"]
+    assert create["security"] == []
+    ids = [paths["/api/x_acme/v1/orders/{id}"]["get"]["operationId"], paths["/api/x_acme/v1/orders/{id}/lines"]["get"]["operationId"]]
+    assert len(set(ids)) == 2
+
+
+def test_synthesize_unknown_api_or_version(tmp_path: Path) -> None:
+    for namespace, api_name, version in (("x_acme", "missing", "v1"), ("x_acme", "orders", "v9")):
+        out = synthesize_scripted_rest_spec(
+            INDEX, PARAMETERS, namespace=namespace, api_name=api_name, api_version=version, output_path=tmp_path / "spec.json"
+        )
+        assert out is None
+    assert not (tmp_path / "spec.json").exists()
+
+
+def test_synthesize_catalog_specs(tmp_path: Path) -> None:
+    written = synthesize_catalog_specs(INDEX, PARAMETERS, tmp_path)
+    out = written[("x_acme", "orders", "v1")]
+    assert out == str(tmp_path / "x_acme" / "orders" / "v1" / "synthesized.json")
+    spec = json.loads(Path(out).read_text())
+    assert spec["info"] == {"title": "x_acme/orders", "version": "v1"}
+    assert spec["servers"][0]["variables"]["server_url"]["default"] == "https://x"
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+from api_discovery.discovery.sn_browser import SelectorCache, _read_options, _resolve
+
+
+class Option:
+    def __init__(self, value: str, text: str = "") -> None:
+        self.value = value
+        self.text = text
+
+    async def get_attribute(self, name: str) -> str:
+        return self.value
+
+    async def text_content(self) -> str:
+        return self.text
+
+
+class Select:
+    def __init__(self, *options: Option) -> None:
+        self.options = list(options)
+
+    async def query_selector_all(self, selector: str) -> list[Option]:
+        return self.options
+
+
+class Frame:
+    def __init__(self, name: str, elements: dict[str, object]) -> None:
+        self.name = name
+        self.url = f"https://x/{name}.do"
+        self.elements = elements
+        self.queries: list[str] = []
+
+    async def query_selector_all(self, selector: str) -> list[object]:
+        self.queries.append(selector)
+        found = self.elements.get(selector)
+        return found if isinstance(found, list) else [found] if found else []
+
+    async def wait_for_selector(self, selector: str, *, state: str, timeout: float) -> None:
+        if selector not in self.elements:
+            raise TimeoutError(selector)
+
+
+class Page:
+    def __init__(self, *frames: Frame) -> None:
+        self.main_frame = Frame("", {})
+        self.frames = [self.main_frame, *frames]
+
+
+NAMESPACE = 'select[id*="namespace" i]'
+
+
+def test_miss_records_frame_and_selector_then_hits(tmp_path: Path) -> None:
+    gsft = Frame("gsft_main", {NAMESPACE: Select(Option("now"), Option("", "x_acme"), Option("now"))})
+    page = Page(gsft)
+    cache = SelectorCache(tmp_path / "selectors.json")
+    assert asyncio.run(_read_options(page, cache, "namespace")) == ["now", "x_acme"]
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.get("namespace") == {"selector": NAMESPACE, "frame": "gsft_main"}
+
+    # A fresh cache (next run) loads the record and goes straight to the frame
+    reloaded = SelectorCache(tmp_path / "selectors.json")
+    gsft.queries.clear()
+    page.main_frame.queries.clear()
+    assert asyncio.run(_resolve(page, reloaded, "namespace")) is gsft.elements[NAMESPACE]
+    assert gsft.queries == [NAMESPACE] and page.main_frame.queries == []
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+
+def test_stale_entry_is_dropped() -> None:
+    cache = SelectorCache()
+    cache.put("namespace", selector=NAMESPACE, frame="gone")
+    page = Page(Frame("gsft_main", {'select[name*="namespace" i]': Select()}))
+    assert asyncio.run(_resolve(page, cache, "namespace", timeout_ms=200)) is not None
+    assert cache.get("namespace") == {"selector": 'select[name*="namespace" i]', "frame": "gsft_main"}
+    assert cache.misses == 1
+
+
+def test_explorer_path_learned_first() -> None:
+    cache = SelectorCache()
+    cache.put("explorer_path", path="/rest_api_explorer.do")
+    assert cache.ordered_paths()[0] == "/rest_api_explorer.do"
+    assert len(cache.ordered_paths()) == len(set(cache.ordered_paths()))
+
+
+class Link:
+    def __init__(self, href: str | None) -> None:
+        self.href = href
+
+    async def get_attribute(self, name: str) -> str | None:
+        return self.href
+
+
+def test_hit_waits_for_the_recorded_frame_to_attach() -> None:
+    cache = SelectorCache()
+    cache.put("namespace", selector=NAMESPACE, frame="gsft_main")
+    page = Page()
+    select = Select(Option("now"))
+
+    async def run() -> object:
+        async def attach_later() -> None:
+            await asyncio.sleep(0.15)
+            page.frames.append(Frame("gsft_main", {NAMESPACE: select}))
+
+        task = asyncio.ensure_future(attach_later())
+        el = await _resolve(page, cache, "namespace", timeout_ms=2000)
+        await task
+        return el
+
+    start = time.monotonic()
+    assert asyncio.run(run()) is select
+    assert time.monotonic() - start >= 0.1
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_export_links_without_href_are_skipped() -> None:
+    toggle, link = Link(None), Link("https://x/export?ns=now")
+    page = Page(Frame("gsft_main", {'a:has-text("Export")': [toggle, link]}))
+    cache = SelectorCache()
+    assert asyncio.run(_resolve(page, cache, "export")) is link
+    assert cache.get("export") == {"selector": 'a:has-text("Export")', "frame": "gsft_main"}
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import re
+
+import httpx
+import pytest
+
+from api_discovery.config import RunConfig, ServiceNowSettings
+from api_discovery.discovery.servicenow import (
+    clear_discovery_memo,
+    discover_servicenow,
+    discover_servicenow_once,
+    fetch_dictionaries_bulk,
+    fetch_dictionaries_bulk_async,
+    list_namespaces,
+)
+from api_discovery.state import StateStore
+
+DICTIONARY = [
+    {"name": "incident", "element": "number", "internal_type": "string"},
+    {"name": "incident", "element": "caller_id", "internal_type": "reference"},
+    {"name": "problem", "element": "number", "internal_type": "string"},
+    {"name": "change_request", "element": "number", "internal_type": "string"},
+]
+
+
+def _dictionary_handler(requests: list[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        match = re.search(r"nameIN([^^]*)", request.url.params.get("sysparm_query", ""))
+        names = set(match.group(1).split(",")) if match else None
+        rows = [dict(r) for r in DICTIONARY if names is None or r["name"] in names]
+        return httpx.Response(200, json={"result": rows})
+
+    return handler
+
+
+def test_bulk_dictionary_fetch_chunks_and_groups(mock_client) -> None:
+    requests: list[httpx.Request] = []
+    client = mock_client(_dictionary_handler(requests))
+    grouped = fetch_dictionaries_bulk(client, ["incident", "problem", "sys_user"], chunk_size=2)
+    assert len(requests) == 2
+    assert [f["element"] for f in grouped["incident"]] == ["number", "caller_id"]
+    assert grouped["problem"] == [{"element": "number", "internal_type": "string"}]
+    assert grouped["sys_user"] == []
+    assert "change_request" not in grouped
+
+
+def test_bulk_dictionary_fetch_reports_each_finished_chunk(mock_client) -> None:
+    requests: list[httpx.Request] = []
+    chunks: list[dict] = []
+    tables = ["incident", "problem", "change_request"]
+    fetch_dictionaries_bulk(mock_client(_dictionary_handler(requests)), tables, chunk_size=2, on_chunk=chunks.append)
+    assert [sorted(c) for c in chunks] == [["incident", "problem"], ["change_request"]]
+    assert len(chunks[0]["incident"]) == 2
+
+
+def test_bulk_dictionary_fetch_async(mock_async_client) -> None:
+    requests: list[httpx.Request] = []
+    client = mock_async_client(_dictionary_handler(requests))
+
+    async def run():
+        try:
+            return await fetch_dictionaries_bulk_async(client, ["incident", "problem", "change_request"], chunk_size=1)
+        finally:
+            await client.aclose()
+
+    grouped = asyncio.run(run())
+    assert len(requests) == 3
+    assert sorted(grouped) == ["change_request", "incident", "problem"]
+    assert len(grouped["incident"]) == 2
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_incremental_discovery_refetches_only_changed_tables(fake_instance, tmp_path, concurrency: int) -> None:
+    fake_instance.tables = [
+        {"name": "incident", "label": "Incident", "super_class": "", "sys_updated_on": "2024-01-01 00:00:00"},
+        {"name": "problem", "label": "Problem", "super_class": "", "sys_updated_on": "2024-01-02 00:00:00"},
+    ]
+    fake_instance.dictionary = [
+        {"name": "incident", "element": "number", "internal_type": "string", "sys_updated_on": "2024-01-03 00:00:00"},
+        {"name": "problem", "element": "number", "internal_type": "string", "sys_updated_on": "2024-01-01 00:00:00"},
+    ]
+    settings = ServiceNowSettings(base_url="https://x.service-now.com", rate_limit_per_second=1000, max_concurrency=concurrency)
+    run = RunConfig(state_dir=str(tmp_path))
+    discover_servicenow(settings, run)
+    store = StateStore(run.state_dir, "servicenow")
+    state = store.load()
+    marks = state.watermarks["https://x.service-now.com"]
+    assert (marks["sys_db_object"], marks["sys_dictionary"]) == ("2024-01-02 00:00:00", "2024-01-03 00:00:00")
+    state.known["incident"].verified = True
+    store.save(state)
+
+    # Nothing changed: the delta queries only return rows stamped at the watermarks (the boundary
+    # second is re-read) and the records they name keep their verified flag
+    fake_instance.requests.clear()
+    tables, dictionaries = discover_servicenow(settings, run, incremental=True)
+    deltas = [r.url.params["sysparm_query"] for r in fake_instance.requests if "sys_updated_on" in r.url.params.get("sysparm_query", "")]
+    assert sorted(deltas) == ["sys_updated_on>=2024-01-02 00:00:00^ORDERBYsys_id", "sys_updated_on>=2024-01-03 00:00:00^ORDERBYsys_id"]
+    assert sorted(t["name"] for t in tables) == ["incident", "problem"]
+    assert [f["element"] for f in dictionaries["problem"]] == ["number"]
+    assert store.load().known["incident"].verified
+
+    # A dictionary row committed in the same second as the watermark is still picked up
+    fake_instance.dictionary.append({"name": "problem", "element": "cause", "internal_type": "string", "sys_updated_on": "2024-01-03 00:00:00"})
+    _, dictionaries = discover_servicenow(settings, run, incremental=True)
+    assert [f["element"] for f in dictionaries["problem"]] == ["number", "cause"]
+
+    # A newer row moves the watermark, after which only the tables at the new boundary are refetched
+    fake_instance.dictionary.append({"name": "problem", "element": "impact", "internal_type": "string", "sys_updated_on": "2024-02-01 00:00:00"})
+    _, dictionaries = discover_servicenow(settings, run, incremental=True)
+    assert [f["element"] for f in dictionaries["problem"]] == ["number", "cause", "impact"]
+    fake_instance.requests.clear()
+    discover_servicenow(settings, run, incremental=True)
+    fetched = [r.url.params["sysparm_query"] for r in fake_instance.requests if "nameIN" in r.url.params.get("sysparm_query", "")]
+    assert fetched == ["nameINproblem^internal_typeISNOTEMPTY^ORDERBYsys_id"]
+    state = store.load()
+    assert state.watermarks["https://x.service-now.com"]["sys_dictionary"] == "2024-02-01 00:00:00"
+    assert state.known["incident"].verified
+
+    # A table dropped on the instance is reconciled away against the current sys_db_object names
+    fake_instance.tables = [t for t in fake_instance.tables if t["name"] != "incident"]
+    tables, _ = discover_servicenow(settings, run, incremental=True)
+    assert [t["name"] for t in tables] == ["problem"]
+    assert sorted(store.load().known) == ["problem"]
+
+
+def test_incremental_discovery_falls_back_to_a_periodic_full_run(fake_instance, tmp_path) -> None:
+    fake_instance.tables = [
+        {"name": "incident", "label": "Incident", "super_class": "", "sys_updated_on": "2024-01-02 00:00:00"},
+        {"name": "problem", "label": "Problem", "super_class": "", "sys_updated_on": "2024-01-01 00:00:00"},
+    ]
+    fake_instance.dictionary = [
+        {"name": "incident", "element": "number", "internal_type": "string", "sys_updated_on": "2024-01-03 00:00:00"},
+        {"name": "problem", "element": "number", "internal_type": "string", "sys_updated_on": "2024-01-01 00:00:00"},
+        {"name": "problem", "element": "cause", "internal_type": "string", "sys_updated_on": "2024-01-01 00:00:00"},
+    ]
+    settings = ServiceNowSettings(base_url="https://x.service-now.com", rate_limit_per_second=1000)
+    run = RunConfig(state_dir=str(tmp_path))
+    discover_servicenow(settings, run)
+    # Deleting a field leaves nothing newer than the watermark, so a delta run keeps it...
+    fake_instance.dictionary.pop()
+    _, dictionaries = discover_servicenow(settings, run, incremental=True)
+    assert [f["element"] for f in dictionaries["problem"]] == ["number", "cause"]
+    # ...until the last full run is older than full_sync_interval_hours
+    stale = settings.model_copy(update={"full_sync_interval_hours": 1e-9})
+    _, dictionaries = discover_servicenow(stale, run, incremental=True)
+    assert [f["element"] for f in dictionaries["problem"]] == ["number"]
+
+
+def test_discover_once_memoizes_per_instance_and_state_dir(fake_instance, tmp_path) -> None:
+    fake_instance.tables = [{"name": "incident", "label": "Incident", "super_class": "", "sys_updated_on": "2024-01-01 00:00:00"}]
+    settings = ServiceNowSettings(base_url="https://x.service-now.com", rate_limit_per_second=1000)
+    clear_discovery_memo()
+    try:
+        first = discover_servicenow_once(settings, RunConfig(state_dir=str(tmp_path / "a")))
+        sent = len(fake_instance.requests)
+        assert discover_servicenow_once(settings, RunConfig(state_dir=str(tmp_path / "a"))) is first
+        assert len(fake_instance.requests) == sent
+        discover_servicenow_once(settings, RunConfig(state_dir=str(tmp_path / "b")))
+        assert len(fake_instance.requests) > sent
+    finally:
+        clear_discovery_memo()
+
+
+def test_listers_log_and_fall_back_when_the_catalog_index_fails(mock_client, caplog: pytest.LogCaptureFixture) -> None:
+    html = '<html><label>Namespace</label><select><option>x_acme</option></select></html>'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/api/now/table/sys_ws_"):
+            return httpx.Response(403, json={"error": {"message": "ACL"}})
+        return httpx.Response(200, text=html)
+
+    with caplog.at_level("WARNING"):
+        assert list_namespaces(mock_client(handler)) == ["x_acme"]
+    assert "Catalog index unavailable" in caplog.text
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from api_discovery.discovery import sn_browser
+from api_discovery.discovery.sn_browser import (
+    BrowserPool,
+    BrowserSession,
+    _catalog_from_payloads,
+)
+
+
+def test_pool_shares_one_browser_across_exports(fake_playwright, monkeypatch: pytest.MonkeyPatch) -> None:
+    borrowed: list[object] = []
+    in_use: set[int] = set()
+    peak = 0
+
+    async def export_on_page(page, *args: object, namespace: str, api_name: str, api_version: str, **kwargs: object) -> str:
+        nonlocal peak
+        assert id(page) not in in_use  # a page is never lent to two jobs at once
+        in_use.add(id(page))
+        peak = max(peak, len(in_use))
+        borrowed.append(page)
+        await asyncio.sleep(0.01)
+        in_use.discard(id(page))
+        return f"{namespace}/{api_name}/{api_version}"
+
+    monkeypatch.setattr(sn_browser, "_export_on_page", export_on_page)
+
+    async def run() -> dict:
+        async with BrowserPool(base_url="https://x", username=None, password=None, size=2) as pool:
+            return await pool.export_many([("now", "table", "v1"), ("now", "table", "v2"), ("now", "stats", "v1"), ("now", "table", "v1")])
+
+    texts = asyncio.run(run())
+    assert texts[("now", "stats", "v1")] == "now/stats/v1"
+    assert len(texts) == 3  # duplicate entries are exported once
+    assert len(fake_playwright.browsers) == 1
+    browser = fake_playwright.browsers[0]
+    assert len(browser.contexts) == 2 and peak == 2
+    assert len({id(p) for p in borrowed}) == 2
+    assert browser.closed and all(c.closed for c in browser.contexts) and fake_playwright.stopped == 1
+    assert all(c.routes for c in browser.contexts)  # the lean profile is applied to every context
+    assert "--disable-gpu" in fake_playwright.launch_options[0]["args"]
+
+
+def test_pool_cleans_up_when_a_login_fails(fake_playwright, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def login(page, *args: object) -> None:
+        raise RuntimeError("login form not found")
+
+    monkeypatch.setattr(sn_browser, "_login_servicenow", login)
+
+    async def run() -> None:
+        async with BrowserPool(base_url="https://x", username="u", password="p", size=2):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert fake_playwright.browsers[0].closed and fake_playwright.stopped == 1
+
+
+def test_pool_logs_in_once_and_saves_the_session(fake_playwright, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    logins: list[object] = []
+
+    async def login(page, *args: object) -> bool:
+        logins.append(page)
+        return True
+
+    monkeypatch.setattr(sn_browser, "_login_servicenow", login)
+    session = BrowserSession("https://x", "admin", "secret", state_path=tmp_path / "session.json")
+
+    async def run() -> None:
+        async with BrowserPool(base_url="https://x", username="admin", password="secret", size=3, session=session):
+            pass
+
+    asyncio.run(run())
+    assert len(logins) == 1 and session.logins == 1
+    contexts = fake_playwright.browsers[0].contexts
+    assert "storage_state" not in contexts[0].options
+    assert all(c.options["storage_state"]["cookies"] for c in contexts[1:])  # the first login is reused
+    assert os.stat(tmp_path / "session.json").st_mode & 0o777 == 0o600
+
+    # A later run restores the saved login without a new one
+    restored = BrowserSession("https://x", "admin", "secret", state_path=tmp_path / "session.json")
+    assert restored.stored_state() == session.stored_state()
+
+
+class BouncedPage:
+    # The first navigation lands on login.do while another page re-logs in the shared session
+    def __init__(self, session: BrowserSession, cookies: object) -> None:
+        self.session = session
+        self.cookies = cookies
+        self.url = ""
+        self.frames: list[object] = []
+        self.context = self
+        self.adopted: list[list] = []
+
+    async def goto(self, url: str, **kwargs: object) -> None:
+        if not self.url:
+            self.url = "https://x/login.do"
+            self.session._generation += 1
+            self.session._state = {"cookies": self.cookies}
+        else:
+            self.url = url
+
+    async def query_selector(self, selector: str) -> None:
+        return None
+
+    async def add_cookies(self, cookies: list) -> None:
+        self.adopted.append(cookies)
+
+
+def test_bounced_page_adopts_the_other_pages_login() -> None:
+    session = BrowserSession("https://x", "admin", "secret")
+    page = BouncedPage(session, [{"name": "JSESSIONID", "value": "new"}])
+    asyncio.run(session.goto(page, "https://x/rest_api_explorer.do"))
+    assert page.adopted == [[{"name": "JSESSIONID", "value": "new"}]]
+    assert page.url == "https://x/rest_api_explorer.do" and session.logins == 0
+
+    malformed = BouncedPage(session, {"JSESSIONID": "new"})  # not a storage_state cookie list
+    asyncio.run(session.goto(malformed, "https://x/rest_api_explorer.do"))
+    assert malformed.adopted == [[]]
+
+
+def test_stored_session_expires(tmp_path: Path) -> None:
+    path = tmp_path / "session.json"
+    path.write_text('{"cookies": []}')
+    assert BrowserSession("https://x", "admin", "secret", state_path=path).stored_state() == {"cookies": []}
+    assert BrowserSession("https://x", None, None, state_path=path).stored_state() is None  # no credentials, no login to reuse
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+    assert BrowserSession("https://x", "admin", "secret", state_path=path, ttl_seconds=60).stored_state() is None
+
+
+def test_catalog_from_explorer_payloads() -> None:
+    payloads = [
+        {"result": [{"namespace": "now", "services": [{"name": "table", "versions": [{"version": "v1"}, {"version": "v2"}]}]}]},
+        {"result": [{"namespace": {"value": "x_acme", "display_value": "Acme"}, "api_name": "orders", "versions": ["v1"]}]},
+        {"result": {"base_uri": "/api/x_acme/billing/v3"}},
+        {"result": {"name": "Ignored"}},  # a bare name outside any namespace is not an API
+        {"result": [{"namespace": "x_ui", "name": "preferences"}]},  # namespace/name without versions: not the explorer tree
+    ]
+    namespaces, apis, versions = _catalog_from_payloads(payloads)
+    assert namespaces == ["now", "x_acme"]
+    assert apis["x_acme"] == ["orders", "billing"]
+    assert versions[("now", "table")] == ["v1", "v2"]
+    assert versions[("x_acme", "billing")] == ["v3"]
+
+
+def test_catalog_tree_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    tree = (["now"], {"now": ["table"]}, {("now", "table"): ["v1", "v2"]})
+    path = sn_browser.save_catalog_tree(tmp_path / "_headless_catalog.json", tree, base_url="https://x/")
+    assert sn_browser.load_catalog_tree(path, base_url="https://x", max_age_seconds=60) == tree
+    assert sn_browser.load_catalog_tree(path, base_url="https://y", max_age_seconds=60) is None
+    assert sn_browser.load_catalog_tree(path, base_url="https://x", max_age_seconds=0) is None
+
+    crawls: list[dict] = []
+
+    async def crawl(**kwargs: object) -> object:
+        crawls.append(kwargs)
+        return (["x_acme"], {"x_acme": ["orders"]}, {("x_acme", "orders"): ["v1"]})
+
+    monkeypatch.setattr(sn_browser, "discover_catalog_via_browser", crawl)
+    assert asyncio.run(sn_browser.load_or_discover_catalog(path, base_url="https://x")) == tree
+    assert crawls == []
+    refreshed = asyncio.run(sn_browser.load_or_discover_catalog(path, base_url="https://x", refresh=True))
+    assert refreshed[0] == ["x_acme"] and len(crawls) == 1
+    assert sn_browser.load_catalog_tree(path, base_url="https://x", max_age_seconds=60) == refreshed
+    # A tree crawled in one explicit mode does not answer a request for another
+    sn_browser.save_catalog_tree(path, tree, base_url="https://x", mode="network")
+    assert asyncio.run(sn_browser.load_or_discover_catalog(path, base_url="https://x", mode="auto")) == tree
+    assert asyncio.run(sn_browser.load_or_discover_catalog(path, base_url="https://x", mode="network")) == tree
+    assert len(crawls) == 1
+    asyncio.run(sn_browser.load_or_discover_catalog(path, base_url="https://x", mode="dom"))
+    assert len(crawls) == 2 and crawls[-1]["mode"] == "dom"
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Self
+
+import httpx
+
+from api_discovery.discovery.sn_browser import (
+    BrowserSession,
+    SelectorCache,
+    export_url,
+    export_url_template,
+)
+from api_discovery.discovery.sn_export import (
+    SpecExporter,
+    _session_headers,
+    looks_like_spec,
+)
+
+
+def test_template_from_query_href() -> None:
+    href = "https://x/api/now/v1/explorer/export?namespace=now&api=table&version=v2&format=json"
+    template = export_url_template(href, "now", "table", "v2")
+    assert template == "https://x/api/now/v1/explorer/export?namespace={namespace}&api={api}&version={version}&format=json"
+    assert export_url(template, "x_acme", "orders", "v1") == (
+        "https://x/api/now/v1/explorer/export?namespace=x_acme&api=orders&version=v1&format=json"
+    )
+
+
+def test_template_from_path_href() -> None:
+    template = export_url_template("https://x/api/now/doc/x_acme/orders/v2/openapi.json", "x_acme", "orders", "v2")
+    assert template == "https://x/api/now/doc/{namespace}/{api}/{version}/openapi.json"
+
+
+def test_fixed_path_segment_is_not_the_namespace() -> None:
+    # "now" occurs in the fixed /api/now/ prefix and in the query; only the query value is substituted
+    template = export_url_template("https://x/api/now/export?ns=now&api=table&v=v1", "now", "table", "v1")
+    assert template == "https://x/api/now/export?ns={namespace}&api={api}&v={version}"
+
+
+def test_template_needs_every_placeholder() -> None:
+    assert export_url_template("https://x/export?api=table&v=v1", "now", "table", "v1") is None
+    assert export_url_template("https://x/export.do?id=abc", "now", "table", "v1") is None
+    assert export_url_template("https://x/{already}/templated", "now", "table", "v1") is None
+
+
+def test_export_url_quotes_values() -> None:
+    assert export_url("https://x/e?ns={namespace}&api={api}&v={version}", "x a", "b/c", "v2") == "https://x/e?ns=x%20a&api=b%2Fc&v=v2"
+
+
+def test_looks_like_spec() -> None:
+    assert looks_like_spec('{"openapi": "3.0.0", "paths": {}}')
+    assert looks_like_spec("swagger: '2.0'\n")
+    assert not looks_like_spec("<html>login</html>")
+    assert not looks_like_spec('{"error": "not found"}')
+
+
+class FakePool:
+    size = 1
+
+    def __init__(self, session: BrowserSession) -> None:
+        self.session = session
+        self.exported: list[tuple[str, str, str]] = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+    async def export_many(self, keys: list[tuple[str, str, str]]) -> dict:
+        self.exported.extend(keys)
+        # A successful browser export teaches the template
+        self.session.selectors.put("export_url", template="https://x.service-now.com/export?ns={namespace}&api={api}&v={version}")
+        return {k: '{"openapi": "3.0.0"}' for k in keys}
+
+    def stats(self) -> dict:
+        return {"exports": len(self.exported)}
+
+
+def test_exporter_seeds_template_then_fetches_directly(mock_async_client) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params["api"] == "broken":
+            return httpx.Response(200, text="<html>login</html>")
+        return httpx.Response(200, json={"openapi": "3.0.0", "paths": {}})
+
+    session = BrowserSession("https://x.service-now.com", None, None, selectors=SelectorCache())
+    pool = FakePool(session)
+    keys = [("now", "table", "v1"), ("now", "stats", "v1"), ("x_acme", "broken", "v1")]
+
+    async def run() -> dict:
+        client = mock_async_client(handler)
+        async with client, SpecExporter(client, session, lambda: pool) as exporter:
+            results = await exporter.export_many(keys)
+            assert exporter.stats()["direct"] == 1
+        return results
+
+    results = asyncio.run(run())
+    assert all(results[k] for k in keys)
+    # seed export, then the non-spec direct response falls back to the browser
+    assert pool.exported == [("now", "table", "v1"), ("x_acme", "broken", "v1")]
+
+
+def test_exporter_without_a_browser_only_fetches_directly(mock_async_client) -> None:
+    session = BrowserSession("https://x.service-now.com", None, None, selectors=SelectorCache())
+    keys = [("now", "table", "v1")]
+
+    async def run(template: bool) -> dict:
+        if template:
+            session.selectors.put("export_url", template="https://x.service-now.com/export?ns={namespace}&api={api}&v={version}")
+        client = mock_async_client(lambda request: httpx.Response(200, json={"openapi": "3.0.0", "paths": {}}))
+        async with client, SpecExporter(client, session, None) as exporter:
+            return await exporter.export_many(keys)
+
+    assert asyncio.run(run(False)) == {}  # nothing to seed the template with, and no pool is launched
+    assert asyncio.run(run(True))[keys[0]]
+
+
+def test_stored_template_without_namespace_is_ignored() -> None:
+    session = BrowserSession("https://x.service-now.com", None, None, selectors=SelectorCache())
+    session.selectors.put("export_url", template="https://x.service-now.com/export?api={api}&v={version}")
+    assert SpecExporter(None, session, lambda: None).template is None  # type: ignore[arg-type]
+
+
+def test_session_cookies_are_scoped_to_the_instance(tmp_path) -> None:
+    path = tmp_path / "session.json"
+    path.write_text(json.dumps({"cookies": [
+        {"name": "JSESSIONID", "value": "a", "domain": "x.service-now.com"},
+        {"name": "glide_user_route", "value": "b", "domain": ".service-now.com"},
+        {"name": "idp_session", "value": "c", "domain": "login.example-idp.com"},
+        {"name": "no_domain", "value": "d"},
+    ]}))
+    session = BrowserSession("https://x.service-now.com", "admin", "secret", state_path=path)
+    assert _session_headers(session) == {"Cookie": "JSESSIONID=a; glide_user_route=b"}
+    assert _session_headers(None) == {}
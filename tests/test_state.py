@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from api_discovery.state import (
+    Evidence,
+    OrderedNameSet,
+    SqliteStateStore,
+    StateStore,
+    evidence,
+    migrate_json_state,
+    open_state_store,
+)
+
+EV = evidence(("metadata:sys_db_object", "metadata:sys_dictionary"), 0.7)
+
+
+def _populate(store: StateStore) -> None:
+    state = store.load()
+    store.upsert_resource(state, "incident", "table", evidence=EV, meta={"label": "Incident", "field_count": 3})
+    store.upsert_resource(state, "problem", "table", meta={"label": "Problem"})
+    store.add_unknown(state, "u_mystery")
+    store.set_verified(state, "incident")
+    state.watermarks["https://x"] = {"sys_db_object": "2024-01-02 00:00:00"}
+    store.save(state)
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_round_trip(tmp_path: Path, backend: str) -> None:
+    _populate(open_state_store(str(tmp_path), "servicenow", backend=backend))
+
+    state = open_state_store(str(tmp_path), "servicenow", backend=backend).load()
+    assert sorted(state.known) == ["incident", "problem"]
+    assert state.known["incident"].verified is True
+    assert state.known["incident"].evidence is EV  # interned: one shared instance
+    assert state.known["incident"].meta == {"label": "Incident", "field_count": 3}
+    assert state.known["problem"].verified is False
+    assert list(state.unknown) == ["u_mystery"]
+    assert state.watermarks == {"https://x": {"sys_db_object": "2024-01-02 00:00:00"}}
+
+
+def test_upsert_clears_unknown(tmp_path: Path) -> None:
+    store = StateStore(str(tmp_path), "servicenow")
+    state = store.load()
+    store.add_unknown(state, "u_table")
+    store.upsert_resource(state, "u_table", "table")
+    assert "u_table" not in state.unknown
+    store.add_unknown(state, "u_table")
+    assert "u_table" not in state.unknown
+
+
+def test_sqlite_names_without_loading(tmp_path: Path) -> None:
+    store = SqliteStateStore(str(tmp_path), "servicenow")
+    _populate(store)
+    assert store.names(kind="table") == ["incident", "problem"]
+    assert store.names(verified=True) == ["incident"]
+    store.remove_resource(store.load(), "incident")  # written straight through, no save needed
+    assert store.names() == ["problem"]
+    store.close()
+
+
+def test_migrate_json_state(tmp_path: Path) -> None:
+    _populate(StateStore(str(tmp_path), "servicenow"))
+
+    sqlite_store = SqliteStateStore(str(tmp_path), "servicenow")
+    assert migrate_json_state(sqlite_store) == 2
+    migrated = SqliteStateStore(str(tmp_path), "servicenow").load()
+    assert sorted(migrated.known) == ["incident", "problem"]
+    assert list(migrated.unknown) == ["u_mystery"]
+    # The JSON snapshot is left in place as a backup
+    assert "incident" in json.loads((tmp_path / "servicenow" / "state.json").read_text())["known"]
+
+
+def test_unknown_backend(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        open_state_store(str(tmp_path), "servicenow", backend="yaml")
+
+
+def test_migrate_json_state_includes_journal(tmp_path: Path) -> None:
+    json_store = StateStore(str(tmp_path), "servicenow")
+    _populate(json_store)
+    state = json_store.load()
+    json_store.upsert_resource(state, "change_request", "table")
+    json_store.checkpoint(state)  # journaled but never saved into state.json
+
+    assert migrate_json_state(SqliteStateStore(str(tmp_path), "servicenow")) == 3
+    assert sorted(SqliteStateStore(str(tmp_path), "servicenow").load().known) == ["change_request", "incident", "problem"]
+
+
+def test_evidence_is_interned() -> None:
+    assert evidence(["a", "b"], 0.5) is evidence(("a", "b"), 0.5)
+    assert evidence(["a"], 0.5) is not evidence(["a"], 0.6)
+    assert EV.to_dict() == {"sources": ["metadata:sys_db_object", "metadata:sys_dictionary"], "confidence": 0.7}
+    assert EV.model_dump() == EV.to_dict()
+    assert Evidence(["a"], "0.5") == evidence(["a"], 0.5)  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        Evidence(("a",), "high")  # type: ignore[arg-type]
+
+
+def test_ordered_name_set() -> None:
+    names = OrderedNameSet(["b", "a", "b"])
+    names.add("c")
+    names.discard("a")
+    names.discard("missing")
+    assert list(names) == ["b", "c"]
+    assert "c" in names and len(names) == 2
+    assert names == ["b", "c"]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from api_discovery.discovery.table_api import (
+    aiter_table_keyset,
+    fetch_all_rows,
+    fetch_all_rows_async,
+    iter_table_keyset,
+)
+
+ROWS = [{"sys_id": f"{i:04d}", "name": f"t{i}"} for i in range(25)]
+
+
+def _fake_table(requests: list[httpx.Request], *, total_header: bool = True, stats: int | None = None):
+    # Serves ROWS honouring sysparm_limit/offset, "sys_id>X" keyset clauses and ORDERBYsys_id
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = request.url.params
+        if request.url.path.startswith("/api/now/stats/"):
+            return httpx.Response(200, json={"result": {"stats": {"count": str(stats)}}})
+        rows = sorted(ROWS, key=lambda r: r["sys_id"]) if "ORDERBYsys_id" in params.get("sysparm_query", "") else ROWS
+        for clause in params.get("sysparm_query", "").split("^"):
+            if clause.startswith("sys_id>"):
+                rows = [r for r in rows if r["sys_id"] > clause[len("sys_id>"):]]
+        offset = int(params.get("sysparm_offset", 0))
+        limit = int(params["sysparm_limit"])
+        fields = params["sysparm_fields"].split(",")
+        page = [{k: v for k, v in r.items() if k in fields} for r in rows[offset : offset + limit]]
+        headers = {"X-Total-Count": str(len(ROWS))} if total_header else {}
+        return httpx.Response(200, json={"result": page}, headers=headers)
+
+    return handler
+
+
+def test_offset_pages_with_total_header(mock_client) -> None:
+    requests: list[httpx.Request] = []
+    rows = fetch_all_rows(mock_client(_fake_table(requests)), "sys_db_object", fields="sys_id,name", page_size=10)
+    assert sorted(r["sys_id"] for r in rows) == [r["sys_id"] for r in ROWS]
+    assert len(requests) == 3
+    assert {r.url.params["sysparm_offset"] for r in requests} == {"0", "10", "20"}
+    assert all(r.url.params["sysparm_query"] == "ORDERBYsys_id" for r in requests)
+
+
+def test_offset_pages_fall_back_to_stats_count(mock_client) -> None:
+    requests: list[httpx.Request] = []
+    client = mock_client(_fake_table(requests, total_header=False, stats=len(ROWS)))
+    rows = fetch_all_rows(client, "sys_db_object", fields="sys_id,name", query="active=true", page_size=10)
+    assert len(rows) == 25
+    assert [r.url.path for r in requests].count("/api/now/stats/sys_db_object") == 1
+    assert all(r.url.params["sysparm_query"] == "active=true^ORDERBYsys_id" for r in requests if "table" in r.url.path)
+
+
+def test_offset_pages_walk_when_size_unknown(mock_client) -> None:
+    requests: list[httpx.Request] = []
+    client = mock_client(_fake_table(requests, total_header=False, stats=None))
+    assert len(fetch_all_rows(client, "sys_db_object", fields="sys_id,name", page_size=10)) == 25
+
+
+def test_async_offset_pages(mock_async_client) -> None:
+    requests: list[httpx.Request] = []
+
+    async def run() -> list[dict]:
+        client = mock_async_client(_fake_table(requests))
+        async with client:
+            return await fetch_all_rows_async(client, "sys_db_object", fields="sys_id,name", page_size=10)
+
+    assert sorted(r["sys_id"] for r in asyncio.run(run())) == [r["sys_id"] for r in ROWS]
+
+
+def test_keyset_pages(mock_client) -> None:
+    requests: list[httpx.Request] = []
+    rows = list(iter_table_keyset(mock_client(_fake_table(requests)), "sys_ws_operation", fields="name", page_size=10))
+    assert [r["name"] for r in rows] == [r["name"] for r in ROWS]
+    assert all("sys_id" not in r for r in rows)  # only requested for the cursor
+    queries = [r.url.params["sysparm_query"] for r in requests]
+    assert queries == ["ORDERBYsys_id", "sys_id>0009^ORDERBYsys_id", "sys_id>0019^ORDERBYsys_id"]
+    assert all("sysparm_offset" not in r.url.params for r in requests)
+
+
+def test_async_keyset_pages_keep_requested_sys_id(mock_async_client) -> None:
+    requests: list[httpx.Request] = []
+
+    async def run() -> list[dict]:
+        client = mock_async_client(_fake_table(requests))
+        async with client:
+            return [row async for row in aiter_table_keyset(client, "sys_ws_operation", fields="sys_id,name", query="active=true", page_size=25)]
+
+    rows = asyncio.run(run())
+    assert [r["sys_id"] for r in rows] == [r["sys_id"] for r in ROWS]
+    # A full last page needs one more (empty) request to confirm the end
+    assert [r.url.params["sysparm_query"] for r in requests] == ["active=true^ORDERBYsys_id", "active=true^sys_id>0024^ORDERBYsys_id"]